@@ -0,0 +1,84 @@
+"""Benchmark de `generate_routines_batch`: usuarios por segundo según el número de workers.
+
+Genera perfiles sintéticos reproducibles (nivel, objetivo, lesiones y
+equipamiento repartidos en unas decenas de combinaciones, más días por semana
+variables) y mide el throughput con 1, 2, 4 y 8 workers, frente a llamar a
+`generate_routine` usuario por usuario.
+
+Antes de medir comprueba, sobre una muestra, que el lote produce las mismas
+rutinas que `generate_routine`.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --users 2000 --workers 1 4 8
+"""
+import argparse
+import random
+import time
+
+from src import routine_builder
+from src.routine_batch import generate_routines_batch
+
+GOALS = ["hypertrophy", "strength", "endurance"]
+INJURIES = [[], [], ["lats"], ["quads"], ["pectorals", "delts"]]
+EQUIPMENTS = [None, None, ["body weight"], ["dumbbell", "body weight"], ["barbell", "dumbbell", "cable"]]
+
+
+def synthetic_profiles(count, seed=0):
+    rng = random.Random(seed)
+    return {
+        f"user_{i}": {
+            "num_days": rng.choice([3, 4, 5]),
+            "time_per_session": 120,
+            "level": rng.randint(0, 4),
+            "goal": rng.choice(GOALS),
+            "injuries": rng.choice(INJURIES),
+            "equipments": rng.choice(EQUIPMENTS),
+        }
+        for i in range(count)
+    }
+
+
+def sequential(profiles):
+    for username, profile in profiles.items():
+        user_profile = {k: v for k, v in profile.items() if k not in ("num_days", "time_per_session")}
+        yield username, routine_builder.generate_routine(profile["num_days"], profile["time_per_session"],
+                                                         user_level=user_profile)
+
+
+def check_parity(profiles, sample):
+    subset = dict(list(profiles.items())[:sample])
+    expected = dict(sequential(subset))
+    for workers in (1, 2):
+        got = dict(generate_routines_batch(subset, workers=workers, chunksize=4))
+        if got != expected:
+            raise SystemExit(f"rutinas distintas con workers={workers}")
+    print(f"paridad OK en {len(subset)} usuarios")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--parity-sample", type=int, default=20)
+    args = parser.parse_args()
+
+    profiles = synthetic_profiles(args.users)
+    routine_builder.load_exercises()  # catálogo ya cargado para todos los casos
+    check_parity(profiles, args.parity_sample)
+
+    print(f"{'modo':>16} {'usuarios':>9} {'tiempo (s)':>11} {'usuarios/s':>11}")
+    t0 = time.perf_counter()
+    count = sum(1 for _ in sequential(profiles))
+    elapsed = time.perf_counter() - t0
+    print(f"{'generate_routine':>16} {count:>9} {elapsed:>11.2f} {count / elapsed:>11.1f}")
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        count = sum(1 for _ in generate_routines_batch(profiles, workers=workers, chunksize=args.chunksize))
+        elapsed = time.perf_counter() - t0
+        print(f"{'batch x' + str(workers):>16} {count:>9} {elapsed:>11.2f} {count / elapsed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark de carga del catálogo: snapshot binario vs `json.load`.
+
+Mide, sobre una copia temporal de `exercises.json` y su snapshot:
+
+- carga en proceso: `json.load` del archivo y `catalog.get_catalog` por cada ruta
+  (JSON y snapshot), limpiando la caché entre repeticiones;
+- arranque en frío: un intérprete nuevo que importa `src.catalog` y carga el
+  catálogo, con y sin snapshot.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_catalog_load --repeat 20
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src import catalog, catalog_snapshot
+
+COLD_START = (
+    "import sys, time; t = time.perf_counter(); "
+    "from src import catalog; c = catalog.get_catalog(sys.argv[1]); "
+    "print(time.perf_counter() - t, c.source)"
+)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def cold_start(json_path, repeat):
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", COLD_START, json_path], capture_output=True, text=True,
+                             check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        elapsed, source = out.stdout.split()
+        samples.append(float(elapsed))
+    return statistics.median(samples), source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "exercises.json")
+        shutil.copy(catalog.DEFAULT_EXERCISES_PATH, json_path)
+        snap_path = catalog_snapshot.snapshot_path_for(json_path)
+
+        def load_catalog():
+            catalog.clear_cache()
+            return catalog.get_catalog(json_path)
+
+        def read_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                json.load(f)
+
+        def touch_instructions():
+            for ex in load_catalog().exercises:
+                ex["instructions"]
+
+        rows = [("json.load", timed(read_json, args.repeat))]
+        rows.append(("catálogo (json)", timed(load_catalog, args.repeat)))
+        json_cold, _ = cold_start(json_path, args.repeat)
+
+        catalog_snapshot.build_snapshot(json_path)
+        rows.append(("catálogo (snapshot)", timed(load_catalog, args.repeat)))
+        rows.append(("snapshot + instrucciones", timed(touch_instructions, args.repeat)))
+        snap_cold, source = cold_start(json_path, args.repeat)
+        assert source == "snapshot", source
+
+        print(f"{'carga en proceso':<28} {'mediana (ms)':>12}")
+        for name, elapsed in rows:
+            print(f"{name:<28} {elapsed * 1000:>12.2f}")
+        print()
+        print(f"{'arranque en frío':<28} {'mediana (ms)':>12}")
+        print(f"{'json':<28} {json_cold * 1000:>12.2f}")
+        print(f"{'snapshot':<28} {snap_cold * 1000:>12.2f}")
+        print(f"\ntamaño: json {os.path.getsize(json_path)} B, snapshot {os.path.getsize(snap_path)} B")
+        catalog.clear_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Microbenchmark de la preparación de cada día en `generate_routine`.
+
+Compara la valoración de items y el filtro de estamina de `_plan_day`:
+
+- `dicts`: bucles en Python sobre los nombres de músculo y los diccionarios
+  `remaining` / `stamina_remaining` (implementación original, y la que se usa
+  sin numpy);
+- `arrays`: músculos internados a enteros, incidencia items x músculos dispersa
+  y estado en arrays (`_MuscleArrays.day_candidates`).
+
+Mide sobre el estado al inicio de la semana y tras planificar 1, 2 y 3 días,
+y verifica que ambos devuelven los mismos candidatos y valores.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_day_prep --repeat 200
+"""
+import argparse
+import statistics
+import time
+
+from src import routine_builder as rb
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--level", type=int, default=2)
+    args = parser.parse_args()
+    if rb.np is None:
+        raise SystemExit("numpy no está instalado")
+
+    tables = rb.get_item_tables(args.level)
+    items, costs = tables.items, tables.stamina_costs
+    muscles = {m for it in items for m in it["muscles"]}
+    remaining = {m: rb.WEEKLY_TARGET_SETS for m in muscles}
+    stamina = {m: rb.default_level_stamina_limit(tables.level) for m in muscles}
+    knapsack = rb.get_knapsack_solver("python")
+    arrays = rb._MuscleArrays(tables.incidence, remaining, stamina)
+
+    print(f"{len(items)} items, {len(tables.incidence.muscles)} músculos")
+    print(f"{'estado':>10} {'dicts (ms)':>11} {'arrays (ms)':>12} {'x':>6}")
+    for day in range(4):
+        expected = rb._day_candidates(items, costs, remaining, stamina)
+        if arrays.day_candidates() != expected:
+            raise SystemExit(f"candidatos distintos tras {day} días")
+        dicts_s = timed(lambda: rb._day_candidates(items, costs, remaining, stamina), args.repeat)
+        arrays_s = timed(arrays.day_candidates, args.repeat)
+        print(f"{'día ' + str(day + 1):>10} {dicts_s * 1000:>11.3f} {arrays_s * 1000:>12.3f} {dicts_s / arrays_s:>6.1f}")
+        rb._plan_day(items, costs, remaining, stamina, 120, knapsack, arrays)
+
+    build_s = timed(lambda: rb.build_muscle_incidence(items, costs), 20)
+    init_s = timed(lambda: rb._MuscleArrays(tables.incidence, remaining, stamina), args.repeat)
+    print(f"construir incidencia (una vez por perfil, memoizada): {build_s * 1000:.3f} ms")
+    print(f"inicializar arrays (una vez por semana): {init_s * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark de throughput de los backends de `DatabaseManager` con sesiones concurrentes.
+
+Cada sesión (un hilo, como las sesiones de Streamlit dentro de un proceso)
+repite el recorrido típico de una página: leer perfil, leer rutina, obtener
+los ejercicios del día, guardar y releer el seguimiento. Se reportan
+operaciones por segundo y errores (p. ej. JSON leído a medio escribir).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_db_backends
+    python -m benchmarks.bench_db_backends --users 200 --sessions 1 4 16 --rounds 20
+    python -m benchmarks.bench_db_backends --backends json --durability interval
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+
+from src import routine_builder
+from src.database.cache import DURABILITY_MODES
+from src.database.db_manager import BACKENDS, DatabaseManager
+
+OPS_PER_ROUND = 5
+
+
+def populate(db: DatabaseManager, users: int, routine: dict) -> None:
+    for u in range(users):
+        name = f"user{u}"
+        db.register_user(name, "pw")
+        db.save_profile(name, {"age": 30, "environment": "Gimnasio", "years": 2.0})
+        db.save_routine(name, routine)
+
+
+def session(db: DatabaseManager, users: int, rounds: int, seed: int, errors: list) -> None:
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        name = f"user{rng.randrange(users)}"
+        day = rng.randrange(4)
+        try:
+            db.get_profile(name)
+            db.get_routine(name)
+            exercises = db.get_current_day_exercises(name, day)
+            db.save_tracking(name, day, {"exercises": {ex["name"]: {"sets_completed": ex["sets"]} for ex in exercises}})
+            db.get_tracking(name, day)
+        except Exception as e:  # noqa: BLE001 - se cuentan, no se propagan
+            errors.append(e)
+
+
+def run(backend: str, sessions: int, args, routine: dict):
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = DatabaseManager(data_dir, backend=backend, durability=args.durability)
+        populate(db, args.users, routine)
+        errors: list = []
+        threads = [
+            threading.Thread(target=session, args=(db, args.users, args.rounds, args.seed + k, errors))
+            for k in range(sessions)
+        ]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        stats = db.cache_stats()
+        db.close()
+        return sessions * args.rounds * OPS_PER_ROUND / elapsed, len(errors), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rounds", type=int, default=20, help="recorridos por sesión")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default="sync",
+                        help="modo de escritura del caché del backend JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    routine = routine_builder.generate_routine(4)
+    print(f"{'backend':>8} {'sesiones':>9} {'ops/s':>10} {'errores':>8}  caché")
+    for backend in args.backends:
+        for sessions in args.sessions:
+            throughput, errors, stats = run(backend, sessions, args, routine)
+            cache = " ".join(f"{k}={v}" for k, v in stats.items())
+            print(f"{backend:>8} {sessions:>9} {throughput:>10.1f} {errors:>8}  {cache}")
+
+
+if __name__ == "__main__":
+    main()
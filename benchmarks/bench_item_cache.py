@@ -0,0 +1,59 @@
+"""Benchmark del caché de tablas de items (`routine_builder.get_item_tables`).
+
+Genera rutinas para usuarios sintéticos repartidos en `--buckets` firmas de
+perfil distintas (perfiles de `bench_batch.synthetic_profiles`), con el caché
+desactivado y activado, y muestra el tiempo medio por usuario y las
+estadísticas del caché.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_item_cache
+    python -m benchmarks.bench_item_cache --users 500 --cache-size 16
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_batch import sequential, synthetic_profiles
+from src import routine_builder
+
+
+def bucketed_profiles(users, buckets, seed=0):
+    rng = random.Random(seed)
+    templates = list(synthetic_profiles(buckets, seed).values())
+    return {f"user_{i}": dict(rng.choice(templates), num_days=rng.choice([3, 4, 5])) for i in range(users)}
+
+
+def run(profiles):
+    t0 = time.perf_counter()
+    routines = dict(sequential(profiles))
+    return routines, (time.perf_counter() - t0) / len(profiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--buckets", type=int, default=30)
+    parser.add_argument("--cache-size", type=int, default=routine_builder.ITEM_CACHE_SIZE)
+    args = parser.parse_args()
+
+    profiles = bucketed_profiles(args.users, args.buckets)
+    signatures = {routine_builder.profile_signature({k: v for k, v in p.items() if k != "num_days"})
+                  for p in profiles.values()}
+    routine_builder.load_exercises()
+
+    routine_builder.configure_item_cache(0)
+    uncached, uncached_s = run(profiles)
+    routine_builder.clear_item_cache()
+    routine_builder.configure_item_cache(args.cache_size)
+    cached, cached_s = run(profiles)
+    if cached != uncached:
+        raise SystemExit("las rutinas con caché difieren de las rutinas sin caché")
+
+    print(f"{len(profiles)} usuarios, {len(signatures)} firmas de perfil distintas")
+    print(f"sin caché: {uncached_s * 1000:.1f} ms/usuario")
+    print(f"con caché: {cached_s * 1000:.1f} ms/usuario (x{uncached_s / cached_s:.2f})")
+    print(f"estadísticas: {routine_builder.item_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
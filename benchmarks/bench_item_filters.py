@@ -0,0 +1,70 @@
+"""Benchmark de los filtros de lesiones y equipamiento de `build_items`.
+
+Compara, para varios perfiles (sin filtros, con lesiones, gimnasio en casa con
+poco equipamiento), el recorrido en Python de todo el catálogo que hacía
+`build_items` (pasar a minúsculas y `any(...)` por ejercicio) con
+`routine_builder.filter_indices` (máscaras de bits sobre la tabla en columnas
+del catálogo), y el `build_items` completo. Comprueba que ambos filtros
+devuelven los mismos índices.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_item_filters
+    python -m benchmarks.bench_item_filters --repeat 200
+"""
+import argparse
+import timeit
+
+from src import routine_builder
+
+PROFILES = {
+    "sin filtros": {"level": 2},
+    "lesiones": {"level": 2, "injuries": ["lats", "quads"]},
+    "casa (peso corporal)": {"level": 2, "equipments": ["body weight"]},
+    "casa + lesión": {"level": 2, "injuries": ["pectorals"], "equipments": ["body weight", "band"]},
+}
+
+
+def python_filter(exercises, injuries, equipments_avail):
+    """El filtro anterior de `build_items`, ejercicio por ejercicio."""
+    indices = []
+    for i, ex in enumerate(exercises):
+        muscles = [m.lower() for m in ex.get("targetMuscles", [])]
+        if any(m in injuries for m in muscles):
+            continue
+        if equipments_avail is not None:
+            eqs = [e.lower() for e in ex.get("equipments", [])]
+            if eqs and not any(e in equipments_avail for e in eqs):
+                continue
+        indices.append(i)
+    return indices
+
+
+def best_ms(fn, repeat):
+    return min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    exercises = routine_builder.load_exercises()
+    table = routine_builder.catalog_table(exercises)
+    print(f"{len(exercises)} ejercicios, {len(table.muscle_codes)} músculos y "
+          f"{len(table.equipment_codes)} equipamientos codificados")
+    print(f"{'perfil':<22} {'items':>6} {'python ms':>10} {'máscaras ms':>12} {'build_items ms':>15}")
+    for label, profile in PROFILES.items():
+        injuries = {m.lower() for m in profile.get("injuries", [])}
+        equipments = profile.get("equipments")
+        expected = python_filter(exercises, injuries, equipments)
+        got = routine_builder.filter_indices(table, injuries, equipments).tolist()
+        if got != expected:
+            raise SystemExit(f"los filtros difieren para el perfil {label!r}")
+        loop_ms = best_ms(lambda: python_filter(exercises, injuries, equipments), args.repeat)
+        mask_ms = best_ms(lambda: routine_builder.filter_indices(table, injuries, equipments), args.repeat)
+        build_ms = best_ms(lambda: routine_builder.build_items(exercises, profile), args.repeat)
+        print(f"{label:<22} {len(got):>6} {loop_ms:>10.3f} {mask_ms:>12.3f} {build_ms:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
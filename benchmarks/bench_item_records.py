@@ -0,0 +1,99 @@
+"""Benchmark de memoria de los registros compactos (`src.records`).
+
+Compara, con tracemalloc, la memoria retenida por:
+
+- las tablas de items de cada perfil (lo que guarda el caché de
+  `get_item_tables`): dicts envueltos en `MappingProxyType` con una tupla de
+  músculos propia por item (la representación anterior) frente a
+  `ExerciseItem` con `__slots__` y tuplas compartidas de la tabla en columnas
+  del catálogo;
+- las rutinas generadas: un dict por ejercicio programado con copias de la
+  lista de músculos y del consumo de estamina (lo que sigue guardándose, ver
+  `records.to_plain`) frente a `ScheduleEntry`.
+
+Las tablas se miden sobre una muestra de `--profiles` perfiles y se
+extrapolan a 1000; las rutinas se miden sobre `--users` usuarios.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_item_records
+    python -m benchmarks.bench_item_records --profiles 100 --users 2000
+"""
+import argparse
+import copy
+import gc
+import tracemalloc
+from types import MappingProxyType
+
+from benchmarks.bench_batch import sequential, synthetic_profiles
+from src import records, routine_builder
+
+
+def legacy_tables(exercises, user_profile):
+    """Tablas de items como se construían antes: un dict por item (solo lectura vía proxy)."""
+    items = routine_builder.build_items(exercises, user_profile)
+    level = routine_builder._parse_user_profile(user_profile)["level"]
+    costs = routine_builder._item_stamina_costs(items, level)
+    return (tuple(MappingProxyType({"id": it.id, "name": it.name, "muscles": tuple(list(it.muscles)),
+                                    "sets": it.sets, "reps": it.reps, "time": it.time, "raw": it.raw})
+                  for it in items),
+            tuple(MappingProxyType(c) for c in costs))
+
+
+def record_tables(exercises, user_profile):
+    items = routine_builder.build_items(exercises, user_profile)
+    level = routine_builder._parse_user_profile(user_profile)["level"]
+    costs = routine_builder._item_stamina_costs(items, level)
+    return tuple(items), tuple(MappingProxyType(c) for c in costs)
+
+
+def retained(build):
+    """(objeto construido, bytes que siguen reservados mientras se conserva)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=50, help="perfiles medidos para las tablas de items")
+    parser.add_argument("--users", type=int, default=1000, help="usuarios para las rutinas")
+    args = parser.parse_args()
+
+    exercises = routine_builder.load_exercises()
+    _, table_bytes = retained(lambda: routine_builder.catalog_table(exercises))
+    user_profiles = [{k: v for k, v in p.items() if k not in ("num_days", "time_per_session")}
+                     for p in synthetic_profiles(args.profiles).values()]
+
+    print(f"tabla en columnas del catálogo ({len(exercises)} ejercicios, una por proceso): "
+          f"{table_bytes / 1024:.0f} KiB")
+    per_1k = {}
+    for label, build in (("dict + MappingProxyType", legacy_tables), ("ExerciseItem", record_tables)):
+        tables, nbytes = retained(lambda: [build(exercises, p) for p in user_profiles])
+        per_1k[label] = nbytes / len(tables) * 1000
+        n_items = sum(len(items) for items, _ in tables) / len(tables)
+        print(f"tablas de items, {label}: {nbytes / len(tables) / 1024:.0f} KiB/perfil "
+              f"({n_items:.0f} items), {per_1k[label] / 2**20:.1f} MiB por 1000 perfiles")
+        del tables
+    legacy, compact = per_1k.values()
+    print(f"  ahorro: {(legacy - compact) / 2**20:.1f} MiB por 1000 perfiles ({1 - compact / legacy:.0%})")
+
+    routines = dict(sequential(synthetic_profiles(args.users)))
+    plain = {u: records.to_plain(r) for u, r in routines.items()}
+    if plain != routines:
+        raise SystemExit("las rutinas con registros difieren de su forma en dicts")
+    # copias profundas: reservan lo mismo que generarlas (las tuplas de músculos se comparten)
+    _, plain_bytes = retained(lambda: copy.deepcopy(plain))
+    _, record_bytes = retained(lambda: copy.deepcopy(routines))
+    scale = 1000 / len(routines)
+    print(f"rutinas, dicts: {plain_bytes * scale / 2**20:.2f} MiB por 1000 usuarios")
+    print(f"rutinas, ScheduleEntry: {record_bytes * scale / 2**20:.2f} MiB por 1000 usuarios "
+          f"(ahorro {1 - record_bytes / plain_bytes:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Benchmark del solver knapsack de `routine_builder`.
+
+Compara la implementación anterior (lista de picks copiada por celda) con la
+tabla de decisiones compacta actual, el motor numpy y el solver agrupado por
+(tiempo, valor), en tiempo y memoria pico, sobre catálogos sintéticos
+construidos replicando `exercises.json`.
+
+Antes de medir se verifica la paridad de los motores exactos con la
+implementación original: `generate_routine` debe producir rutinas idénticas
+con ellos sobre el dataset incluido, y deben seleccionar los mismos índices en
+cada tamaño sintético. El solver agrupado
+puede desempatar distinto, así que solo se exige que alcance el mismo valor.
+
+La implementación original se mide en el proceso hasta `--legacy-max` items.
+En tamaños mayores se ejecuta en un proceso aparte con `--legacy-timeout`
+segundos de límite: si no termina, se informa el tiempo como límite superado
+y la memoria de su tabla de picks calculada analíticamente (marcada "est.").
+La estimación también se imprime junto a las mediciones reales, para poder
+contrastarla.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_knapsack
+    python -m benchmarks.bench_knapsack --sizes 1500 15000 --legacy-max 15000
+    python -m benchmarks.bench_knapsack --legacy-timeout 600
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import routine_builder
+
+
+def knapsack_pick_lists(items: List[Dict[str, Any]], capacity: int, values: List[int]) -> List[int]:
+    """Implementación original: copia la lista de picks completa en cada mejora."""
+    n = len(items)
+    dp = [0] * (capacity + 1)
+    pick = [[False] * n for _ in range(capacity + 1)]
+    for i in range(n):
+        w = items[i]["time"]
+        v = values[i]
+        for t in range(capacity, w - 1, -1):
+            if dp[t - w] + v > dp[t]:
+                dp[t] = dp[t - w] + v
+                pick[t] = pick[t - w].copy()
+                pick[t][i] = True
+    best_t = max(range(capacity + 1), key=lambda x: dp[x])
+    return [i for i, chosen in enumerate(pick[best_t]) if chosen]
+
+
+def legacy_memory_estimate(n: int, capacity: int) -> int:
+    """Bytes de la tabla de `knapsack_pick_lists`: `capacity + 1` listas propias de `n` booleanos, más `dp`."""
+    row = sys.getsizeof([False] * n)
+    return (capacity + 1) * row + sys.getsizeof([None] * (capacity + 1)) + sys.getsizeof([0] * (capacity + 1))
+
+
+def synthetic_items(size: int, seed: int = 0):
+    """Replica los items reales hasta `size` y asigna valores pseudoaleatorios reproducibles."""
+    base = routine_builder.build_items(routine_builder.load_exercises())
+    rng = random.Random(seed)
+    items = [base[i % len(base)] for i in range(size)]
+    values = [rng.randint(1, 6) for _ in range(size)]
+    return items, values
+
+
+# solvers que deben devolver exactamente los mismos índices que la implementación original
+EXACT_SOLVERS = ("python", "numpy")
+
+
+def check_dataset_parity():
+    """Falla si algún solver exacto produce una rutina distinta a la de la implementación original."""
+    # la implementación original se registra solo mientras dura la comprobación
+    routine_builder.KNAPSACK_SOLVERS["picklists"] = knapsack_pick_lists
+    try:
+        for num_days in (3, 4, 5):
+            for level in range(5):
+                reference = routine_builder.generate_routine(num_days, 120, user_level=level, solver="picklists")
+                # plan_params guarda el solver usado: se compara el resto de la rutina
+                reference.pop("plan_params")
+                for name in EXACT_SOLVERS:
+                    routine = routine_builder.generate_routine(num_days, 120, user_level=level, solver=name)
+                    routine.pop("plan_params")
+                    if routine != reference:
+                        raise SystemExit(f"rutina distinta con solver={name} (días={num_days}, nivel={level})")
+    finally:
+        del routine_builder.KNAPSACK_SOLVERS["picklists"]
+    print(f"paridad OK en el dataset con la implementación original: {', '.join(EXACT_SOLVERS)}")
+
+
+def measure(solver, items, capacity, values):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    selected = solver(items, capacity, values)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return selected, elapsed, peak
+
+
+def _legacy_worker(size: int, seed: int, capacity: int, conn) -> None:
+    items, values = synthetic_items(size, seed)
+    conn.send(measure(knapsack_pick_lists, items, capacity, values))
+    conn.close()
+
+
+def measure_legacy_with_timeout(size: int, seed: int, capacity: int,
+                                timeout: float) -> Optional[Tuple[List[int], float, int]]:
+    """Mide la implementación original en otro proceso; None si no termina en `timeout` segundos."""
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_legacy_worker, args=(size, seed, capacity, sender), daemon=True)
+    proc.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        return None
+    finally:
+        proc.terminate()
+        proc.join()
+        receiver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1500, 15000, 150000])
+    parser.add_argument("--capacity", type=int, default=120)
+    parser.add_argument("--legacy-max", type=int, default=1500,
+                        help="tamaño máximo para ejecutar la implementación original en el proceso (es muy lenta)")
+    parser.add_argument("--legacy-timeout", type=float, default=60.0,
+                        help="límite en segundos de la implementación original por encima de --legacy-max "
+                             "(0: solo la estimación de memoria)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_dataset_parity()
+    solvers = {"backptr": routine_builder.knapsack_max_value}
+    if routine_builder.np is not None:
+        solvers["numpy"] = routine_builder.knapsack_numpy
+    solvers["grouped"] = routine_builder.knapsack_grouped
+
+    print(f"{'items':>8} {'solver':>10} {'tiempo (s)':>11} {'pico (MiB)':>11}")
+    for size in args.sizes:
+        items, values = synthetic_items(size, args.seed)
+        results = {}
+        for name, solver in solvers.items():
+            results[name] = measure(solver, items, args.capacity, values)
+        if size <= args.legacy_max:
+            results["picklists"] = measure(knapsack_pick_lists, items, args.capacity, values)
+        elif args.legacy_timeout > 0:
+            legacy = measure_legacy_with_timeout(size, args.seed, args.capacity, args.legacy_timeout)
+            if legacy is not None:
+                results["picklists"] = legacy
+        reference = results["backptr"][0]
+        best_value = sum(values[i] for i in reference)
+        for name, (selected, elapsed, peak) in results.items():
+            print(f"{size:>8} {name:>10} {elapsed:>11.3f} {peak / 2**20:>11.2f}")
+            if name == "grouped":
+                if sum(values[i] for i in selected) != best_value or \
+                        sum(items[i]["time"] for i in selected) > args.capacity:
+                    raise SystemExit(f"solución no óptima (grouped) con {size} items")
+            elif selected != reference:
+                raise SystemExit(f"selección distinta ({name}) con {size} items")
+        estimate = legacy_memory_estimate(size, args.capacity)
+        _, new_t, new_peak = results["backptr"]
+        if "picklists" in results:
+            _, old_t, old_peak = results["picklists"]
+            print(f"{'':>8} backptr vs picklists: x{old_t / new_t:.1f} tiempo, x{old_peak / max(new_peak, 1):.1f} memoria"
+                  f" (tabla estimada: {estimate / 2**20:.2f} MiB)")
+        else:
+            limit = f">{args.legacy_timeout:g}" if args.legacy_timeout > 0 else "-"
+            print(f"{size:>8} {'picklists':>10} {limit:>11} {estimate / 2**20:>7.2f} est.")
+            print(f"{'':>8} backptr vs picklists: x{estimate / max(new_peak, 1):.1f} memoria (estimada)")
+
+if __name__ == "__main__":
+    main()
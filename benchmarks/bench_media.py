@@ -0,0 +1,66 @@
+"""Benchmark de bytes de imagen por render de una rutina (`src.media`).
+
+Para una rutina generada compara cuántos bytes de imagen se transfieren al
+renderizarla:
+
+- antes: un GIF remoto completo por ejercicio (mismos archivos que `media/`);
+- GIF local completo, solo para los ítems desplegados (`--expanded`);
+- miniatura local (primer fotograma), solo para los ítems desplegados.
+
+También mide el tiempo de servir las imágenes en frío y con el LRU caliente.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_media
+    python -m benchmarks.bench_media --days 5 --expanded 0.5
+"""
+import argparse
+import os
+import random
+import time
+
+from src import catalog, media, routine_builder
+
+
+def routine_exercises(num_days, level):
+    routine = routine_builder.generate_routine(num_days, 120, user_level=level)
+    exercises = catalog.get_catalog()
+    return [exercises.get(ex["id"]) for key, items in routine["schedule"].items()
+            if not key.endswith("_meta") for ex in items]
+
+
+def render(store, expanded, thumbnail):
+    store.reset_stats()
+    t0 = time.perf_counter()
+    for ex in expanded:
+        store.image_source(ex, thumbnail=thumbnail)
+    return store.stats()["served"]["bytes"], time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--expanded", type=float, default=0.25,
+                        help="fracción de ítems que el usuario despliega")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    exercises = routine_exercises(args.days, args.level)
+    remote_bytes = sum(os.path.getsize(media.media_path(ex["exerciseId"])) for ex in exercises)
+    rng = random.Random(args.seed)
+    expanded = rng.sample(exercises, max(1, round(len(exercises) * args.expanded)))
+
+    print(f"{len(exercises)} ejercicios en la rutina, {len(expanded)} desplegados")
+    print(f"{'estrategia':<28} {'KB/render':>10} {'frío (ms)':>10} {'caliente (ms)':>14}")
+    print(f"{'antes: GIF remoto, todos':<28} {remote_bytes / 1024:>10.1f} {'-':>10} {'-':>14}")
+    for label, thumbnail in (("GIF local, desplegados", False), ("miniatura, desplegados", True)):
+        store = media.MediaStore()
+        sent, cold = render(store, expanded, thumbnail)
+        _, warm = render(store, expanded, thumbnail)
+        print(f"{label:<28} {sent / 1024:>10.1f} {cold * 1000:>10.2f} {warm * 1000:>14.3f}")
+    if media.Image is None:
+        print("(Pillow no está instalado: las miniaturas se sirven como GIF completo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark del optimizador grafo + DP frente al motor knapsack de `routine_builder`.
+
+Para cada escenario (tiempo de sesión, músculos objetivo, equipamiento) genera
+una sesión con `RoutineOptimizer.optimize_workout` y otra con
+`routine_builder.generate_routine(1, ...)` sobre el mismo catálogo (filtrado por
+equipamiento cuando corresponde), y compara:
+
+- tiempo (mediana de `--repeat` ejecuciones),
+- calidad: ambas rutinas se puntúan con la misma función objetivo del DP
+  (`RoutineOptimizer.score`), junto con los músculos cubiertos, los minutos
+  usados y las transiciones que no son aristas del grafo.
+
+El knapsack no conoce los músculos objetivo ni el orden de los ejercicios, así
+que en esos escenarios se espera que puntúe peor.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_optimizer
+    python -m benchmarks.bench_optimizer --budget-ms 200 --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from src import catalog, routine_builder
+from src.optimizer.routine_optimizer import RoutineOptimizer
+
+SCENARIOS = [
+    ("todo, 120 min", 120, None, None),
+    ("todo, 60 min", 60, None, None),
+    ("pecho/espalda, 90 min", 90, ["pectorals", "lats", "upper back"], None),
+    ("brazos, 120 min", 120, ["biceps", "triceps", "forearms"], None),
+    ("mancuernas+peso corporal, 120 min", 120, None, {"dumbbell", "body weight"}),
+    ("barra, piernas, 90 min", 90, ["quads", "hamstrings", "glutes", "calves"], {"barbell"}),
+]
+
+
+def filtered_catalog(equipment, tmpdir):
+    """Ruta a un exercises.json con solo los ejercicios compatibles con `equipment`."""
+    if equipment is None:
+        return catalog.DEFAULT_EXERCISES_PATH
+    exercises = [
+        ex for ex in catalog.load_exercises()
+        if not ex.get("equipments") or {e.lower() for e in ex["equipments"]} & equipment
+    ]
+    path = os.path.join(tmpdir, "exercises_" + "_".join(sorted(e.replace(" ", "-") for e in equipment)) + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([dict(ex) for ex in exercises], f)
+    return path
+
+
+def knapsack_session(minutes, exercises_path):
+    routine = routine_builder.generate_routine(1, time_per_session=minutes, exercises_path=exercises_path)
+    exercises = catalog.get_catalog(exercises_path)
+    session = []
+    for item in routine["schedule"]["day_1"]:
+        ex = exercises.get(item["id"]) or {}
+        session.append({**item, "equipments": ex.get("equipments", [])})
+    return session
+
+
+def timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    parser.add_argument("--max-states", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    optimizer = RoutineOptimizer(max_states=args.max_states, time_budget_ms=args.budget_ms)
+    print(f"{'escenario':<36} {'motor':>9} {'ms':>8} {'valor':>7} {'músc.':>6} {'min':>5} {'inval.':>6} {'exacto':>7}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, minutes, targets, equipment in SCENARIOS:
+            path = filtered_catalog(equipment, tmpdir)
+            knapsack_session(minutes, path)  # calentar el caché del catálogo
+            dp_routine, dp_ms = timed(
+                lambda: optimizer.optimize_workout(minutes, target_muscles=targets, equipment_available=equipment),
+                args.repeat,
+            )
+            exact = optimizer.last_stats["exact"]
+            ks_routine, ks_ms = timed(lambda: knapsack_session(minutes, path), args.repeat)
+
+            for engine, routine, ms, flag in (("dp", dp_routine, dp_ms, "sí" if exact else "no"),
+                                              ("knapsack", ks_routine, ks_ms, "-")):
+                score = optimizer.score(routine, target_muscles=targets)
+                if score["time_min"] > minutes:
+                    raise SystemExit(f"{engine} excede el tiempo en '{label}'")
+                print(f"{label:<36} {engine:>9} {ms:>8.1f} {score['value']:>7.2f} {score['muscles_covered']:>6} "
+                      f"{score['time_min']:>5} {score['invalid_transitions']:>6} {flag:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark del planificador de mesociclos (`src.periodization`).
+
+Compara planificar `--weeks` semanas con `plan_mesocycle` (estado arrastrado,
+tablas de items reutilizadas) frente a regenerar cada semana desde cero con
+`generate_routine` (limpiando el caché de tablas de items entre semanas), y
+muestra el tiempo hasta la primera semana y el coste por semana.
+
+Comprueba además que la primera semana del mesociclo coincide con
+`generate_routine`.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_periodization --weeks 12 --days 4
+"""
+import argparse
+import time
+
+from src import periodization, routine_builder
+
+EXTRA_KEYS = ("week", "deload", "volume_factor", "carried_sets", "carried_fatigue")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--level", type=int, default=1)
+    args = parser.parse_args()
+
+    routine_builder.load_exercises()
+    routine_builder.clear_item_cache()
+
+    t0 = time.perf_counter()
+    week_times = []
+    first = None
+    for week in periodization.plan_mesocycle(args.weeks, args.days, user_level=args.level):
+        week_times.append(time.perf_counter() - t0)
+        if first is None:
+            first = {k: v for k, v in week.items() if k not in EXTRA_KEYS}
+    mesocycle_s = week_times[-1]
+
+    t0 = time.perf_counter()
+    for _ in range(args.weeks):
+        routine_builder.clear_item_cache()
+        routine_builder.generate_routine(args.days, 120, user_level=args.level)
+    regenerate_s = time.perf_counter() - t0
+
+    if first != routine_builder.generate_routine(args.days, 120, user_level=args.level):
+        raise SystemExit("la semana 1 del mesociclo no coincide con generate_routine")
+
+    per_week = [b - a for a, b in zip([0.0] + week_times, week_times)]
+    steady = sum(per_week[1:]) / max(len(per_week) - 1, 1)
+    print(f"{args.weeks} semanas x {args.days} días")
+    print(f"mesociclo:            {mesocycle_s * 1000:>8.1f} ms (primera semana a los {week_times[0] * 1000:.1f} ms)")
+    print(f"coste por semana:     {steady * 1000:>8.1f} ms (semanas 2..{args.weeks})")
+    print(f"regenerar cada semana:{regenerate_s * 1000:>8.1f} ms (x{regenerate_s / mesocycle_s:.1f})")
+
+
+if __name__ == "__main__":
+    main()
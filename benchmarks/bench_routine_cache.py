@@ -0,0 +1,68 @@
+"""Benchmark del caché de rutinas (`src.routine_cache`).
+
+Recorre la grilla de parámetros de la página 'Mi rutina' (3/4/5 días x nivel
+0/1, 120 minutos) y mide, por combinación: generación sin caché, primer pedido
+(fallo, genera y guarda), aciertos en memoria y aciertos desde el nivel de
+disco (con la memoria vacía). Comprueba que las rutinas servidas desde el caché
+son iguales a las generadas.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_routine_cache --repeat 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from src import routine_builder, routine_cache
+
+GRID = [(days, level) for days in (3, 4, 5) for level in (0, 1)]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    routine_builder.load_exercises()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        routine_cache.configure(disk_dir=tmpdir)
+        routine_cache.invalidate()
+        rows = {"sin caché": [], "fallo": [], "acierto memoria": [], "acierto disco": []}
+        for days, level in GRID:
+            expected = routine_builder.generate_routine(days, 120, user_level=level)
+            rows["sin caché"].append(timed(lambda: routine_builder.generate_routine(days, 120, user_level=level), 3))
+            t0 = time.perf_counter()
+            routine_cache.generate_routine_cached(days, 120, user_level=level)
+            rows["fallo"].append(time.perf_counter() - t0)
+            rows["acierto memoria"].append(
+                timed(lambda: routine_cache.generate_routine_cached(days, 120, user_level=level), args.repeat))
+            if routine_cache.generate_routine_cached(days, 120, user_level=level) != expected:
+                raise SystemExit(f"rutina distinta desde memoria (días={days}, nivel={level})")
+
+        routine_cache.configure(maxsize=0)
+        for days, level in GRID:
+            rows["acierto disco"].append(
+                timed(lambda: routine_cache.generate_routine_cached(days, 120, user_level=level), args.repeat))
+            if routine_cache.generate_routine_cached(days, 120, user_level=level) != \
+                    routine_builder.generate_routine(days, 120, user_level=level):
+                raise SystemExit(f"rutina distinta desde disco (días={days}, nivel={level})")
+        routine_cache.configure(maxsize=routine_cache.ROUTINE_CACHE_SIZE)
+
+        print(f"{'caso':<18} {'mediana (µs)':>13}")
+        for name, samples in rows.items():
+            print(f"{name:<18} {statistics.median(samples) * 1e6:>13.1f}")
+        print(routine_cache.cache_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark de los agregados incrementales del seguimiento (`src.tracking_analytics`).
+
+Para cada tamaño de historial guarda N registros de un usuario (con
+`DatabaseManager.save_tracking`, que actualiza los agregados) y compara el coste
+de obtener el resumen del panel de progreso:
+
+- incremental: `get_tracking_analytics` (lee el documento de agregados);
+- recorrido completo: `get_tracking` + `tracking_analytics.rebuild` + `summary`.
+
+Comprueba además que ambos resultados coinciden, en los dos backends.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_tracking_analytics
+    python -m benchmarks.bench_tracking_analytics --sizes 100 1000 --backend sqlite
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_tracking_save import synthetic_record
+from src import routine_builder, tracking_analytics
+from src.database.db_manager import BACKENDS, DatabaseManager
+
+USERNAME = "bench"
+
+
+def fill(db: DatabaseManager, records: int, rng: random.Random) -> None:
+    routine = routine_builder.generate_routine(4, 120, user_level=1)
+    db.save_routine(USERNAME, routine)
+    names = [ex["name"] for key, items in routine["schedule"].items() if not key.endswith("_meta") for ex in items]
+    for i in range(records):
+        record = synthetic_record(rng)
+        record["exercises"] = {
+            name: dict(log, difficulty=rng.choice(list(tracking_analytics.DIFFICULTY_SCORE)))
+            for name, log in zip(rng.sample(names, min(6, len(names))), record["exercises"].values())
+        }
+        # claves de día distintas (historial largo) y algunas sobrescrituras
+        db.save_tracking(USERNAME, rng.randrange(max(1, records * 4 // 5)) if i % 5 == 4 else i, record)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--backend", choices=list(BACKENDS), nargs="+", default=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'registros':>9} {'backend':>7} {'incremental (ms)':>17} {'recorrido (ms)':>15}")
+    for records in args.sizes:
+        for backend in args.backend:
+            with tempfile.TemporaryDirectory() as data_dir:
+                db = DatabaseManager(data_dir, backend=backend)
+                fill(db, records, random.Random(args.seed))
+                incremental, inc_s = timed(lambda: db.get_tracking_analytics(USERNAME), args.repeat)
+                rescan, scan_s = timed(lambda: tracking_analytics.summary(tracking_analytics.rebuild(
+                    db.get_tracking(USERNAME), db.get_routine(USERNAME))), args.repeat)
+                db.close()
+            if incremental != rescan:
+                raise SystemExit(f"los agregados incrementales difieren del recorrido completo ({backend})")
+            print(f"{records:>9} {backend:>7} {inc_s * 1000:>17.2f} {scan_s * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark de latencia de `DatabaseManager.save_tracking` según el modo de almacenamiento.
+
+Para cada tamaño se genera un `tracking.json` sintético con N sesiones guardadas
+(repartidas en usuarios de `--days-per-user` días) y se mide la latencia de
+nuevos guardados en modo "json" (reescritura completa) y "log" (append-only).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_tracking_save
+    python -m benchmarks.bench_tracking_save --sizes 1000 10000 --saves 20
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+from src.database.db_manager import TRACKING_MODES, DatabaseManager
+
+
+def synthetic_record(rng: random.Random) -> dict:
+    return {
+        'date': '2025-11-09T20:35:47.731788',
+        'duration': rng.choice([60, 90, 120]),
+        'energy_level': 'Normal',
+        'exercises': {
+            f'ejercicio {k}': {
+                'sets_completed': rng.randint(0, 4),
+                'avg_reps': rng.randint(6, 12),
+                'difficulty': 'Moderado',
+                'target_sets': 4,
+                'target_reps': 10,
+            }
+            for k in range(6)
+        },
+        'notes': '',
+    }
+
+
+def write_fixture(data_dir: str, sessions: int, days_per_user: int, seed: int) -> int:
+    rng = random.Random(seed)
+    tracking = {}
+    for s in range(sessions):
+        tracking.setdefault(f'user{s // days_per_user}', {})[str(s % days_per_user)] = synthetic_record(rng)
+    with open(f'{data_dir}/tracking.json', 'w', encoding='utf-8') as f:
+        json.dump(tracking, f, indent=2)
+    return len(tracking)
+
+
+def bench(mode: str, sessions: int, args) -> list:
+    with tempfile.TemporaryDirectory() as data_dir:
+        users = write_fixture(data_dir, sessions, args.days_per_user, args.seed)
+        db = DatabaseManager(data_dir, tracking_mode=mode)
+        rng = random.Random(args.seed)
+        samples = []
+        for _ in range(args.saves):
+            record = synthetic_record(rng)
+            username = f'user{rng.randrange(users)}'
+            t0 = time.perf_counter()
+            db.save_tracking(username, rng.randrange(args.days_per_user), record)
+            samples.append(time.perf_counter() - t0)
+        return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--saves', type=int, default=5)
+    parser.add_argument('--days-per-user', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'sesiones':>9} {'modo':>5} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for sessions in args.sizes:
+        for mode in TRACKING_MODES:
+            samples = sorted(bench(mode, sessions, args))
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"{sessions:>9} {mode:>5} {statistics.median(samples) * 1000:>9.2f} {p95 * 1000:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark del grafo de transiciones precalculado (`src.transition_graph`).
+
+Mide:
+
+- construcción vectorizada (matrices de incidencia + productos por bloques),
+- construcción ingenua par a par en Python (sobre las primeras `--naive-rows`
+  filas, extrapolada al catálogo completo),
+- carga del `.npz` guardado (lo que paga cada proceso en el arranque).
+
+Antes de medir comprueba que ambas construcciones dan los mismos sucesores y
+pesos para las filas calculadas con el método ingenuo.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_transition_graph
+    python -m benchmarks.bench_transition_graph --naive-rows 1500 --k 16
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src import catalog, transition_graph
+
+
+def naive_row(exercises, i, k):
+    """Sucesores top-k de `i` recorriendo todos los pares en Python."""
+    a = exercises[i]
+    a_muscles = {m.lower() for m in a.get("targetMuscles", []) + a.get("secondaryMuscles", [])}
+    a_targets = {m.lower() for m in a.get("targetMuscles", [])}
+    a_eq = {e.lower() for e in a.get("equipments", [])}
+    scored = []
+    for j, b in enumerate(exercises):
+        if j == i:
+            continue
+        b_muscles = {m.lower() for m in b.get("targetMuscles", []) + b.get("secondaryMuscles", [])}
+        same_equipment = bool(a_eq & {e.lower() for e in b.get("equipments", [])})
+        if not same_equipment and a_targets & {m.lower() for m in b.get("targetMuscles", [])}:
+            continue
+        union = len(a_muscles | b_muscles)
+        jaccard = len(a_muscles & b_muscles) / union if union else 0.0
+        weight = transition_graph.MUSCLE_CHANGE_WEIGHT * (1.0 - jaccard) + \
+            transition_graph.EQUIPMENT_WEIGHT * same_equipment
+        scored.append((-round(weight, transition_graph.WEIGHT_DECIMALS), j))
+    scored.sort()
+    return [(j, -w) for w, j in scored[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=transition_graph.DEFAULT_TOP_K)
+    parser.add_argument("--naive-rows", type=int, default=150)
+    args = parser.parse_args()
+
+    exercises = catalog.load_exercises()
+    n = len(exercises)
+
+    t0 = time.perf_counter()
+    graph = transition_graph.build_transition_graph(exercises, args.k)
+    vectorized_s = time.perf_counter() - t0
+
+    rows = min(args.naive_rows, n)
+    t0 = time.perf_counter()
+    naive = [naive_row(exercises, i, args.k) for i in range(rows)]
+    naive_s = (time.perf_counter() - t0) * n / rows
+
+    for i, expected in enumerate(naive):
+        indices, weights = graph.neighbors(i)
+        got = list(zip(indices.tolist(), weights.tolist()))
+        if [j for j, _ in got] != [j for j, _ in expected] or \
+                any(abs(w - e) > 1e-5 for (_, w), (_, e) in zip(got, expected)):
+            raise SystemExit(f"sucesores distintos en la fila {i}")
+    print(f"paridad OK en {rows} filas")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "graph.npz")
+        graph.save(path)
+        t0 = time.perf_counter()
+        transition_graph.TransitionGraph.load(path)
+        load_s = time.perf_counter() - t0
+        size = os.path.getsize(path)
+
+    print(f"{n} ejercicios, k={args.k}, {len(graph.indices)} aristas, {size / 1024:.0f} KiB en disco")
+    print(f"{'construcción vectorizada':<32} {vectorized_s * 1000:>9.1f} ms")
+    print(f"{'construcción ingenua (estimada)':<32} {naive_s * 1000:>9.1f} ms  (x{naive_s / vectorized_s:.0f})")
+    print(f"{'carga del .npz':<32} {load_s * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Prueba de estrés multiproceso del backend JSON.
+
+Lanza `--processes` procesos que comparten un `data_dir` temporal y hacen
+`--ops` llamadas cada uno a `save_tracking` y `save_routine` en paralelo, con
+claves distintas por proceso y operación. Al terminar comprueba que no se haya
+perdido ninguna escritura y que los archivos sigan siendo JSON válido.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.stress_json_backend
+    python -m benchmarks.stress_json_backend --processes 16 --ops 250 --tracking-mode log
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+
+from src.database.db_manager import TRACKING_MODES, DatabaseManager
+
+
+def worker(data_dir: str, tracking_mode: str, proc: int, ops: int) -> int:
+    db = DatabaseManager(data_dir, tracking_mode=tracking_mode, backend="json")
+    for k in range(ops):
+        db.save_tracking(f"p{proc}", k, {"proc": proc, "op": k})
+        db.save_routine(f"p{proc}_{k}", {"schedule": {}, "proc": proc, "op": k})
+    return ops
+
+
+def check(data_dir: str, tracking_mode: str, processes: int, ops: int) -> list:
+    db = DatabaseManager(data_dir, tracking_mode=tracking_mode, backend="json")
+    missing = []
+    for proc in range(processes):
+        tracking = db.get_tracking(f"p{proc}")
+        for k in range(ops):
+            record = tracking.get(str(k))
+            if not record or record.get("op") != k or record.get("proc") != proc:
+                missing.append(("tracking", proc, k))
+            routine = db.get_routine(f"p{proc}_{k}")
+            if not routine or routine.get("op") != k or routine.get("proc") != proc:
+                missing.append(("routine", proc, k))
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=150, help="llamadas de cada tipo por proceso")
+    parser.add_argument("--tracking-mode", choices=TRACKING_MODES, default="json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        DatabaseManager(data_dir, tracking_mode=args.tracking_mode, backend="json")
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            pool.starmap(worker, [(data_dir, args.tracking_mode, p, args.ops) for p in range(args.processes)])
+        elapsed = time.perf_counter() - t0
+        missing = check(data_dir, args.tracking_mode, args.processes, args.ops)
+
+    total = 2 * args.processes * args.ops
+    print(f"{total} escrituras en {elapsed:.1f} s desde {args.processes} procesos "
+          f"(tracking_mode={args.tracking_mode}): {len(missing)} perdidas")
+    if missing:
+        print("primeras perdidas:", missing[:10])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
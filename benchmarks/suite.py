@@ -0,0 +1,327 @@
+"""Suite de benchmarks con resultados en JSON (p50/p95 y RSS pico) y comparación entre corridas.
+
+Casos, todos con semilla fija y datos sintéticos:
+
+- `load_exercises`, `build_items`, `knapsack_max_value` y `generate_routine`
+  (3, 4 y 5 días) sobre el catálogo incluido y sobre catálogos sintéticos
+  `--catalog-scales` veces más grandes (ejercicios replicados con ids nuevos);
+- cada método de `DatabaseManager` (incluido `get_current_day_exercises`) con
+  `--users` usuarios, en cada backend. Los datos se escriben directamente como
+  archivos JSON (y se migran a SQLite), para no pagar N guardados al poblar.
+  Todos los usuarios tienen perfil y un día de seguimiento; la rutina completa
+  solo la tienen los primeros `ROUTINE_USERS` (con 100k rutinas el fixture
+  pesaría ~1 GB).
+
+Cada caso se repite `--repeat` veces (`--db-repeat` para la base de datos) y se
+reportan p50, p95 y media en ms, más el RSS pico del proceso al terminar el
+caso (es un máximo acumulado: los casos se ejecutan en el orden listado).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.suite run --out results.json
+    python -m benchmarks.suite run --quick --only generate_routine --out new.json
+    python -m benchmarks.suite compare results.json new.json --threshold 0.1
+
+`compare` marca como regresión todo caso cuyo p50 empeore más de `--threshold`
+(fracción) y más de `--min-delta-ms`, y termina con código 1 si hay alguna.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: sin RSS pico
+    resource = None
+
+from src import catalog, routine_builder
+from src.database.db_manager import BACKENDS, DatabaseManager
+from src.database.sqlite_backend import SqliteBackend
+
+DEFAULT_USERS = [10, 1000, 100000]
+QUICK_USERS = [10, 1000]
+DEFAULT_CATALOG_SCALES = [1, 10]
+ROUTINE_USERS = 1000
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS lo da en bytes
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+class Suite:
+    def __init__(self, args):
+        self.args = args
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.args.only or any(part in name for part in self.args.only)
+
+    def measure(self, name: str, fn: Callable[[int], Any], repeat: int,
+                setup: Callable[[], Any] = None) -> None:
+        if not self.wanted(name):
+            return
+        samples = []
+        for i in range(repeat):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn(i)
+            samples.append(time.perf_counter() - t0)
+        self.results[name] = summarize(samples)
+        r = self.results[name]
+        print(f"{name:<58} p50 {r['p50_ms']:>10.3f} ms  p95 {r['p95_ms']:>10.3f} ms", flush=True)
+
+
+# --- catálogo y generación ---
+
+def write_scaled_catalog(path: str, scale: int) -> None:
+    """Catálogo sintético: `exercises.json` replicado `scale` veces con ids y nombres nuevos."""
+    base = catalog.load_exercises()
+    exercises = []
+    for k in range(scale):
+        for ex in base:
+            copy = dict(ex)
+            if k:
+                copy["exerciseId"] = f"{ex['exerciseId']}_{k}"
+                copy["name"] = f"{ex['name']} ({k})"
+            exercises.append(copy)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(exercises, f, ensure_ascii=False)
+
+
+def bench_generation(suite: Suite, tmp_dir: str) -> None:
+    args = suite.args
+    for scale in args.catalog_scales:
+        path = None
+        if scale != 1:
+            path = os.path.join(tmp_dir, f"exercises_x{scale}.json")
+            write_scaled_catalog(path, scale)
+        tag = f"scale={scale}"
+
+        suite.measure(f"load_exercises[{tag}]", lambda i: routine_builder.load_exercises(path),
+                      args.repeat, setup=catalog.clear_cache)
+        exercises = routine_builder.load_exercises(path)
+        suite.measure(f"build_items[{tag}]", lambda i: routine_builder.build_items(exercises, 2), args.repeat)
+
+        items = routine_builder.build_items(exercises, 2)
+        rng = random.Random(args.seed)
+        values = [rng.randint(1, 6) for _ in items]
+        suite.measure(f"knapsack_max_value[{tag}]",
+                      lambda i: routine_builder.knapsack_max_value(items, 120, values), args.repeat)
+
+        for days in (3, 4, 5):
+            # tablas de items en frío: mide la generación completa, no el caché
+            suite.measure(f"generate_routine[days={days},{tag}]",
+                          lambda i: routine_builder.generate_routine(days, 120, path, user_level=2),
+                          args.repeat, setup=routine_builder.clear_item_cache)
+        catalog.clear_cache()
+        routine_builder.clear_item_cache()
+
+
+# --- base de datos ---
+
+DB_OPS = ("register_user", "validate_login", "save_profile", "get_profile", "save_tracking", "get_tracking",
+          "get_tracking_day", "get_tracking_analytics", "save_routine", "get_routine",
+          "get_current_day_exercises", "flush")
+
+
+def synthetic_tracking(rng: random.Random, exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "date": "2025-11-09T20:35:47.731788",
+        "duration": 120,
+        "energy_level": "Normal",
+        "exercises": {
+            ex["name"]: {"sets_completed": rng.randint(0, ex["sets"]), "avg_reps": ex["reps"],
+                         "difficulty": "Moderado", "target_sets": ex["sets"], "target_reps": ex["reps"]}
+            for ex in exercises
+        },
+        "notes": "",
+    }
+
+
+def write_db_fixture(data_dir: str, users: int, routine: Dict[str, Any], seed: int) -> None:
+    rng = random.Random(seed)
+    day_exercises = routine["schedule"]["day_1"][:3]
+    now = datetime(2025, 11, 9).isoformat()
+    docs = {"users.json": {}, "tracking.json": {}, "routines.json": {}}
+    for u in range(users):
+        name = f"user{u}"
+        docs["users.json"][name] = {"password": "pw", "created_at": now,
+                                    "profile": {"age": 30, "environment": "Gimnasio", "years": 2.0,
+                                                "sessions_per_week": "4-5"}}
+        docs["tracking.json"][name] = {"0": synthetic_tracking(rng, day_exercises)}
+        if u < ROUTINE_USERS:
+            docs["routines.json"][name] = {"routine": routine, "updated_at": now}
+    for filename, doc in docs.items():
+        with open(os.path.join(data_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False)
+
+
+def open_db(backend: str, fixture_dir: str, data_dir: str) -> DatabaseManager:
+    if backend == "sqlite":
+        sqlite = SqliteBackend(data_dir)
+        sqlite.migrate_from_json(fixture_dir)
+        return DatabaseManager(data_dir, backend=sqlite)
+    shutil.copytree(fixture_dir, data_dir)
+    return DatabaseManager(data_dir, backend=backend)
+
+
+def bench_db(suite: Suite, tmp_dir: str) -> None:
+    args = suite.args
+    routine = routine_builder.generate_routine(4, 120, user_level=2)
+    for users in args.users:
+        fixture_dir = os.path.join(tmp_dir, f"fixture_{users}")
+        os.makedirs(fixture_dir)
+        write_db_fixture(fixture_dir, users, routine, args.seed)
+        with_routine = min(users, ROUTINE_USERS)
+        for backend in args.backends:
+            prefix = f"db.{backend}"
+            tag = f"users={users}"
+            if not any(suite.wanted(f"{prefix}.{op}[{tag}]") for op in DB_OPS):
+                continue
+            data_dir = os.path.join(tmp_dir, f"{backend}_{users}")
+            db = open_db(backend, fixture_dir, data_dir)
+            rng = random.Random(args.seed)
+            day_exercises = routine["schedule"]["day_1"][:3]
+
+            def user(i, pool=users):
+                return f"user{rng.randrange(pool)}"
+
+            ops = {
+                "register_user": lambda i: db.register_user(f"new{i}", "pw"),
+                "validate_login": lambda i: db.validate_login(user(i), "pw"),
+                "save_profile": lambda i: db.save_profile(user(i), {"age": 31, "environment": "En casa"}),
+                "get_profile": lambda i: db.get_profile(user(i)),
+                "save_tracking": lambda i: db.save_tracking(user(i, with_routine), rng.randrange(4),
+                                                            synthetic_tracking(rng, day_exercises)),
+                "get_tracking": lambda i: db.get_tracking(user(i)),
+                "get_tracking_day": lambda i: db.get_tracking(user(i), 0),
+                "get_tracking_analytics": lambda i: db.get_tracking_analytics(user(i, with_routine)),
+                "save_routine": lambda i: db.save_routine(user(i, with_routine), routine),
+                "get_routine": lambda i: db.get_routine(user(i, with_routine)),
+                "get_current_day_exercises": lambda i: db.get_current_day_exercises(user(i, with_routine),
+                                                                                    rng.randrange(4)),
+                "flush": lambda i: db.flush(),
+            }
+            for op in DB_OPS:
+                suite.measure(f"{prefix}.{op}[{tag}]", ops[op], args.db_repeat)
+            db.close()
+
+
+def run(args) -> None:
+    suite = Suite(args)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_generation(suite, tmp_dir)
+        bench_db(suite, tmp_dir)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "db_repeat": args.db_repeat,
+            "users": args.users,
+            "catalog_scales": args.catalog_scales,
+            "backends": args.backends,
+            "elapsed_s": round(time.perf_counter() - started, 3),
+            "peak_rss_kb": peak_rss_kb(),
+        },
+        "results": suite.results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"resultados en {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+# --- comparación ---
+
+def compare(args) -> int:
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    regressions = []
+    print(f"{'caso':<58} {'base p50':>10} {'nuevo p50':>10} {'cambio':>8}")
+    for name in sorted(set(base) & set(new)):
+        before, after = base[name]["p50_ms"], new[name]["p50_ms"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > args.threshold and after - before > args.min_delta_ms
+        improved = change < -args.threshold and before - after > args.min_delta_ms
+        flag = "REGRESIÓN" if regressed else ("mejora" if improved else "")
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<58} {before:>10.3f} {after:>10.3f} {change * 100:>+7.1f}% {flag}")
+    for name in sorted(set(base) - set(new)):
+        print(f"{name:<58} (solo en base)")
+    for name in sorted(set(new) - set(base)):
+        print(f"{name:<58} (nuevo)")
+    if regressions:
+        print(f"\n{len(regressions)} regresiones (umbral {args.threshold * 100:.0f}%, "
+              f"mínimo {args.min_delta_ms} ms)")
+        return 1
+    print("\nsin regresiones")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="ejecutar la suite")
+    run_parser.add_argument("--out", help="archivo JSON de resultados (por defecto, stdout)")
+    run_parser.add_argument("--users", type=int, nargs="+", default=None)
+    run_parser.add_argument("--catalog-scales", type=int, nargs="+", default=DEFAULT_CATALOG_SCALES)
+    run_parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    run_parser.add_argument("--repeat", type=int, default=10)
+    run_parser.add_argument("--db-repeat", type=int, default=20)
+    run_parser.add_argument("--only", nargs="+", help="solo los casos cuyo nombre contenga alguno de estos textos")
+    run_parser.add_argument("--quick", action="store_true",
+                            help=f"usuarios {QUICK_USERS} y menos repeticiones (para comprobaciones rápidas)")
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    cmp_parser = sub.add_parser("compare", help="comparar dos archivos de resultados")
+    cmp_parser.add_argument("base")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--threshold", type=float, default=0.10)
+    cmp_parser.add_argument("--min-delta-ms", type=float, default=0.05)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+    if args.users is None:
+        args.users = QUICK_USERS if args.quick else DEFAULT_USERS
+    if args.quick:
+        args.repeat, args.db_repeat = min(args.repeat, 3), min(args.db_repeat, 5)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 """Página de perfil y generación de rutina."""
 import streamlit as st
 import json
-from src import routine_builder
+from src import catalog, media
 from src.database.db_manager import DatabaseManager
-from src.session.session import check_login_state
+from src.session.session import check_login_state, render_timer
 
 def init_session_state():
     """Inicializa variables de sesión específicas del perfil."""
@@ -109,6 +109,9 @@ def show_profile_page():
                 'years': years,
                 'sessions_per_week': sessions,
             }
+            if 'level' in existing_profile:
+                # nivel de la última rutina generada (ver 'Mi rutina')
+                user_profile['level'] = existing_profile['level']
             st.session_state['user_profile'] = user_profile
             st.session_state['profile_calculated'] = True
 
@@ -168,12 +171,14 @@ def show_profile_page():
     if not routine:
         st.info("No tienes una rutina guardada. Ve a 'Mi rutina' para generar una.")
     else:
-        exercises = routine_builder.load_exercises()
+        # búsqueda por id O(1) compartida por todo el proceso
+        exercises = catalog.get_catalog()
         show_instructions = st.checkbox("Mostrar instrucciones de los ejercicios", value=True)
+        thumbnails = st.checkbox("Imágenes en miniatura (primer fotograma)", value=True)
 
         # Mostrar rutina
         col1, col2 = st.columns([2, 1])
-        with col1:
+        with col1, render_timer("perfil_plan_semanal") as timing:
             st.subheader("Plan semanal")
             schedule = routine.get("schedule", {})
             for day_key in sorted(k for k in schedule.keys() if not k.endswith("_meta")):
@@ -182,12 +187,16 @@ def show_profile_page():
                 items = schedule.get(day_key, [])
                 if not items:
                     st.write("(Sin ejercicios para este día)")
-                for ex in items:
-                    ex_raw = next((e for e in exercises if e.get("exerciseId") == ex.get("id")), None)
+                for i, ex in enumerate(items):
+                    ex_raw = exercises.get(ex.get("id"))
+                    timing['items'] += 1
                     cols = st.columns([1, 4])
                     with cols[0]:
-                        if ex_raw and ex_raw.get("gifUrl"):
-                            st.image(ex_raw.get("gifUrl"), use_container_width=True)
+                        # la imagen (local, desde media/) solo se carga para los ítems desplegados
+                        if ex_raw and st.toggle("Imagen", key=f"img_{day_key}_{i}"):
+                            image = media.image_source(ex_raw, thumbnail=thumbnails)
+                            if image is not None:
+                                st.image(image, use_container_width=True)
                         else:
                             st.write("")
                     with cols[1]:
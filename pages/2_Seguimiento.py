@@ -3,6 +3,7 @@ import streamlit as st
 from datetime import datetime, timedelta
 from src.database.db_manager import DatabaseManager
 from src.session.session import check_login_state
+from src import routine_builder
 
 def get_day_exercises(db: DatabaseManager, username: str, day_index: int):
     """Obtiene los ejercicios del día desde la rutina guardada."""
@@ -99,7 +100,10 @@ def show_tracking_page():
                 'avg_reps': avg_reps,
                 'difficulty': difficulty,
                 'target_sets': ex['sets'],
-                'target_reps': ex['reps']
+                'target_reps': ex['reps'],
+                # objetivos del día tal como estaban en la rutina (ver src.tracking_analytics)
+                'muscles': list(ex.get('muscles') or []),
+                'stamina_costs': dict(ex.get('stamina_costs') or {}),
             }
         
         # Notas adicionales
@@ -123,6 +127,23 @@ def show_tracking_page():
             
             if db.save_tracking(username, selected_day['index'], tracking_data):
                 st.success("✅ Seguimiento guardado exitosamente")
+
+                # Re-planificar solo los días que quedan de la semana con lo registrado
+                routine = db.get_routine(username)
+                if routine:
+                    # los registros anteriores a la rutina son de otras semanas; la rutina
+                    # re-planificada conserva su fecha para que esta semana siga contando
+                    since = db.get_routine_updated_at(username)
+                    # nivel del perfil; sin él, el de plan_params o, en rutinas anteriores
+                    # a plan_params, el nivel elegido en esta sesión
+                    user_level = (db.get_profile(username) or {}).get('level')
+                    if user_level is None and 'plan_params' not in routine:
+                        user_level = st.session_state.get('user_level_slider')
+                    replanned = routine_builder.replan_routine(routine, db.get_tracking(username),
+                                                               user_level=user_level, since=since)
+                    db.save_routine(username, replanned, updated_at=since)
+                    if replanned['replanned_from_day'] <= replanned['plan_params']['num_days']:
+                        st.caption(f"Rutina actualizada a partir del día {replanned['replanned_from_day']}")
                 
                 # Mostrar resumen
                 st.subheader("📊 Resumen del entrenamiento")
@@ -150,5 +171,38 @@ def show_tracking_page():
                 if notes:
                     st.caption(f"Notas: {notes}")
 
+    show_progress(db, username)
+
+
+def show_progress(db: DatabaseManager, username: str):
+    """Progreso acumulado, desde los agregados incrementales (sin recorrer el historial)."""
+    analytics = db.get_tracking_analytics(username)
+    if not analytics['sessions']:
+        return
+    st.subheader("📈 Progreso")
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Sesiones registradas", analytics['sessions'])
+    with cols[1]:
+        st.metric("Cumplimiento total", f"{analytics['completion_rate'] or 0:.1f}%")
+    with cols[2]:
+        avg = analytics['avg_difficulty']
+        st.metric("Dificultad media (1-5)", f"{avg:.2f}" if avg is not None else "-")
+
+    trend = analytics['trend']
+    st.line_chart({
+        "Cumplimiento (%)": [w['completion_rate'] or 0 for w in trend],
+        "Dificultad media x20": [(w['avg_difficulty'] or 0) * 20 for w in trend],
+    })
+    st.caption("Semanas: " + ", ".join(w['week'] for w in trend))
+
+    last_week = trend[-1]['week']
+    volume = analytics['weekly_volume'][last_week]
+    stamina = analytics['weekly_stamina'][last_week]
+    if volume:
+        st.markdown(f"**Volumen de la semana {last_week}**")
+        st.table([{"Músculo": m, "Sets": sets, "Estamina estimada": stamina.get(m, 0)}
+                  for m, sets in sorted(volume.items(), key=lambda kv: -kv[1])])
+
 if __name__ == "__main__":
     show_tracking_page()
\ No newline at end of file
@@ -1,9 +1,14 @@
 """Página 'Mi rutina' - muestra resumen de la rutina generada para el usuario."""
 import streamlit as st
 import json
+import time
 from src.database.db_manager import DatabaseManager
-from src.session.session import check_login_state
-from src import routine_builder
+from src.session.session import check_login_state, render_timer
+from src import catalog, jobs, media, periodization
+
+
+# intervalo de consulta del trabajo de generación en curso
+JOB_POLL_SECONDS = 0.3
 
 
 def _ensure_session_keys():
@@ -15,6 +20,34 @@ def _ensure_session_keys():
         st.session_state['profile_calculated'] = False
 
 
+def _show_routine_job(db: DatabaseManager, username: str):
+    """Progreso de la generación en curso: muestra los días ya resueltos y vuelve a consultar."""
+    job = jobs.get_job(st.session_state['routine_job'])
+    if job is None:
+        # descartado de la tabla de trabajos (acotada): habrá que volver a pedirlo
+        st.session_state.pop('routine_job')
+        st.warning("La generación se perdió; pulsa 'Generar rutina' de nuevo.")
+        return
+    if job['status'] == jobs.ERROR:
+        st.session_state.pop('routine_job')
+        st.error(f"No se pudo generar la rutina: {job['error']}")
+        return
+    if job['status'] == jobs.DONE:
+        st.session_state.pop('routine_job')
+        db.save_routine(username, job['result'])
+        st.success("Rutina generada y guardada en tu perfil")
+        # recargar la página para mostrar la nueva rutina
+        st.rerun()
+
+    st.progress(job['days_done'] / job['days_total'] if job['days_total'] else 0.0,
+                text=f"Generando rutina... {job['days_done']}/{job['days_total']} días")
+    for day_key, items in job['schedule'].items():
+        names = ", ".join(ex['name'] for ex in items) or "(Sin ejercicios para este día)"
+        st.markdown(f"**{day_key.replace('_', ' ').title()}:** {names}")
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
+
+
 def show_my_routine():
     st.title("Mi rutina")
 
@@ -49,18 +82,33 @@ def show_my_routine():
             st.rerun()
 
     show_instructions = st.checkbox("Mostrar instrucciones de los ejercicios", value=True)
+    thumbnails = st.checkbox("Imágenes en miniatura (primer fotograma)", value=False)
     generate = st.button("Generar rutina")
 
-    # Generar rutina cuando el usuario pulsa el botón
+    # Generar rutina cuando el usuario pulsa el botón: se encola en segundo plano
+    # (src.jobs, con caché y deduplicación) y la página consulta su progreso
     if generate:
-        with st.spinner("Generando rutina..."):
-            # usar nivel guardado en session state en caso de cambio
+        # usar nivel guardado en session state en caso de cambio
+        user_level = st.session_state.get('user_level_slider', 0)
+        # el nivel queda en el perfil: Seguimiento re-planifica la semana con él
+        profile = db.get_profile(username)
+        if profile:
+            db.save_profile(username, {**profile, 'level': user_level})
+        st.session_state['routine_job'] = jobs.submit_routine(days, time_per_session=120, user_level=user_level)
+
+    if st.session_state.get('routine_job'):
+        _show_routine_job(db, username)
+
+    with st.expander("Mesociclo (varias semanas)"):
+        weeks = st.number_input("Semanas", min_value=2, max_value=24, value=12, step=1)
+        if st.button("Generar mesociclo"):
             user_level = st.session_state.get('user_level_slider', 0)
-            routine = routine_builder.generate_routine(days, time_per_session=120, user_level=user_level)
-            db.save_routine(username, routine)
-        st.success("Rutina generada y guardada en tu perfil")
-        # recargar la página para mostrar la nueva rutina
-        st.rerun()
+            # las semanas se muestran a medida que se generan
+            for week in periodization.plan_mesocycle(int(weeks), days, time_per_session=120, user_level=user_level):
+                label = "descarga" if week['deload'] else f"volumen x{week['volume_factor']:.1f}"
+                n_exercises = sum(len(v) for k, v in week['schedule'].items() if not k.endswith('_meta'))
+                st.markdown(f"**Semana {week['week']}** ({label}): {n_exercises} ejercicios, "
+                            f"{sum(week['weekly_sets_done'].values())} sets")
 
     # Nivel quiz (copiado de Perfil) - se muestra aquí cuando corresponde
     if st.session_state.get('show_level_quiz', False):
@@ -92,6 +140,9 @@ def show_my_routine():
                 'years': years,
                 'sessions_per_week': sessions,
             }
+            if 'level' in existing_profile:
+                # nivel de la última rutina generada (ver 'Mi rutina')
+                user_profile['level'] = existing_profile['level']
             st.session_state['user_profile'] = user_profile
             st.session_state['profile_calculated'] = True
 
@@ -160,34 +211,52 @@ def show_my_routine():
         m = re.search(r"(\d+)", k)
         return int(m.group(1)) if m else k
 
-    for day_key in sorted(day_keys, key=day_sort_key):
-        meta = schedule.get(day_key + '_meta', {})
-        st.markdown(f"### {day_key.replace('_', ' ').title()} — Tiempo total: {meta.get('total_time_min', 0)} min")
-        items = schedule.get(day_key, [])
-        if not items:
-            st.write("(Sin ejercicios para este día)")
-            continue
-
-        for ex in items:
-            # algunos generadores usan 'time_min' o 'time'
-            time_min = ex.get('time_min') or ex.get('time') or ex.get('duration') or 0
-            reps = ex.get('reps') or ex.get('target_reps') or 10
-            sets = ex.get('sets') or 3
-            name = ex.get('name') or ex.get('id')
-            muscles = ex.get('muscles') or ex.get('targetMuscles') or []
-
-            cols = st.columns([3, 1, 1, 2])
-            with cols[0]:
-                st.markdown(f"**{name}**")
-                st.markdown(f"_Músculos:_ {', '.join(muscles)}")
-            with cols[1]:
-                st.markdown(f"**{sets}x**")
-            with cols[2]:
-                st.markdown(f"**{reps}** reps")
-            with cols[3]:
-                st.markdown(f"{time_min} min")
-
-        st.write("---")
+    # búsqueda por id O(1) compartida con la página de Perfil
+    exercises = catalog.get_catalog()
+
+    with render_timer("mi_rutina_resumen") as timing:
+        for day_key in sorted(day_keys, key=day_sort_key):
+            meta = schedule.get(day_key + '_meta', {})
+            st.markdown(f"### {day_key.replace('_', ' ').title()} — Tiempo total: {meta.get('total_time_min', 0)} min")
+            items = schedule.get(day_key, [])
+            if not items:
+                st.write("(Sin ejercicios para este día)")
+                continue
+
+            for i, ex in enumerate(items):
+                # algunos generadores usan 'time_min' o 'time'
+                time_min = ex.get('time_min') or ex.get('time') or ex.get('duration') or 0
+                reps = ex.get('reps') or ex.get('target_reps') or 10
+                sets = ex.get('sets') or 3
+                name = ex.get('name') or ex.get('id')
+                muscles = ex.get('muscles') or ex.get('targetMuscles') or []
+                ex_raw = exercises.get(ex.get('id'))
+                timing['items'] += 1
+
+                cols = st.columns([3, 1, 1, 2])
+                with cols[0]:
+                    st.markdown(f"**{name}**")
+                    st.markdown(f"_Músculos:_ {', '.join(muscles)}")
+                with cols[1]:
+                    st.markdown(f"**{sets}x**")
+                with cols[2]:
+                    st.markdown(f"**{reps}** reps")
+                with cols[3]:
+                    st.markdown(f"{time_min} min")
+                if show_instructions and ex_raw:
+                    instr = ex_raw.get('instructions') or []
+                    if instr:
+                        with st.expander("Ver instrucciones"):
+                            # el cuerpo del expander se ejecuta aunque esté cerrado: la imagen
+                            # (local, desde media/) se carga solo si el usuario la pide
+                            if st.toggle("Ver imagen", key=f"img_{day_key}_{i}"):
+                                image = media.image_source(ex_raw, thumbnail=thumbnails)
+                                if image is not None:
+                                    st.image(image, width=200)
+                            for step in instr:
+                                st.write(step)
+
+            st.write("---")
 
     # Resumen y descarga
     st.subheader("Exportar rutina")
@@ -0,0 +1,73 @@
+"""Página de administración: spans y contadores de la instrumentación (src.instrumentation)."""
+import json
+import os
+
+import streamlit as st
+
+from src import instrumentation
+from src.session.session import check_login_state
+
+# Usuarios con acceso (separados por comas); si no está definida, cualquier usuario con sesión
+ADMIN_USERS_ENV = "MUSCLERPG_ADMIN_USERS"
+
+
+def show_admin_page():
+    st.title("Instrumentación")
+
+    username = check_login_state()
+    admins = [u.strip() for u in os.environ.get(ADMIN_USERS_ENV, "").split(",") if u.strip()]
+    if admins and username not in admins:
+        st.error("No tienes acceso a esta página.")
+        st.stop()
+
+    snapshot = instrumentation.snapshot()
+    cols = st.columns([2, 1])
+    with cols[0]:
+        if snapshot["enabled"]:
+            st.success(f"Activa (${instrumentation.INSTRUMENTATION_ENV}="
+                       f"{os.environ.get(instrumentation.INSTRUMENTATION_ENV, 'memory')})")
+        else:
+            st.info(f"Desactivada. Se activa con ${instrumentation.INSTRUMENTATION_ENV} "
+                    "(memory, jsonl:<ruta> o prometheus:<ruta>) o con el botón.")
+    with cols[1]:
+        if snapshot["enabled"]:
+            if st.button("Desactivar"):
+                instrumentation.configure(False)
+                st.rerun()
+        elif st.button("Activar (memoria)"):
+            instrumentation.configure(True, "memory")
+            st.rerun()
+        if st.button("Reiniciar contadores"):
+            instrumentation.reset()
+            st.rerun()
+
+    if not snapshot["spans"]:
+        st.write("Aún no hay spans registrados.")
+        return
+
+    st.subheader("Totales por span")
+    st.table([
+        {"span": name, "llamadas": t["count"], "total (ms)": round(t["seconds"] * 1000, 2),
+         "media (ms)": round(t["seconds"] * 1000 / t["count"], 3)}
+        for name, t in sorted(snapshot["spans"].items(), key=lambda kv: -kv[1]["seconds"])
+    ])
+    if snapshot["counters"]:
+        st.subheader("Contadores")
+        st.table([{"contador": name, "valor": value} for name, value in sorted(snapshot["counters"].items())])
+
+    st.subheader("Spans recientes")
+    limit = st.slider("Cantidad", 10, instrumentation.RECENT_SPANS, 50, step=10)
+    name_filter = st.text_input("Filtrar por nombre (p. ej. db. o knapsack)")
+    spans = [s for s in instrumentation.recent_spans() if name_filter in s["name"]][:limit]
+    st.dataframe([
+        {"span": s["name"], "ms": round(s["ms"], 3), "padre": s["parent"] or "",
+         "atributos": json.dumps({k: v for k, v in s.items() if k not in ("name", "ms", "parent", "start")},
+                                 ensure_ascii=False, default=str)}
+        for s in spans
+    ], use_container_width=True)
+    st.download_button("Descargar métricas (Prometheus)", instrumentation.prometheus_text(),
+                       file_name="musclerpg_metrics.prom", mime="text/plain")
+
+
+if __name__ == '__main__':
+    show_admin_page()
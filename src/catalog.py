@@ -0,0 +1,196 @@
+"""Catálogo de ejercicios cargado una vez por proceso.
+
+`exercises.json` se parsea la primera vez que se pide y se reutiliza en las
+llamadas siguientes (y en cada rerun de Streamlit, que comparte el proceso).
+Si cambia el mtime del archivo, el catálogo se vuelve a cargar.
+
+Si junto al JSON existe un snapshot binario más reciente (ver
+`src.catalog_snapshot`), se carga el snapshot en lugar de parsear el JSON. Al
+recargar o descartar un catálogo se cierra el mmap de su snapshot.
+
+El grafo de transiciones precalculado (ver `src.transition_graph`) se expone
+como `get_catalog().transition_graph`.
+
+Los ejercicios devueltos son compartidos entre todos los llamadores: deben
+tratarse como solo lectura.
+"""
+import hashlib
+import json
+import os
+import threading
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src import catalog_snapshot, instrumentation
+from src.records import intern_all
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data-exercises")
+DEFAULT_EXERCISES_PATH = os.path.join(DATA_DIR, "exercises.json")
+
+
+def file_sha256(path: str) -> str:
+    """sha256 (hex) del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_by(exercises: List[Dict[str, Any]], field: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Agrupa ejercicios por cada valor (en minúsculas) de un campo lista."""
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    for ex in exercises:
+        for key in ex.get(field, []):
+            index.setdefault(key.lower(), []).append(ex)
+    return index
+
+
+def _intern_list_fields(exercises: List[Dict[str, Any]]) -> None:
+    """Interna músculos, partes del cuerpo y equipamiento: unas decenas de cadenas repetidas en todo el catálogo."""
+    for ex in exercises:
+        for field in catalog_snapshot.LIST_FIELDS:
+            if isinstance(ex.get(field), list):
+                ex[field] = list(intern_all(ex[field]))
+
+
+class ExerciseCatalog:
+    """Ejercicios parseados más índices por id, músculo objetivo, parte del cuerpo y equipamiento."""
+
+    def __init__(self, path: str, exercises: List[Dict[str, Any]], stamp: Tuple, source: str = "json",
+                 snapshot: Optional[catalog_snapshot.CatalogSnapshot] = None):
+        self.path = path
+        # (mtime del JSON, mtime del snapshot o None): si cambia, hay que recargar
+        self.stamp = stamp
+        self.source = source
+        self.exercises = exercises
+        self.snapshot = snapshot
+
+    def close(self) -> None:
+        """Cierra el snapshot (si se cargó de uno); no hace nada con un catálogo JSON."""
+        if self.snapshot is not None:
+            self.snapshot.close()
+
+    # los índices se construyen la primera vez que se usan
+
+    @cached_property
+    def by_id(self) -> Dict[str, Dict[str, Any]]:
+        return {ex.get("exerciseId"): ex for ex in self.exercises}
+
+    @cached_property
+    def by_target_muscle(self) -> Dict[str, List[Dict[str, Any]]]:
+        return _index_by(self.exercises, "targetMuscles")
+
+    @cached_property
+    def by_body_part(self) -> Dict[str, List[Dict[str, Any]]]:
+        return _index_by(self.exercises, "bodyParts")
+
+    @cached_property
+    def by_equipment(self) -> Dict[str, List[Dict[str, Any]]]:
+        return _index_by(self.exercises, "equipments")
+
+    @cached_property
+    def content_hash(self) -> str:
+        """sha256 del `exercises.json` de origen (identifica el contenido, no el mtime)."""
+        return file_sha256(self.path)
+
+    @cached_property
+    def transition_graph(self):
+        """Grafo top-k de transiciones (`src.transition_graph.TransitionGraph`).
+
+        Se carga del `.npz` precalculado junto al JSON; si falta o el hash del
+        JSON no coincide, se reconstruye y se guarda.
+        """
+        from src import transition_graph
+
+        return transition_graph.load_or_build(self.path, self.exercises, source_hash=self.content_hash)
+
+    def get(self, exercise_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Devuelve el ejercicio con ese `exerciseId` o None."""
+        return self.by_id.get(exercise_id)
+
+    def with_target_muscle(self, muscle: str) -> List[Dict[str, Any]]:
+        return self.by_target_muscle.get(muscle.lower(), [])
+
+    def with_body_part(self, body_part: str) -> List[Dict[str, Any]]:
+        return self.by_body_part.get(body_part.lower(), [])
+
+    def with_equipment(self, equipment: str) -> List[Dict[str, Any]]:
+        return self.by_equipment.get(equipment.lower(), [])
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.exercises)
+
+
+# caché por proceso: ruta absoluta -> catálogo
+_catalogs: Dict[str, ExerciseCatalog] = {}
+_lock = threading.Lock()
+
+
+def _source_stamp(path: str) -> Tuple:
+    json_mtime = os.stat(path).st_mtime_ns
+    try:
+        snap_mtime = os.stat(catalog_snapshot.snapshot_path_for(path)).st_mtime_ns
+    except FileNotFoundError:
+        snap_mtime = None
+    # un snapshot más antiguo que el JSON se ignora
+    if snap_mtime is not None and snap_mtime < json_mtime:
+        snap_mtime = None
+    return json_mtime, snap_mtime
+
+
+def _load(path: str, stamp: Tuple) -> ExerciseCatalog:
+    with instrumentation.span("catalog.load") as span:
+        if stamp[1] is not None:
+            try:
+                snapshot = catalog_snapshot.CatalogSnapshot(catalog_snapshot.snapshot_path_for(path))
+                exercises = snapshot.exercises()
+                span.update(source="snapshot", exercises=len(exercises))
+                return ExerciseCatalog(path, exercises, stamp, source="snapshot", snapshot=snapshot)
+            except catalog_snapshot.SnapshotError:
+                pass  # snapshot inválido: volvemos al JSON
+        with open(path, "rb") as f:
+            data = f.read()
+        instrumentation.add("bytes_parsed", len(data))
+        exercises = json.loads(data)
+        _intern_list_fields(exercises)
+        span.update(source="json", exercises=len(exercises))
+        return ExerciseCatalog(path, exercises, stamp, source="json")
+
+
+def get_catalog(path: str = None) -> ExerciseCatalog:
+    """Devuelve el catálogo de `path` (por defecto el `exercises.json` incluido).
+
+    Solo se carga el archivo si no está en caché o si su mtime (o el del
+    snapshot) cambió.
+    """
+    p = os.path.abspath(path or DEFAULT_EXERCISES_PATH)
+    stamp = _source_stamp(p)
+    catalog = _catalogs.get(p)
+    if catalog is not None and catalog.stamp == stamp:
+        return catalog
+    with _lock:
+        catalog = _catalogs.get(p)
+        if catalog is None or catalog.stamp != stamp:
+            old = catalog
+            catalog = _load(p, stamp)
+            _catalogs[p] = catalog
+            if old is not None:
+                old.close()
+    return catalog
+
+
+def load_exercises(path: str = None) -> List[Dict[str, Any]]:
+    """Lista de ejercicios del catálogo (compartida, no modificar)."""
+    return get_catalog(path).exercises
+
+
+def clear_cache() -> None:
+    """Descarta todos los catálogos cargados en este proceso."""
+    with _lock:
+        for catalog in _catalogs.values():
+            catalog.close()
+        _catalogs.clear()
@@ -0,0 +1,279 @@
+"""Snapshot binario de `exercises.json` para arranques en frío rápidos.
+
+El snapshot se genera con un paso de build:
+
+    python -m src.catalog_snapshot [exercises.json] [salida.snapshot]
+
+y `src.catalog` lo usa en lugar del JSON cuando existe y es más reciente.
+
+Formato (todo en el orden de bytes nativo, registrado en la cabecera):
+
+- cabecera: magic, versión, orden de bytes, número de ejercicios y de secciones
+- tabla de secciones: nombre (8 bytes), offset y longitud de cada sección
+- columnas de texto (`ids`, `names`, `gifs`): cadenas utf-8 separadas por NUL
+- `vocab`: vocabulario compartido de músculos, partes del cuerpo y equipamiento
+- columnas lista (`tm`, `bp`, `eq`, `sm`): offsets uint32 (`*.off`) y códigos
+  uint16 (`*.code`) al vocabulario, en formato CSR
+- `ins.off` / `ins.data`: instrucciones de cada ejercicio como JSON, que solo se
+  decodifican cuando alguien las lee
+
+Las secciones están alineadas a 8 bytes y se leen a través de `mmap`, así que
+las secciones que nadie consulta (las instrucciones) no llegan a cargarse.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Tuple
+
+MAGIC = b"MRPGSNAP"
+VERSION = 1
+HEADER = struct.Struct("=8sHBxII")
+SECTION = struct.Struct("=8sQQ")
+ALIGN = 8
+
+STRING_FIELDS = {"exerciseId": "ids", "name": "names", "gifUrl": "gifs"}
+LIST_FIELDS = {"targetMuscles": "tm", "bodyParts": "bp", "equipments": "eq", "secondaryMuscles": "sm"}
+FIELDS = tuple(STRING_FIELDS) + tuple(LIST_FIELDS) + ("instructions",)
+
+_BYTEORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+
+class SnapshotError(Exception):
+    """El snapshot no existe, está corrupto o no se puede generar para este catálogo."""
+
+
+def snapshot_path_for(json_path: str) -> str:
+    """Ruta del snapshot asociado a un `exercises.json`."""
+    return os.path.splitext(json_path)[0] + ".snapshot"
+
+
+def build_snapshot(json_path: str, snapshot_path: str = None) -> str:
+    """Compila `json_path` a un snapshot binario y devuelve la ruta escrita."""
+    out = snapshot_path or snapshot_path_for(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        exercises = json.load(f)
+
+    for ex in exercises:
+        if set(ex) != set(FIELDS):
+            raise SnapshotError(f"Campos inesperados en {ex.get('exerciseId')!r}: {sorted(ex)}")
+        for field in STRING_FIELDS:
+            if "\0" in ex[field]:
+                raise SnapshotError(f"{field} de {ex.get('exerciseId')!r} contiene NUL")
+
+    sections: Dict[str, bytes] = {}
+    for field, name in STRING_FIELDS.items():
+        sections[name] = "\0".join(ex[field] for ex in exercises).encode("utf-8")
+
+    vocab: Dict[str, int] = {}
+    for field, name in LIST_FIELDS.items():
+        offsets = array("I", [0])
+        codes = array("H")
+        for ex in exercises:
+            for value in ex[field]:
+                codes.append(vocab.setdefault(value, len(vocab)))
+            offsets.append(len(codes))
+        sections[name + ".off"] = offsets.tobytes()
+        sections[name + ".code"] = codes.tobytes()
+    if len(vocab) > 0xFFFF:
+        raise SnapshotError("Vocabulario demasiado grande para códigos uint16")
+    sections["vocab"] = "\0".join(vocab).encode("utf-8")
+
+    ins_offsets = array("I", [0])
+    ins_data = bytearray()
+    for ex in exercises:
+        ins_data += json.dumps(ex["instructions"], ensure_ascii=False).encode("utf-8")
+        ins_offsets.append(len(ins_data))
+    sections["ins.off"] = ins_offsets.tobytes()
+    sections["ins.data"] = bytes(ins_data)
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, data in sections.items():
+        offset += -offset % ALIGN
+        table.append((name, offset, len(data)))
+        offset += len(data)
+
+    # temporal propio en el mismo directorio: dos builds a la vez no se pisan
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out)),
+                               prefix=os.path.basename(out) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, _BYTEORDER, len(exercises), len(sections)))
+            for name, off, length in table:
+                f.write(SECTION.pack(name.encode("ascii"), off, length))
+            for (name, off, _), data in zip(table, sections.values()):
+                f.write(b"\0" * (off - f.tell()))
+                f.write(data)
+        os.replace(tmp, out)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return out
+
+
+class CatalogSnapshot:
+    """Snapshot abierto con mmap. Las columnas eager se decodifican en bloque al abrir.
+
+    `close()` libera el mmap (lo llama `src.catalog` al descartar el catálogo);
+    después solo fallan las lecturas bajo demanda (instrucciones aún no leídas).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._sections: Dict[str, memoryview] = {}
+        self._ins_offsets = self._ins_data = None
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # archivo vacío
+                raise SnapshotError(f"Snapshot vacío: {path}") from e
+        try:
+            with memoryview(self._mm) as buf:
+                self._parse(buf)
+        except (struct.error, IndexError, UnicodeDecodeError, TypeError, ValueError) as e:
+            # cabecera o tabla de secciones corrupta: que quien lo abre pueda volver al JSON
+            self.close()
+            raise SnapshotError(f"Snapshot corrupto: {path}: {e}") from e
+        except SnapshotError:
+            self.close()
+            raise
+
+    @property
+    def closed(self) -> bool:
+        return self._mm.closed
+
+    def close(self) -> None:
+        """Libera las vistas sobre el mmap y lo cierra (idempotente)."""
+        # el mmap no se puede cerrar mientras queden memoryviews sobre él
+        for view in (self._ins_offsets, *self._sections.values()):
+            if view is not None:
+                view.release()
+        self._sections.clear()
+        self._ins_offsets = self._ins_data = None
+        self._mm.close()
+
+    def _parse(self, buf: memoryview) -> None:
+        """Lee la cabecera, la tabla de secciones y las columnas eager."""
+        path = self.path
+        if len(buf) < HEADER.size:
+            raise SnapshotError(f"Snapshot truncado: {path}")
+        magic, version, byteorder, n, n_sections = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError(f"Formato de snapshot no soportado: {path}")
+        if byteorder != _BYTEORDER:
+            raise SnapshotError(f"Snapshot generado con otro orden de bytes: {path}")
+
+        for k in range(n_sections):
+            name, off, length = SECTION.unpack_from(buf, HEADER.size + k * SECTION.size)
+            if off + length > len(buf):
+                raise SnapshotError(f"Snapshot truncado: {path}")
+            self._sections[name.rstrip(b"\0").decode("ascii")] = buf[off:off + length]
+        self.size = n
+
+        self._strings = {name: self._split(name) for name in STRING_FIELDS.values()}
+        vocab = bytes(self._section("vocab")).decode("utf-8").split("\0")
+        # columnas lista: (offsets, valores ya traducidos del vocabulario); cada
+        # ejercicio es un slice, que se crea cuando se pide
+        self._lists: Dict[str, Tuple[List[int], List[str]]] = {}
+        for name in LIST_FIELDS.values():
+            offsets = self._section(name + ".off").cast("I").tolist()
+            if len(offsets) != n + 1:
+                raise SnapshotError(f"Sección {name + '.off'!r} inconsistente en {path}")
+            values = [vocab[c] for c in self._section(name + ".code").cast("H")]
+            self._lists[name] = (offsets, values)
+        self._ins_offsets = self._section("ins.off").cast("I")
+        if len(self._ins_offsets) != n + 1:
+            raise SnapshotError(f"Sección 'ins.off' inconsistente en {path}")
+        self._ins_data = self._section("ins.data")
+
+    def _section(self, name: str) -> memoryview:
+        try:
+            return self._sections[name]
+        except KeyError:
+            raise SnapshotError(f"Falta la sección {name!r} en {self.path}") from None
+
+    def _split(self, name: str) -> List[str]:
+        if self.size == 0:
+            return []
+        values = bytes(self._section(name)).decode("utf-8").split("\0")
+        if len(values) != self.size:
+            raise SnapshotError(f"Sección {name!r} inconsistente en {self.path}")
+        return values
+
+    def field(self, i: int, field: str) -> Any:
+        if field in STRING_FIELDS:
+            return self._strings[STRING_FIELDS[field]][i]
+        if field in LIST_FIELDS:
+            offsets, values = self._lists[LIST_FIELDS[field]]
+            return values[offsets[i]:offsets[i + 1]]
+        if field == "instructions":
+            return self.instructions(i)
+        raise KeyError(field)
+
+    def instructions(self, i: int) -> List[str]:
+        """Decodifica (bajo demanda) las instrucciones del ejercicio `i`."""
+        if self._ins_data is None:
+            raise SnapshotError(f"Snapshot cerrado: {self.path}")
+        start, end = self._ins_offsets[i], self._ins_offsets[i + 1]
+        return json.loads(bytes(self._ins_data[start:end]))
+
+    def exercises(self) -> List["SnapshotExercise"]:
+        return [SnapshotExercise(self, i) for i in range(self.size)]
+
+
+class SnapshotExercise(Mapping):
+    """Ejercicio respaldado por el snapshot; se comporta como el dict del JSON (solo lectura).
+
+    Las instrucciones se leen del snapshot la primera vez que se piden.
+    """
+
+    __slots__ = ("_snapshot", "_index", "_instructions")
+
+    def __init__(self, snapshot: CatalogSnapshot, index: int):
+        self._snapshot = snapshot
+        self._index = index
+        self._instructions = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "instructions":
+            if self._instructions is None:
+                self._instructions = self._snapshot.instructions(self._index)
+            return self._instructions
+        return self._snapshot.field(self._index, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # atajo de Mapping.get (que pasa por __getitem__ y captura KeyError)
+        if key in STRING_FIELDS or key in LIST_FIELDS or key == "instructions":
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"SnapshotExercise({self['exerciseId']!r}, {self['name']!r})"
+
+
+def load_snapshot(path: str) -> List[SnapshotExercise]:
+    """Abre el snapshot y devuelve sus ejercicios."""
+    return CatalogSnapshot(path).exercises()
+
+
+if __name__ == "__main__":
+    from src.catalog import DEFAULT_EXERCISES_PATH
+
+    src_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EXERCISES_PATH
+    dst_path = sys.argv[2] if len(sys.argv) > 2 else None
+    written = build_snapshot(src_path, dst_path)
+    print(f"Snapshot escrito en {written} ({os.path.getsize(written)} bytes)")
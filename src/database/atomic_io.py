@@ -0,0 +1,115 @@
+"""Bloqueo entre procesos y escrituras atómicas para los archivos JSON de datos.
+
+- `locked(path)` toma un lock exclusivo (`fcntl.flock`) sobre `<path>.lock`;
+  serializa a los escritores de todos los procesos que comparten `data_dir`.
+- `atomic_write_json(path, data)` escribe en un temporal del mismo directorio,
+  hace `fsync` y lo renombra con `os.replace`: los lectores ven el archivo
+  anterior o el nuevo, nunca uno a medio escribir, así que no necesitan lock.
+
+En plataformas sin `fcntl` (Windows) el lock solo excluye a los hilos del
+proceso actual.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from src import instrumentation
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(path, threading.Lock())
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """Lock exclusivo de escritura para `path`, compartido entre procesos."""
+    lock_path = os.path.abspath(path) + ".lock"
+    if fcntl is None:
+        with _thread_lock(lock_path):
+            yield
+        return
+    # flock sobre descriptores distintos también excluye a otros hilos del mismo proceso
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(directory: str) -> None:
+    """fsync del directorio, para que un `os.replace` hecho en él sea durable."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # no soportado (Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_temp(path: str, data: bytes) -> str:
+    """Escribe `data` (con fsync) en un temporal junto a `path` y devuelve su ruta."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            instrumentation.add("bytes_written", len(data))
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        remove_temp(tmp)
+        raise
+    return tmp
+
+
+def remove_temp(tmp: str) -> None:
+    try:
+        os.remove(tmp)
+    except FileNotFoundError:
+        pass
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Reemplaza `path` por `data` de forma atómica y durable."""
+    tmp = write_temp(path, data)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        remove_temp(tmp)
+        raise
+    fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def encode_json(data: Any, indent: int = 2) -> bytes:
+    """`data` serializado como lo escribe `atomic_write_json`."""
+    return json.dumps(data, indent=indent).encode("utf-8")
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2) -> None:
+    """Serializa `data` como JSON y reemplaza `path` de forma atómica."""
+    atomic_write_bytes(path, encode_json(data, indent))
+
+
+def read_json(path: str) -> Any:
+    """Lee un archivo JSON (sin lock: los escritores siempre reemplazan el archivo entero)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    instrumentation.add("bytes_parsed", len(data))
+    return json.loads(data)
@@ -0,0 +1,55 @@
+"""Interfaz común de los backends de almacenamiento de `DatabaseManager`."""
+from typing import Callable, Dict, List, Optional, Union
+
+
+class StorageBackend:
+    """Operaciones que debe implementar un backend (ver `JsonBackend` y `SqliteBackend`).
+
+    Los métodos tienen la misma semántica que los de `DatabaseManager`.
+    """
+
+    name = "base"
+
+    def register_user(self, username: str, password: str) -> bool:
+        raise NotImplementedError
+
+    def validate_login(self, username: str, password: str) -> bool:
+        raise NotImplementedError
+
+    def save_profile(self, username: str, profile: Dict) -> bool:
+        raise NotImplementedError
+
+    def get_profile(self, username: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def save_tracking(self, username: str, day: int, tracking_data: Dict, saved_at: Optional[str] = None) -> bool:
+        """Guarda el registro con `date` = `saved_at` (por defecto, ahora)."""
+        raise NotImplementedError
+
+    def get_tracking(self, username: str, day: Optional[int] = None) -> Union[Dict, List[Dict]]:
+        raise NotImplementedError
+
+    def save_routine(self, username: str, routine: Dict, updated_at: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
+    def get_routine(self, username: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_routine_updated_at(self, username: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def update_analytics(self, username: str, update: Callable[[Optional[Dict]], Dict]) -> Dict:
+        """Reemplaza los agregados de seguimiento del usuario por `update(actuales)`, atómicamente.
+
+        `update` recibe el documento actual (o None) y puede modificarlo en el lugar.
+        Se ejecuta con el bloqueo de escritura tomado, así que no debe volver a
+        llamar al backend: los datos que necesite se leen antes. Si devuelve None
+        no se guarda nada (y `update_analytics` devuelve None).
+        """
+        raise NotImplementedError
+
+    def get_analytics(self, username: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera recursos (conexiones, hilos); por defecto no hace nada."""
@@ -0,0 +1,181 @@
+"""Caché en memoria de documentos JSON con escritura diferida opcional.
+
+`DocumentCache` guarda el contenido parseado de cada archivo junto con su
+sello (inode, mtime, tamaño). Mientras el sello no cambie, las lecturas se
+sirven desde memoria; si otro proceso reemplaza el archivo, se vuelve a leer.
+
+Las escrituras son funciones `op(doc)` que modifican el documento. Según la
+durabilidad:
+
+- "sync": cada escritura se aplica y se persiste en el momento (lock +
+  reemplazo atómico), como sin caché.
+- "interval": las escrituras se aplican en memoria y se persisten en lote cada
+  `flush_interval` segundos (y al cerrar / salir del proceso).
+- "manual": solo se persisten al llamar a `flush()` o `close()`.
+
+Al persistir, si el archivo cambió desde la última lectura, se relee y se
+vuelven a aplicar las operaciones pendientes, así no se pisan escrituras de
+otros procesos.
+
+Cada archivo tiene dos locks propios: uno para el documento en memoria
+(lecturas, aplicar operaciones, serializar) y otro que ordena a quienes lo
+persisten. El temporal se escribe y se sincroniza con el disco sin el lock del
+documento; solo el `os.replace` final lo toma, así un lector nunca espera a un
+fsync ni ve un sello que no corresponde al documento en caché.
+"""
+import atexit
+import copy
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.database.atomic_io import encode_json, fsync_dir, locked, read_json, remove_temp, write_temp
+
+DURABILITY_MODES = ("sync", "interval", "manual")
+
+
+def _stamp(path: str) -> Tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class DocumentCache:
+    def __init__(self, durability: str = "sync", flush_interval: float = 1.0):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability debe ser uno de {DURABILITY_MODES}")
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self._docs: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+        self._pending: Dict[str, List[Callable[[Any], Any]]] = {}
+        # ruta -> (lock del documento, lock de escritura en disco)
+        self._path_locks: Dict[str, Tuple[threading.RLock, threading.Lock]] = {}
+        # protege solo las tablas anteriores y `stats`; nunca se mantiene durante I/O
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "flushes": 0}
+        self._stop = threading.Event()
+        self._flusher = None
+        if durability == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+        if durability != "sync":
+            atexit.register(self.flush)
+
+    def _locks(self, path: str) -> Tuple[threading.RLock, threading.Lock]:
+        with self._lock:
+            locks = self._path_locks.get(path)
+            if locks is None:
+                locks = self._path_locks[path] = (threading.RLock(), threading.Lock())
+            return locks
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def read(self, path: str) -> Any:
+        """Documento de `path` (con las escrituras pendientes aplicadas). No modificar."""
+        doc_lock, _ = self._locks(path)
+        with doc_lock:
+            stamp = _stamp(path)
+            cached = self._docs.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._count("hits")
+                return cached[1]
+            self._count("misses")
+            doc = read_json(path)
+            for op in self._pending.get(path, []):
+                op(doc)
+            self._docs[path] = (stamp, doc)
+            return doc
+
+    def read_copy(self, path: str, select: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Copia profunda del documento de `path` (o de `select(doc)`).
+
+        La copia se toma con el lock del documento, así no se cruza con una
+        escritura que lo esté modificando en el lugar.
+        """
+        doc_lock, _ = self._locks(path)
+        with doc_lock:
+            doc = self.read(path)
+            return copy.deepcopy(select(doc) if select is not None else doc)
+
+    def update(self, path: str, op: Callable[[Any], Any]) -> Any:
+        """Aplica `op(doc)` al documento de `path` y devuelve su resultado.
+
+        `op` puede volver a ejecutarse sobre una versión más reciente del archivo
+        al persistir, así que debe depender solo de sus argumentos y del documento.
+        """
+        doc_lock, write_lock = self._locks(path)
+        self._count("writes")
+        if self.durability == "sync":
+            with write_lock, locked(path):
+                with doc_lock:
+                    try:
+                        doc = self.read(path)
+                        result = op(doc)
+                        data = encode_json(doc)
+                    except BaseException:
+                        self._docs.pop(path, None)
+                        raise
+                self._persist(path, data, 0)
+            return result
+        with doc_lock:
+            doc = self.read(path)
+            result = op(doc)
+            self._pending.setdefault(path, []).append(op)
+            return result
+
+    def _persist(self, path: str, data: bytes, flushed: int) -> None:
+        """Reemplaza `path` por `data` y descarta las `flushed` primeras operaciones pendientes.
+
+        Llamar con el lock de escritura de `path` y `locked(path)` tomados.
+        """
+        doc_lock, _ = self._locks(path)
+        tmp = write_temp(path, data)
+        try:
+            with doc_lock:
+                os.replace(tmp, path)
+                cached = self._docs.get(path)
+                if cached is not None:
+                    # el documento en caché es el serializado más las operaciones posteriores
+                    self._docs[path] = (_stamp(path), cached[1])
+                if flushed:
+                    del self._pending[path][:flushed]
+                    if not self._pending[path]:
+                        del self._pending[path]
+        except BaseException:
+            remove_temp(tmp)
+            self._docs.pop(path, None)
+            raise
+        fsync_dir(os.path.dirname(os.path.abspath(path)))
+        self._count("flushes")
+
+    def flush(self) -> None:
+        """Persiste todas las escrituras pendientes."""
+        for path in list(self._pending):
+            doc_lock, write_lock = self._locks(path)
+            with write_lock, locked(path):
+                with doc_lock:
+                    flushed = len(self._pending.get(path, ()))
+                    if not flushed:
+                        continue
+                    # read() relee el archivo si cambió y reaplica las operaciones pendientes
+                    data = encode_json(self.read(path))
+                self._persist(path, data, flushed)
+
+    def pending(self) -> int:
+        return sum(len(ops) for ops in list(self._pending.values()))
+
+    def invalidate(self, path: str = None) -> None:
+        """Descarta documentos en caché (no las escrituras pendientes)."""
+        for p in list(self._docs) if path is None else [path]:
+            doc_lock, _ = self._locks(p)
+            with doc_lock:
+                self._docs.pop(p, None)
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
@@ -1,110 +1,169 @@
 """Módulo para manejar la base de datos de usuarios y seguimiento."""
-import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from src import instrumentation, records, tracking_analytics
+from src.database.backend import StorageBackend
+from src.database.json_backend import TRACKING_MODES, JsonBackend
+from src.database.sqlite_backend import SqliteBackend
+
+BACKENDS = {
+    "json": JsonBackend,
+    "sqlite": SqliteBackend,
+}
+
+# Backend por defecto si no se indica uno explícitamente
+BACKEND_ENV = "MUSCLERPG_DB_BACKEND"
+
+# Backends compartidos por proceso: las páginas crean un DatabaseManager en cada
+# rerun, y así reutilizan el caché de documentos y las conexiones abiertas.
+_shared_backends: Dict[Tuple, StorageBackend] = {}
+_shared_lock = threading.Lock()
+
+def _shared_backend(name: str, data_dir: str, tracking_mode: str, durability: str,
+                    flush_interval: float) -> StorageBackend:
+    key = (name, os.path.abspath(data_dir), tracking_mode, durability, flush_interval)
+    with _shared_lock:
+        backend = _shared_backends.get(key)
+        if backend is None:
+            if name == "json":
+                backend = JsonBackend(data_dir, tracking_mode=tracking_mode, durability=durability,
+                                      flush_interval=flush_interval)
+            else:
+                backend = BACKENDS[name](data_dir)
+            _shared_backends[key] = backend
+        return backend
 
 class DatabaseManager:
-    def __init__(self, data_dir: str = "src/database/data"):
-        """Inicializa el manejador de base de datos."""
+    def __init__(self, data_dir: str = "src/database/data", tracking_mode: str = "json",
+                 backend: Union[str, StorageBackend, None] = None, durability: str = "sync",
+                 flush_interval: float = 1.0):
+        """Inicializa el manejador de base de datos.
+
+        `backend` puede ser un nombre de BACKENDS ("json" o "sqlite"), una instancia
+        de StorageBackend o None (se usa $MUSCLERPG_DB_BACKEND, o "json"). Los
+        backends creados por nombre se comparten entre todos los DatabaseManager
+        del proceso con la misma configuración.
+        `tracking_mode`, `durability` y `flush_interval` solo aplican al backend JSON
+        (ver JsonBackend y src.database.cache.DocumentCache).
+        """
         self.data_dir = data_dir
-        self.users_file = os.path.join(data_dir, "users.json")
-        self.tracking_file = os.path.join(data_dir, "tracking.json")
-        self.routines_file = os.path.join(data_dir, "routines.json")
-        self._ensure_data_files()
-    
-    def _ensure_data_files(self):
-        """Asegura que los archivos de datos existan."""
-        os.makedirs(self.data_dir, exist_ok=True)
-        for file_path in [self.users_file, self.tracking_file, self.routines_file]:
-            if not os.path.exists(file_path):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump({}, f)
+        if backend is None:
+            backend = os.environ.get(BACKEND_ENV, "json")
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise ValueError(f"Backend desconocido: {backend!r} (opciones: {', '.join(BACKENDS)})")
+            backend = _shared_backend(backend, data_dir, tracking_mode, durability, flush_interval)
+        self.backend = backend
     
+    @instrumentation.traced("db.register_user")
     def register_user(self, username: str, password: str) -> bool:
         """Registra un nuevo usuario."""
-        with open(self.users_file, 'r+', encoding='utf-8') as f:
-            users = json.load(f)
-            if username in users:
-                return False
-            users[username] = {
-                'password': password,  # En producción usar hash
-                'profile': None,
-                'created_at': datetime.now().isoformat()
-            }
-            f.seek(0)
-            json.dump(users, f, indent=2)
-            f.truncate()
-        return True
+        return self.backend.register_user(username, password)
     
+    @instrumentation.traced("db.validate_login")
     def validate_login(self, username: str, password: str) -> bool:
         """Valida las credenciales de un usuario."""
-        with open(self.users_file, 'r', encoding='utf-8') as f:
-            users = json.load(f)
-            return username in users and users[username]['password'] == password
+        return self.backend.validate_login(username, password)
     
+    @instrumentation.traced("db.save_profile")
     def save_profile(self, username: str, profile: Dict) -> bool:
         """Guarda el perfil de un usuario."""
-        with open(self.users_file, 'r+', encoding='utf-8') as f:
-            users = json.load(f)
-            if username not in users:
-                return False
-            users[username]['profile'] = profile
-            f.seek(0)
-            json.dump(users, f, indent=2)
-            f.truncate()
-        return True
+        return self.backend.save_profile(username, profile)
     
+    @instrumentation.traced("db.get_profile")
     def get_profile(self, username: str) -> Optional[Dict]:
         """Obtiene el perfil de un usuario."""
-        with open(self.users_file, 'r', encoding='utf-8') as f:
-            users = json.load(f)
-            return users.get(username, {}).get('profile')
+        return self.backend.get_profile(username)
     
+    @instrumentation.traced("db.save_tracking")
     def save_tracking(self, username: str, day: int, tracking_data: Dict) -> bool:
-        """Guarda el seguimiento diario de un usuario."""
-        with open(self.tracking_file, 'r+', encoding='utf-8') as f:
-            tracking = json.load(f)
-            if username not in tracking:
-                tracking[username] = {}
-            tracking[username][str(day)] = {
-                **tracking_data,
-                'date': datetime.now().isoformat()
-            }
-            f.seek(0)
-            json.dump(tracking, f, indent=2)
-            f.truncate()
+        """Guarda el seguimiento diario de un usuario y actualiza sus agregados.
+
+        Los ejercicios del registro pueden traer sus objetivos (`target_sets`,
+        `muscles`, `stamina_costs`, como los guarda la página 'Seguimiento');
+        si falta alguno se completan con la rutina guardada.
+        """
+        # la fecha se fija aquí para calcular la contribución sin releer el registro
+        saved_at = datetime.now().isoformat()
+        if not self.backend.save_tracking(username, day, tracking_data, saved_at=saved_at):
+            return False
+        record = {**tracking_data, 'date': saved_at}
+        routine = self.backend.get_routine(username) if tracking_analytics.needs_routine(record) else None
+        contribution = tracking_analytics.day_contribution(day, record, tracking_analytics.exercise_index(routine))
+
+        def update(doc):
+            # sin agregados todavía: None no guarda nada y se reconstruyen abajo
+            return None if doc is None else tracking_analytics.apply_day(doc, day, contribution)
+        if self.backend.update_analytics(username, update) is None:
+            # primeros agregados del usuario: incluir el historial anterior (que ya tiene este registro)
+            rebuilt = tracking_analytics.rebuild(self.backend.get_tracking(username), self.backend.get_routine(username))
+            self.backend.update_analytics(
+                username, lambda doc: rebuilt if doc is None else tracking_analytics.apply_day(doc, day, contribution))
         return True
     
+    @instrumentation.traced("db.get_tracking")
     def get_tracking(self, username: str, day: Optional[int] = None) -> Union[Dict, List[Dict]]:
         """Obtiene el seguimiento de un usuario para un día o todos los días."""
-        with open(self.tracking_file, 'r', encoding='utf-8') as f:
-            tracking = json.load(f)
-            user_tracking = tracking.get(username, {})
-            if day is not None:
-                return user_tracking.get(str(day), {})
-            return user_tracking
+        return self.backend.get_tracking(username, day)
     
-    def save_routine(self, username: str, routine: Dict) -> bool:
-        """Guarda la rutina de un usuario."""
-        with open(self.routines_file, 'r+', encoding='utf-8') as f:
-            routines = json.load(f)
-            routines[username] = {
-                'routine': routine,
-                'updated_at': datetime.now().isoformat()
-            }
-            f.seek(0)
-            json.dump(routines, f, indent=2)
-            f.truncate()
-        return True
+    @instrumentation.traced("db.get_tracking_analytics")
+    def get_tracking_analytics(self, username: str) -> Dict:
+        """Resumen de los agregados de seguimiento (ver src.tracking_analytics.summary).
+
+        Si el usuario tiene historial anterior a los agregados, se calculan una vez
+        desde el historial completo y se guardan.
+        """
+        doc = self.backend.get_analytics(username)
+        if doc is None:
+            tracking = self.backend.get_tracking(username)
+            if tracking:
+                doc = tracking_analytics.rebuild(tracking, self.backend.get_routine(username))
+                self.backend.update_analytics(username, lambda _: doc)
+        return tracking_analytics.summary(doc)
+
+    @instrumentation.traced("db.save_routine")
+    def save_routine(self, username: str, routine: Dict, updated_at: Optional[str] = None) -> bool:
+        """Guarda la rutina de un usuario (los registros de `src.records` se guardan como dicts).
+
+        `updated_at` (ISO) conserva la fecha de una rutina que solo se re-planifica;
+        por defecto es el momento actual.
+        """
+        return self.backend.save_routine(username, records.to_plain(routine), updated_at)
     
+    @instrumentation.traced("db.get_routine")
     def get_routine(self, username: str) -> Optional[Dict]:
         """Obtiene la rutina de un usuario."""
-        with open(self.routines_file, 'r', encoding='utf-8') as f:
-            routines = json.load(f)
-            data = routines.get(username, {})
-            return data.get('routine') if data else None
+        return self.backend.get_routine(username)
+
+    @instrumentation.traced("db.get_routine_updated_at")
+    def get_routine_updated_at(self, username: str) -> Optional[str]:
+        """Fecha (ISO) en que se guardó la rutina del usuario, o None si no tiene."""
+        return self.backend.get_routine_updated_at(username)
+
+    @instrumentation.traced("db.flush")
+    def flush(self) -> None:
+        """Persiste las escrituras diferidas del backend (si las tiene)."""
+        flush = getattr(self.backend, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores del caché del backend (hits, misses, writes, flushes, pending), si tiene."""
+        stats = getattr(self.backend, 'cache_stats', None)
+        return stats() if stats is not None else {}
+
+    def close(self) -> None:
+        """Cierra el backend (persistiendo lo pendiente) y deja de compartirlo."""
+        with _shared_lock:
+            for key, backend in list(_shared_backends.items()):
+                if backend is self.backend:
+                    del _shared_backends[key]
+        self.backend.close()
     
+    @instrumentation.traced("db.get_current_day_exercises")
     def get_current_day_exercises(self, username: str, day_index: int) -> List[Dict]:
         """Obtiene los ejercicios del día actual de la rutina del usuario."""
         routine = self.get_routine(username)
@@ -124,7 +183,7 @@ class DatabaseManager:
             return []
 
         # Normalizar campos para que la UI de seguimiento siempre reciba
-        # keys: name, sets, reps, time_min, id, muscles
+        # keys: name, sets, reps, time_min, id, muscles, stamina_costs
         normalized = []
         for ex in exercises:
             norm = {
@@ -134,6 +193,7 @@ class DatabaseManager:
                 'reps': ex.get('reps') or ex.get('target_reps') or ex.get('reps_target') or 10,
                 'time_min': ex.get('time_min') or ex.get('time') or ex.get('duration') or 15,
                 'muscles': ex.get('muscles') or ex.get('targetMuscles') or [],
+                'stamina_costs': ex.get('stamina_costs') or {},
             }
             normalized.append(norm)
 
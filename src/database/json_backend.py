@@ -0,0 +1,365 @@
+"""Backend de almacenamiento en archivos JSON (users.json, tracking.json, routines.json y analytics/).
+
+Varios procesos pueden compartir `data_dir`: cada escritura toma un lock entre
+procesos sobre el archivo, relee su contenido, y lo reemplaza de forma atómica
+(temporal + fsync + os.replace). Las lecturas no toman lock porque siempre ven
+un archivo completo (ver `src.database.atomic_io`).
+
+Los documentos parseados se mantienen en un `DocumentCache` que se invalida
+cuando el archivo cambia; con durabilidad "interval" o "manual" las
+escrituras se agrupan y se persisten en lote.
+"""
+import copy
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import quote, unquote
+
+from src import instrumentation
+from src.database.atomic_io import atomic_write_bytes, atomic_write_json, locked, read_json
+from src.database.backend import StorageBackend
+from src.database.cache import DocumentCache
+
+# Modos de almacenamiento del seguimiento:
+#  - "json": todo el seguimiento en tracking.json (se reescribe entero en cada guardado)
+#  - "log": un log append-only JSON Lines por usuario en tracking_log/, compactado en segundo plano
+TRACKING_MODES = ("json", "log")
+
+# Se compacta el log de un usuario cuando tiene más de
+# COMPACT_MIN_LINES líneas y más del doble de líneas que días distintos.
+COMPACT_MIN_LINES = 64
+
+# bytes de la primera línea del log que guarda el índice para reconocer el archivo
+LOG_HEAD_BYTES = 256
+
+
+def read_tracking_log(path: str) -> Dict[str, Dict]:
+    """Días del log JSON Lines de un usuario (el último registro de cada día gana)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    days = {}
+    # ignorar una posible última línea a medio escribir
+    for line in data[:data.rfind(b'\n') + 1].splitlines():
+        if line.strip():
+            item = json.loads(line)
+            if 'day' in item:  # la cabecera de un log reescrito no es un registro
+                days[item['day']] = item['record']
+    return days
+
+
+class JsonBackend(StorageBackend):
+    name = "json"
+
+    def __init__(self, data_dir: str = "src/database/data", tracking_mode: str = "json",
+                 durability: str = "sync", flush_interval: float = 1.0):
+        """Inicializa el backend sobre los archivos JSON de `data_dir`.
+
+        `durability` y `flush_interval` configuran la escritura diferida (ver DocumentCache).
+        """
+        if tracking_mode not in TRACKING_MODES:
+            raise ValueError(f"tracking_mode debe ser uno de {TRACKING_MODES}")
+        self.data_dir = data_dir
+        self.tracking_mode = tracking_mode
+        self.users_file = os.path.join(data_dir, "users.json")
+        self.tracking_file = os.path.join(data_dir, "tracking.json")
+        self.routines_file = os.path.join(data_dir, "routines.json")
+        # agregados del seguimiento: un archivo por usuario, así cada guardado reescribe solo el suyo
+        self.analytics_dir = os.path.join(data_dir, "analytics")
+        self.tracking_log_dir = os.path.join(data_dir, "tracking_log")
+        # índice en memoria del log: usuario -> {'ino', 'mtime', 'size', 'head', 'offset', 'lines', 'days'}
+        self._tracking_index: Dict[str, Dict] = {}
+        self._tracking_locks: Dict[str, threading.Lock] = {}
+        # usuarios con una compactación en segundo plano en curso
+        self._compacting: set = set()
+        self._locks_guard = threading.Lock()
+        self._cache = DocumentCache(durability=durability, flush_interval=flush_interval)
+        self._ensure_data_files()
+    
+    def _ensure_data_files(self):
+        """Asegura que los archivos de datos existan."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(self.analytics_dir, exist_ok=True)
+        for file_path in [self.users_file, self.tracking_file, self.routines_file]:
+            if not os.path.exists(file_path):
+                with locked(file_path):
+                    if not os.path.exists(file_path):
+                        atomic_write_json(file_path, {}, indent=None)
+        if self.tracking_mode == "log" and not os.path.isdir(self.tracking_log_dir):
+            self._import_tracking_json()
+        elif self.tracking_mode == "json" and os.path.isdir(self.tracking_log_dir):
+            self._export_tracking_log()
+
+    def _import_tracking_json(self):
+        """Crea tracking_log/ a partir de tracking.json (solo la primera vez que se usa el modo log)."""
+        with locked(self.tracking_file):
+            if os.path.isdir(self.tracking_log_dir):
+                return  # otro proceso lo importó antes
+            tmp_dir = self.tracking_log_dir + ".tmp"
+            os.makedirs(tmp_dir, exist_ok=True)
+            tracking = read_json(self.tracking_file)
+            for username, days in tracking.items():
+                path = os.path.join(tmp_dir, self._tracking_log_name(username))
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(self._tracking_log_header())
+                    for day, record in days.items():
+                        f.write(self._tracking_log_line(day, record))
+            os.rename(tmp_dir, self.tracking_log_dir)
+
+    def _export_tracking_log(self):
+        """Vuelca tracking_log/ a tracking.json al volver al modo json, y borra el log.
+
+        Sin esto, lo guardado en modo log quedaría oculto en modo json (y al volver
+        al modo log se importaría de nuevo el tracking.json desactualizado).
+        """
+        with locked(self.tracking_file):
+            if not os.path.isdir(self.tracking_log_dir):
+                return  # otro proceso lo exportó antes
+            tracking = read_json(self.tracking_file)
+            for name in sorted(os.listdir(self.tracking_log_dir)):
+                if name.endswith('.jsonl'):
+                    username = unquote(name[:-len('.jsonl')])
+                    tracking[username] = read_tracking_log(os.path.join(self.tracking_log_dir, name))
+            atomic_write_json(self.tracking_file, tracking)
+            # primero se retira el directorio (atómico) y después se borra
+            old_dir = f"{self.tracking_log_dir}.old-{uuid.uuid4().hex}"
+            os.rename(self.tracking_log_dir, old_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    
+    def register_user(self, username: str, password: str) -> bool:
+        """Registra un nuevo usuario."""
+        user = {
+            'password': password,  # En producción usar hash
+            'profile': None,
+            'created_at': datetime.now().isoformat()
+        }
+
+        def op(users):
+            if username in users:
+                return False
+            users[username] = user
+            return True
+        return self._cache.update(self.users_file, op)
+    
+    def validate_login(self, username: str, password: str) -> bool:
+        """Valida las credenciales de un usuario."""
+        users = self._cache.read(self.users_file)
+        return username in users and users[username]['password'] == password
+    
+    def save_profile(self, username: str, profile: Dict) -> bool:
+        """Guarda el perfil de un usuario."""
+        profile = copy.deepcopy(profile)
+
+        def op(users):
+            if username not in users:
+                return False
+            users[username]['profile'] = profile
+            return True
+        return self._cache.update(self.users_file, op)
+    
+    def get_profile(self, username: str) -> Optional[Dict]:
+        """Obtiene el perfil de un usuario."""
+        return self._cache.read_copy(self.users_file, lambda users: users.get(username, {}).get('profile'))
+    
+    def save_tracking(self, username: str, day: int, tracking_data: Dict, saved_at: Optional[str] = None) -> bool:
+        """Guarda el seguimiento diario de un usuario."""
+        record = {
+            **tracking_data,
+            'date': saved_at or datetime.now().isoformat()
+        }
+        if self.tracking_mode == "log":
+            return self._append_tracking(username, str(day), record)
+        record = copy.deepcopy(record)
+
+        def op(tracking):
+            if username not in tracking:
+                tracking[username] = {}
+            tracking[username][str(day)] = record
+        self._cache.update(self.tracking_file, op)
+        return True
+    
+    def get_tracking(self, username: str, day: Optional[int] = None) -> Union[Dict, List[Dict]]:
+        """Obtiene el seguimiento de un usuario para un día o todos los días."""
+        if self.tracking_mode == "log":
+            with self._tracking_lock(username):
+                # copias, como en el modo json: los registros del índice no deben modificarse
+                days = self._refresh_tracking_index(username)['days']
+                if day is not None:
+                    return copy.deepcopy(days.get(str(day), {}))
+                return copy.deepcopy(days)
+
+        def select(tracking):
+            user_tracking = tracking.get(username, {})
+            return user_tracking.get(str(day), {}) if day is not None else user_tracking
+        return self._cache.read_copy(self.tracking_file, select)
+
+    # --- Log append-only de seguimiento (tracking_mode="log") ---
+
+    @staticmethod
+    def _tracking_log_name(username: str) -> str:
+        return quote(username, safe='') + '.jsonl'
+
+    @staticmethod
+    def _tracking_log_line(day: str, record: Dict) -> str:
+        return json.dumps({'day': day, 'record': record}, ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def _tracking_log_header() -> str:
+        # primera línea de todo log reescrito (importado o compactado), distinta en cada
+        # escritura: aunque el sistema reutilice el inode, el índice nota el cambio
+        return json.dumps({'log_id': uuid.uuid4().hex}) + '\n'
+
+    def _tracking_log_path(self, username: str) -> str:
+        return os.path.join(self.tracking_log_dir, self._tracking_log_name(username))
+
+    def _tracking_lock(self, username: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._tracking_locks.setdefault(username, threading.Lock())
+
+    def _refresh_tracking_index(self, username: str) -> Dict:
+        """Lee solo las líneas añadidas al log desde la última lectura (llamar con el lock tomado)."""
+        path = self._tracking_log_path(username)
+        entry = self._tracking_index.get(username)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and entry is not None and \
+                (entry['ino'], entry['mtime'], entry['size']) == (st.st_ino, st.st_mtime_ns, st.st_size):
+            return entry  # sin cambios desde la última lectura
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            entry = {'ino': None, 'mtime': None, 'size': 0, 'head': b'', 'offset': 0, 'lines': 0, 'days': {}}
+            self._tracking_index[username] = entry
+            return entry
+        with f:
+            st = os.fstat(f.fileno())
+            # se relee completo si el archivo fue reemplazado (compactado) o truncado; un
+            # inode reutilizado se reconoce porque cambia la primera línea (ver _tracking_log_header)
+            if entry is None or entry['ino'] != st.st_ino or st.st_size < entry['offset'] or \
+                    f.read(len(entry['head'])) != entry['head']:
+                entry = {'ino': st.st_ino, 'mtime': None, 'size': 0, 'head': b'', 'offset': 0, 'lines': 0,
+                         'days': {}}
+                self._tracking_index[username] = entry
+            f.seek(entry['offset'])
+            chunk = f.read()
+        instrumentation.add('bytes_parsed', len(chunk))
+        # ignorar una posible última línea a medio escribir
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                item = json.loads(line)
+                if 'day' in item:
+                    entry['days'][item['day']] = item['record']
+                    entry['lines'] += 1
+        if entry['offset'] == 0:
+            entry['head'] = chunk[:min(end, LOG_HEAD_BYTES)]
+        entry['offset'] += end
+        entry.update(mtime=st.st_mtime_ns, size=st.st_size)
+        return entry
+
+    def _append_tracking(self, username: str, day: str, record: Dict) -> bool:
+        line = self._tracking_log_line(day, record).encode('utf-8')
+        path = self._tracking_log_path(username)
+        with self._tracking_lock(username), locked(path):
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                instrumentation.add('bytes_written', len(line))
+            finally:
+                os.close(fd)
+            entry = self._refresh_tracking_index(username)
+            needs_compaction = entry['lines'] > max(COMPACT_MIN_LINES, 2 * len(entry['days']))
+        if needs_compaction:
+            with self._locks_guard:
+                # una sola compactación pendiente por usuario
+                start = username not in self._compacting
+                self._compacting.add(username)
+            if start:
+                threading.Thread(target=self._compact_in_background, args=(username,), daemon=True).start()
+        return True
+
+    def _compact_in_background(self, username: str) -> None:
+        try:
+            self.compact_tracking(username)
+        finally:
+            with self._locks_guard:
+                self._compacting.discard(username)
+
+    def compact_tracking(self, username: str) -> None:
+        """Reescribe el log de un usuario dejando solo el último registro de cada día."""
+        path = self._tracking_log_path(username)
+        with self._tracking_lock(username), locked(path):
+            entry = self._refresh_tracking_index(username)
+            if entry['ino'] is None:
+                return
+            header = self._tracking_log_header()
+            data = header + ''.join(self._tracking_log_line(day, record) for day, record in entry['days'].items())
+            atomic_write_bytes(path, data.encode('utf-8'))
+            st = os.stat(path)
+            entry.update(ino=st.st_ino, mtime=st.st_mtime_ns, size=st.st_size, offset=st.st_size,
+                         head=header.encode('utf-8')[:LOG_HEAD_BYTES], lines=len(entry['days']))
+    
+    def save_routine(self, username: str, routine: Dict, updated_at: Optional[str] = None) -> bool:
+        """Guarda la rutina de un usuario."""
+        entry = {
+            'routine': copy.deepcopy(routine),
+            'updated_at': updated_at or datetime.now().isoformat()
+        }
+
+        def op(routines):
+            routines[username] = entry
+        self._cache.update(self.routines_file, op)
+        return True
+    
+    def get_routine(self, username: str) -> Optional[Dict]:
+        """Obtiene la rutina de un usuario."""
+        return self._cache.read_copy(self.routines_file, lambda routines: routines.get(username, {}).get('routine'))
+
+    def get_routine_updated_at(self, username: str) -> Optional[str]:
+        return self._cache.read(self.routines_file).get(username, {}).get('updated_at')
+
+    def _analytics_path(self, username: str) -> str:
+        return os.path.join(self.analytics_dir, quote(username, safe='') + '.json')
+
+    def update_analytics(self, username: str, update: Callable[[Optional[Dict]], Dict]) -> Dict:
+        """Actualiza los agregados de seguimiento del usuario (ver src.tracking_analytics)."""
+        path = self._analytics_path(username)
+        if not os.path.exists(path):
+            with locked(path):
+                if not os.path.exists(path):
+                    atomic_write_json(path, {}, indent=None)
+
+        def op(doc):
+            # un documento vacío es un usuario sin agregados todavía
+            new = update(doc or None)
+            if new is None:
+                return None
+            if new is not doc:
+                doc.clear()
+                doc.update(new)
+            # la copia se toma dentro de op, con el lock del caché
+            return copy.deepcopy(doc)
+        return self._cache.update(path, op)
+
+    def get_analytics(self, username: str) -> Optional[Dict]:
+        """Obtiene los agregados de seguimiento del usuario (None si aún no hay)."""
+        path = self._analytics_path(username)
+        if not os.path.exists(path):
+            return None
+        return self._cache.read_copy(path) or None
+
+    def flush(self) -> None:
+        """Persiste las escrituras pendientes (durabilidad "interval" o "manual")."""
+        self._cache.flush()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores del caché de documentos: hits, misses, writes, flushes y pending."""
+        return {**self._cache.stats, 'pending': self._cache.pending()}
+
+    def close(self) -> None:
+        self._cache.close()
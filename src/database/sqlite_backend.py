@@ -0,0 +1,322 @@
+"""Backend de almacenamiento en SQLite.
+
+Una base `muscle_rpg.sqlite3` dentro de `data_dir`, en modo WAL (lectores y un
+escritor concurrentes, también entre procesos), con tablas indexadas para
+usuarios, perfiles, seguimiento, rutinas y agregados del seguimiento. Perfiles,
+registros de seguimiento, rutinas y agregados se guardan como texto JSON.
+
+Las conexiones se reutilizan desde un pool acotado (Streamlit ejecuta cada
+rerun en un hilo nuevo, así que una conexión por hilo se perdería), y como las
+consultas son cadenas constantes, el caché de sentencias de `sqlite3` las
+prepara una sola vez por conexión. `close()` cierra las conexiones libres y las
+que estén en uso se cierran al devolverse; después el backend rechaza nuevas
+operaciones.
+
+Migración desde los archivos JSON existentes:
+
+    python -m src.database.sqlite_backend [data_dir]
+"""
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Union
+from urllib.parse import unquote
+
+from src import instrumentation
+from src.database.backend import StorageBackend
+from src.database.json_backend import read_tracking_log
+
+DB_FILENAME = "muscle_rpg.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    profile TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tracking (
+    username TEXT NOT NULL,
+    day TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (username, day)
+);
+CREATE TABLE IF NOT EXISTS routines (
+    username TEXT PRIMARY KEY,
+    routine TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analytics (
+    username TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+# el upsert conserva el rowid original, así get_tracking devuelve los días en
+# el orden en que se guardaron por primera vez (igual que el dict de tracking.json)
+_UPSERT_TRACKING = (
+    "INSERT INTO tracking (username, day, record) VALUES (?, ?, ?) "
+    "ON CONFLICT (username, day) DO UPDATE SET record = excluded.record"
+)
+_UPSERT_ROUTINE = (
+    "INSERT INTO routines (username, routine, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT (username) DO UPDATE SET routine = excluded.routine, updated_at = excluded.updated_at"
+)
+_UPSERT_ANALYTICS = (
+    "INSERT INTO analytics (username, data) VALUES (?, ?) "
+    "ON CONFLICT (username) DO UPDATE SET data = excluded.data"
+)
+_UPSERT_PROFILE = (
+    "INSERT INTO profiles (username, profile) VALUES (?, ?) "
+    "ON CONFLICT (username) DO UPDATE SET profile = excluded.profile"
+)
+
+
+# contadores de instrumentación: se cuentan caracteres del texto JSON (≈ bytes)
+def _loads(text: str):
+    instrumentation.add("bytes_parsed", len(text))
+    return json.loads(text)
+
+
+def _dumps(obj) -> str:
+    text = json.dumps(obj, ensure_ascii=False)
+    instrumentation.add("bytes_written", len(text))
+    return text
+
+
+class SqliteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, data_dir: str = "src/database/data", db_path: str = None, timeout: float = 30.0,
+                 max_connections: int = 8):
+        """Abre (o crea) la base SQLite de `data_dir`."""
+        self.data_dir = data_dir
+        self.db_path = db_path or os.path.join(data_dir, DB_FILENAME)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._conn() as conn, conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: la conexión pasa entre hilos, pero el pool
+        # garantiza que solo la usa uno a la vez
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, cached_statements=64, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        """Toma una conexión del pool (creándola si hay cupo) y la devuelve al terminar."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._connections_lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("SqliteBackend cerrado")
+                if len(self._connections) < self.max_connections:
+                    conn = self._connect()
+                    self._connections.append(conn)
+            if conn is None:
+                conn = self._pool.get()
+        if conn is None:
+            # marca de cierre: se deja para los demás hilos que esperan
+            self._pool.put(None)
+            raise sqlite3.ProgrammingError("SqliteBackend cerrado")
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # bajo el bloqueo: o entra al pool antes de que close() lo vacíe, o se cierra aquí
+        with self._connections_lock:
+            if not self._closed:
+                self._pool.put(conn)
+                return
+            self._connections.remove(conn)
+        conn.close()
+
+    def close(self) -> None:
+        """Cierra las conexiones libres; las que están en uso se cierran al devolverse."""
+        with self._connections_lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle = []
+            while True:
+                try:
+                    idle.append(self._pool.get_nowait())
+                except queue.Empty:
+                    break
+            for conn in idle:
+                self._connections.remove(conn)
+            # despierta a los hilos bloqueados esperando una conexión
+            self._pool.put(None)
+        for conn in idle:
+            conn.close()
+
+    def register_user(self, username: str, password: str) -> bool:
+        with self._conn() as conn, conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                (username, password, datetime.now().isoformat()),  # En producción usar hash
+            )
+        return cur.rowcount == 1
+
+    def validate_login(self, username: str, password: str) -> bool:
+        with self._conn() as conn:
+            row = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row is not None and row[0] == password
+
+    def save_profile(self, username: str, profile: Dict) -> bool:
+        with self._conn() as conn, conn:
+            if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is None:
+                return False
+            conn.execute(_UPSERT_PROFILE, (username, _dumps(profile)))
+        return True
+
+    def get_profile(self, username: str) -> Optional[Dict]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT profile FROM profiles WHERE username = ?", (username,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def get_routine_updated_at(self, username: str) -> Optional[str]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT updated_at FROM routines WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def save_tracking(self, username: str, day: int, tracking_data: Dict, saved_at: Optional[str] = None) -> bool:
+        record = {
+            **tracking_data,
+            'date': saved_at or datetime.now().isoformat()
+        }
+        with self._conn() as conn, conn:
+            conn.execute(_UPSERT_TRACKING, (username, str(day), _dumps(record)))
+        return True
+
+    def get_tracking(self, username: str, day: Optional[int] = None) -> Union[Dict, List[Dict]]:
+        with self._conn() as conn:
+            if day is not None:
+                row = conn.execute(
+                    "SELECT record FROM tracking WHERE username = ? AND day = ?", (username, str(day))
+                ).fetchone()
+                return _loads(row[0]) if row else {}
+            rows = conn.execute(
+                "SELECT day, record FROM tracking WHERE username = ? ORDER BY rowid", (username,)
+            ).fetchall()
+        return {d: _loads(record) for d, record in rows}
+
+    def save_routine(self, username: str, routine: Dict, updated_at: Optional[str] = None) -> bool:
+        with self._conn() as conn, conn:
+            conn.execute(_UPSERT_ROUTINE, (username, _dumps(routine), updated_at or datetime.now().isoformat()))
+        return True
+
+    def get_routine(self, username: str) -> Optional[Dict]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT routine FROM routines WHERE username = ?", (username,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def update_analytics(self, username: str, update: Callable[[Optional[Dict]], Dict]) -> Dict:
+        with self._conn() as conn, conn:
+            # BEGIN IMMEDIATE: leer y escribir dentro del mismo bloqueo de escritura
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM analytics WHERE username = ?", (username,)).fetchone()
+            doc = update(_loads(row[0]) if row else None)
+            if doc is not None:
+                conn.execute(_UPSERT_ANALYTICS, (username, _dumps(doc)))
+        return doc
+
+    def get_analytics(self, username: str) -> Optional[Dict]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT data FROM analytics WHERE username = ?", (username,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def migrate_from_json(self, json_data_dir: str) -> Dict[str, int]:
+        """Importa users.json, tracking.json (o tracking_log/), routines.json y analytics/ de `json_data_dir`.
+
+        Conserva fechas de creación, de guardado del seguimiento y de actualización
+        de rutinas. Los registros existentes con la misma clave se sobrescriben.
+        Los agregados de un usuario con seguimiento importado pero sin archivo en
+        analytics/ se borran, para que se reconstruyan desde el historial nuevo.
+        Devuelve cuántas filas se importaron por tabla.
+        """
+        def read(name):
+            path = os.path.join(json_data_dir, name)
+            if not os.path.exists(path):
+                return {}
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        users = read("users.json")
+        routines = read("routines.json")
+        tracking = read("tracking.json")
+        log_dir = os.path.join(json_data_dir, "tracking_log")
+        if os.path.isdir(log_dir):
+            # el log es la fuente de verdad cuando se usó tracking_mode="log"; se lee
+            # directamente (sin JsonBackend, que crearía archivos en json_data_dir)
+            tracking = {}
+            for name in sorted(os.listdir(log_dir)):
+                if name.endswith(".jsonl"):
+                    username = unquote(name[:-len(".jsonl")])
+                    tracking[username] = read_tracking_log(os.path.join(log_dir, name))
+        analytics = {}
+        analytics_dir = os.path.join(json_data_dir, "analytics")
+        if os.path.isdir(analytics_dir):
+            for name in sorted(os.listdir(analytics_dir)):
+                if name.endswith(".json"):
+                    # un archivo vacío ({}) es un usuario sin agregados todavía
+                    doc = read(os.path.join("analytics", name))
+                    if doc:
+                        analytics[unquote(name[:-len(".json")])] = doc
+
+        counts = {"users": 0, "profiles": 0, "tracking": 0, "routines": 0, "analytics": 0}
+        with self._conn() as conn, conn:
+            for username, data in users.items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                    (username, data.get('password', ''), data.get('created_at') or datetime.now().isoformat()),
+                )
+                counts["users"] += 1
+                if data.get('profile') is not None:
+                    conn.execute(_UPSERT_PROFILE, (username, json.dumps(data['profile'], ensure_ascii=False)))
+                    counts["profiles"] += 1
+            for username, days in tracking.items():
+                for day, record in days.items():
+                    conn.execute(_UPSERT_TRACKING, (username, str(day), json.dumps(record, ensure_ascii=False)))
+                    counts["tracking"] += 1
+            for username, data in routines.items():
+                conn.execute(
+                    _UPSERT_ROUTINE,
+                    (username, json.dumps(data.get('routine'), ensure_ascii=False),
+                     data.get('updated_at') or datetime.now().isoformat()),
+                )
+                counts["routines"] += 1
+            for username, doc in analytics.items():
+                conn.execute(_UPSERT_ANALYTICS, (username, json.dumps(doc, ensure_ascii=False)))
+                counts["analytics"] += 1
+            for username in tracking.keys() - analytics.keys():
+                conn.execute("DELETE FROM analytics WHERE username = ?", (username,))
+        return counts
+
+
+if __name__ == "__main__":
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else "src/database/data"
+    backend = SqliteBackend(source_dir)
+    imported = backend.migrate_from_json(source_dir)
+    backend.close()
+    print(f"Migrado a {backend.db_path}: " + ", ".join(f"{k}={v}" for k, v in imported.items()))
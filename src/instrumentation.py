@@ -0,0 +1,266 @@
+"""Instrumentación opcional: spans cronometrados y contadores de las rutas calientes.
+
+Desactivada por defecto. Con la instrumentación apagada, `span()` devuelve un
+context manager nulo compartido y `add()` / `traced` solo comprueban una
+variable global, así que el coste es prácticamente nulo.
+
+Se activa con $MUSCLERPG_INSTRUMENTATION o con `configure()`:
+
+- "memory": solo el buffer en memoria (`recent_spans()`, página de admin);
+- "jsonl:<ruta>": además, una línea JSON por span en `<ruta>` (cada línea se
+  vuelca al escribirla, así el archivo se puede seguir con `tail -f`);
+- "prometheus:<ruta>": además, métricas agregadas en formato de texto de
+  Prometheus en `<ruta>` (reescrito como mucho cada `PROMETHEUS_INTERVAL`
+  segundos y al salir), para el textfile collector de node_exporter.
+
+Un span registra nombre, duración, span padre (en el mismo hilo) y
+atributos. `add(nombre, n)` suma a un contador global y al atributo del mismo
+nombre del span activo, así los bytes leídos por `read_json` quedan asociados
+al `db.get_routine` que los pidió.
+
+Spans instrumentados: `catalog.load`, `items.build`, `knapsack.solve` (por día:
+items considerados, capacidad y `knapsack_cells`, las celdas de la DP que el
+solver relaja de verdad) y `db.<método>` de
+`DatabaseManager` (con `bytes_parsed` / `bytes_written`).
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+INSTRUMENTATION_ENV = "MUSCLERPG_INSTRUMENTATION"
+RECENT_SPANS = 1000
+PROMETHEUS_INTERVAL = 5.0
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SPANS)
+_counters: Dict[str, float] = {}
+# nombre -> [cantidad, segundos totales]
+_span_totals: Dict[str, List[float]] = {}
+_sink: Optional["Sink"] = None
+
+
+class Sink:
+    """Destino de los spans terminados."""
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonLinesSink(Sink):
+    def __init__(self, path: str):
+        self.path = path
+        # buffer de línea: cada span llega al disco al emitirse, no solo al salir
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusSink(Sink):
+    def __init__(self, path: str, interval: float = PROMETHEUS_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        if time.monotonic() - self._last_write >= self.interval:
+            with self._lock:
+                # otro hilo pudo escribir mientras esperábamos el lock
+                if time.monotonic() - self._last_write >= self.interval:
+                    self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def _write(self) -> None:
+        # escritura atómica propia (temporal + os.replace): `atomic_io` cuenta los
+        # bytes escritos con `add`, y el archivo de métricas no debe contarse
+        self._last_write = time.monotonic()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(prometheus_text().encode("utf-8"))
+        os.replace(tmp, self.path)
+
+
+def _make_sink(spec: str) -> Optional[Sink]:
+    kind, _, path = spec.partition(":")
+    if kind == "memory":
+        return None
+    if kind == "jsonl" and path:
+        return JsonLinesSink(path)
+    if kind == "prometheus" and path:
+        return PrometheusSink(path)
+    raise ValueError(f"destino de instrumentación desconocido: {spec!r} "
+                     f"(opciones: memory, jsonl:<ruta>, prometheus:<ruta>)")
+
+
+def configure(enabled: bool = True, sink: str = "memory") -> None:
+    """Activa (con el destino `sink`, ver el docstring del módulo) o desactiva la instrumentación."""
+    global _enabled, _sink
+    new_sink = _make_sink(sink) if enabled else None
+    with _lock:
+        old_sink, _sink = _sink, new_sink
+        _enabled = enabled
+    if old_sink is not None:
+        old_sink.close()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _stack() -> List[Dict[str, Any]]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class _NullSpan:
+    """Context manager de `span()` con la instrumentación apagada."""
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@contextmanager
+def _span(name: str, attrs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    stack = _stack()
+    parent = stack[-1]["name"] if stack else None
+    record = {"name": name, "parent": parent, "start": time.time(), **attrs}
+    stack.append(record)
+    t0 = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = (time.perf_counter() - t0) * 1000
+        stack.pop()
+        _finish(record)
+
+
+def span(name: str, **attrs: Any):
+    """Cronometra un bloque. Devuelve un dict de atributos que el bloque puede completar."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _span(name, attrs)
+
+
+def traced(name: str) -> Callable:
+    """Decorador: cada llamada a la función es un span `name`."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add(name: str, value: float = 1) -> None:
+    """Suma `value` al contador `name` y al atributo `name` del span activo."""
+    if not _enabled:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1][name] = stack[-1].get(name, 0) + value
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def _finish(record: Dict[str, Any]) -> None:
+    with _lock:
+        _recent.append(record)
+        totals = _span_totals.setdefault(record["name"], [0, 0.0])
+        totals[0] += 1
+        totals[1] += record["ms"] / 1000
+        sink = _sink
+    if sink is not None:
+        sink.emit(record)
+
+
+def recent_spans(limit: int = None) -> List[Dict[str, Any]]:
+    """Últimos spans terminados, del más reciente al más antiguo."""
+    with _lock:
+        spans = list(_recent)
+    spans.reverse()
+    return spans[:limit] if limit is not None else spans
+
+
+def snapshot() -> Dict[str, Any]:
+    """Contadores y totales por span (cantidad, segundos) acumulados en el proceso."""
+    with _lock:
+        return {"enabled": _enabled, "counters": dict(_counters),
+                "spans": {name: {"count": int(c), "seconds": s} for name, (c, s) in _span_totals.items()}}
+
+
+def reset() -> None:
+    with _lock:
+        _recent.clear()
+        _counters.clear()
+        _span_totals.clear()
+
+
+def _metric_name(name: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+def prometheus_text() -> str:
+    """Métricas agregadas en formato de texto de Prometheus."""
+    snap = snapshot()
+    lines = ["# TYPE musclerpg_span_seconds summary"]
+    for name, totals in sorted(snap["spans"].items()):
+        lines.append(f'musclerpg_span_seconds_count{{span="{name}"}} {totals["count"]}')
+        lines.append(f'musclerpg_span_seconds_sum{{span="{name}"}} {totals["seconds"]:.6f}')
+    for name, value in sorted(snap["counters"].items()):
+        metric = f"musclerpg_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def flush() -> None:
+    with _lock:
+        sink = _sink
+    if sink is not None:
+        sink.flush()
+
+
+atexit.register(flush)
+
+if os.environ.get(INSTRUMENTATION_ENV):
+    configure(True, os.environ[INSTRUMENTATION_ENV])
@@ -0,0 +1,138 @@
+"""Generación de rutinas en segundo plano, con progreso por día.
+
+La página 'Mi rutina' no debe bloquear su script mientras se resuelve la
+semana. `submit_routine(...)` encola la generación en un pool de hilos y
+devuelve un id de trabajo; `get_job(id)` devuelve su estado, incluida la parte
+de la semana ya resuelta (el día 1 aparece mientras se resuelven los demás).
+
+- Deduplicación: el id se deriva de la clave de `routine_cache` (parámetros +
+  sha256 del catálogo), así que pedir la misma rutina mientras se genera, o
+  después, devuelve el mismo trabajo en lugar de lanzar otro. Un trabajo con
+  error no se reutiliza.
+- La generación pasa por `routine_cache.generate_routine_cached`: una rutina
+  ya generada termina al instante.
+- La tabla de trabajos está acotada (`MAX_JOBS`): al superarla se descartan
+  los trabajos terminados más antiguos (nunca los pendientes o en curso).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src import routine_cache
+
+MAX_WORKERS = 2
+MAX_JOBS = 64
+
+PENDING, RUNNING, DONE, ERROR = "pending", "running", "done", "error"
+
+
+class Job:
+    def __init__(self, job_id: str, num_days: int):
+        self.id = job_id
+        self.status = PENDING
+        self.days_total = num_days
+        # día -> ejercicios, a medida que se resuelven
+        self.days: Dict[int, List[Dict[str, Any]]] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, ERROR)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "days_done": len(self.days),
+            "days_total": self.days_total,
+            "schedule": {f"day_{d}": copy.deepcopy(items) for d, items in sorted(self.days.items())},
+            "result": copy.deepcopy(self.result),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRunner:
+    def __init__(self, max_workers: int = MAX_WORKERS, max_jobs: int = MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="routine-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit_routine(self, num_days: int, time_per_session: int = 120, exercises_path: str = None,
+                       user_level: Any = 2, solver: str = "python") -> str:
+        """Encola (o reutiliza) la generación de una rutina y devuelve el id del trabajo."""
+        job_id = routine_cache.RoutineCache.key(num_days, time_per_session, exercises_path, user_level, solver)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != ERROR:
+                self._jobs.move_to_end(job_id)
+                return job_id
+            job = Job(job_id, num_days)
+            self._jobs[job_id] = job
+            self._evict()
+        self._pool.submit(self._run, job, num_days, time_per_session, exercises_path, user_level, solver)
+        return job_id
+
+    def _run(self, job: Job, num_days: int, time_per_session: int, exercises_path: Optional[str],
+             user_level: Any, solver: str) -> None:
+        def progress(day: int, items: List[Dict[str, Any]]) -> None:
+            items = copy.deepcopy(items)
+            with self._lock:
+                job.days[day] = items
+
+        with self._lock:
+            job.status = RUNNING
+        try:
+            routine = routine_cache.generate_routine_cached(num_days, time_per_session, exercises_path,
+                                                            user_level, solver, progress)
+        except Exception as e:  # noqa: BLE001 - el error se informa en el estado del trabajo
+            with self._lock:
+                job.status, job.error, job.finished_at = ERROR, f"{type(e).__name__}: {e}", time.time()
+            return
+        with self._lock:
+            job.status, job.result, job.finished_at = DONE, routine, time.time()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado del trabajo (copia), o None si no existe o fue descartado."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def _evict(self) -> None:
+        # descartar los terminados más antiguos; los pendientes y en curso se conservan
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, ERROR: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return dict(counts, size=len(self._jobs), max_jobs=self.max_jobs)
+
+
+_runner = JobRunner()
+
+
+def submit_routine(num_days: int, time_per_session: int = 120, exercises_path: str = None,
+                   user_level: Any = 2, solver: str = "python") -> str:
+    return _runner.submit_routine(num_days, time_per_session, exercises_path, user_level, solver)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return _runner.get(job_id)
+
+
+def job_stats() -> Dict[str, int]:
+    return _runner.stats()
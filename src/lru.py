@@ -0,0 +1,117 @@
+"""Caché LRU acotado, seguro entre hilos, con estadísticas."""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Diccionario acotado a `maxsize` entradas que descarta la menos usada recientemente.
+
+    `maxsize=0` desactiva el caché (nada se guarda). Con `maxbytes` también se
+    acota la suma de `sizeof(valor)` (por defecto `len`, p. ej. para bytes); un
+    valor más grande que `maxbytes` no se guarda.
+    """
+
+    def __init__(self, maxsize: int = 128, maxbytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = len):
+        if maxsize < 0:
+            raise ValueError("maxsize debe ser >= 0")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes debe ser >= 0")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if self.maxsize == 0:
+                return
+            size = self._sizeof(value) if self.maxbytes is not None else 0
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._discard(key)
+            self._data[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            self._evict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Valor de `key`; si no está, lo calcula con `compute()` (fuera del lock) y lo guarda."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, default)
+            self._discard(key)
+            return value
+
+    def resize(self, maxsize: int = None, maxbytes: Optional[int] = None) -> None:
+        """Cambia los límites indicados, descartando las entradas sobrantes más antiguas."""
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize debe ser >= 0")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes debe ser >= 0")
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if maxbytes is not None:
+                if self.maxbytes is None:
+                    self._sizes = {key: self._sizeof(value) for key, value in self._data.items()}
+                    self.nbytes = sum(self._sizes.values())
+                self.maxbytes = maxbytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self._lock:
+            stats = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                     "size": len(self._data), "maxsize": self.maxsize}
+            if self.maxbytes is not None:
+                stats.update(nbytes=self.nbytes, maxbytes=self.maxbytes)
+            return stats
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._data:
+            del self._data[key]
+            self.nbytes -= self._sizes.pop(key, 0)
+
+    def _evict(self) -> None:
+        while self._data and (len(self._data) > self.maxsize
+                              or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            key, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(key, 0)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
@@ -0,0 +1,145 @@
+"""Imágenes de los ejercicios servidas desde `media/<exerciseId>.gif`.
+
+El catálogo trae `gifUrl` apuntando a static.exercisedb.dev, pero el repo ya
+incluye los GIF en `media/` (o en $MUSCLERPG_MEDIA_DIR). Este módulo:
+
+- resuelve cada ejercicio a su archivo local, y solo si no existe usa la URL
+  remota (o nada, si la descarga remota está desactivada con
+  $MUSCLERPG_REMOTE_MEDIA=0, p. ej. en despliegues sin red);
+- lee los bytes solo cuando se piden (las páginas los piden para los ítems que
+  el usuario despliega) y los guarda en un LRU acotado en bytes;
+- opcionalmente sirve una miniatura: el primer fotograma reducido a
+  `THUMBNAIL_SIZE` px, como PNG. Requiere Pillow; sin Pillow, o si Pillow no
+  puede decodificar el archivo, se sirve el GIF completo.
+
+`media_stats()` cuenta los bytes servidos, para medir cuánto pesa un render.
+"""
+import io
+import os
+import threading
+from typing import Any, Dict, Mapping, Optional, Union
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él no hay miniaturas
+    Image = None
+
+from src.lru import LRUCache
+
+MEDIA_DIR = os.environ.get("MUSCLERPG_MEDIA_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media")
+REMOTE_MEDIA = os.environ.get("MUSCLERPG_REMOTE_MEDIA", "1") != "0"
+
+MEDIA_CACHE_BYTES = 32 * 1024 * 1024
+MEDIA_CACHE_ENTRIES = 1024
+THUMBNAIL_SIZE = 160
+
+
+def media_path(exercise_id: Optional[str], media_dir: str = None) -> Optional[str]:
+    """Ruta del GIF local del ejercicio, o None si no existe."""
+    if not exercise_id or os.sep in exercise_id or exercise_id.startswith("."):
+        return None
+    path = os.path.join(media_dir or MEDIA_DIR, exercise_id + ".gif")
+    return path if os.path.isfile(path) else None
+
+
+def make_thumbnail(data: bytes, size: int = THUMBNAIL_SIZE) -> bytes:
+    """Primer fotograma de un GIF reducido a `size` px (lado mayor), como PNG."""
+    with Image.open(io.BytesIO(data)) as img:
+        img.seek(0)
+        frame = img.convert("RGB")
+    frame.thumbnail((size, size))
+    out = io.BytesIO()
+    frame.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+class MediaStore:
+    """Lectura perezosa de los GIF locales con un LRU de bytes codificados."""
+
+    def __init__(self, media_dir: str = None, maxbytes: int = MEDIA_CACHE_BYTES,
+                 maxsize: int = MEDIA_CACHE_ENTRIES, thumbnail_size: int = THUMBNAIL_SIZE):
+        self.media_dir = media_dir or MEDIA_DIR
+        self.thumbnail_size = thumbnail_size
+        self.cache = LRUCache(maxsize, maxbytes=maxbytes)
+        self._lock = threading.Lock()
+        self.served = {"requests": 0, "bytes": 0, "disk_reads": 0, "disk_bytes": 0}
+
+    def get_bytes(self, exercise_id: Optional[str], thumbnail: bool = False) -> Optional[bytes]:
+        """Bytes de la imagen local del ejercicio (miniatura si `thumbnail`), o None."""
+        thumbnail = thumbnail and Image is not None
+        key = (exercise_id, thumbnail)
+        data = self.cache.get(key)
+        if data is None:
+            data = self._load(exercise_id, thumbnail)
+            if data is None:
+                return None
+            self.cache.put(key, data)
+        with self._lock:
+            self.served["requests"] += 1
+            self.served["bytes"] += len(data)
+        return data
+
+    def _load(self, exercise_id: Optional[str], thumbnail: bool) -> Optional[bytes]:
+        path = media_path(exercise_id, self.media_dir)
+        if path is None:
+            return None
+        if thumbnail:
+            # la miniatura se deriva del GIF completo (que puede estar ya en caché)
+            full = self.cache.get((exercise_id, False))
+            if full is None:
+                full = self._read(path)
+            try:
+                return make_thumbnail(full, self.thumbnail_size)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                # GIF dañado o no reconocido (UnidentifiedImageError es un OSError):
+                # el navegador puede que sí lo muestre
+                return full
+        return self._read(path)
+
+    def _read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            self.served["disk_reads"] += 1
+            self.served["disk_bytes"] += len(data)
+        return data
+
+    def image_source(self, exercise: Optional[Mapping[str, Any]], thumbnail: bool = False) -> Union[bytes, str, None]:
+        """Lo que se le pasa a `st.image`: bytes locales, la URL remota como respaldo, o None."""
+        if not exercise:
+            return None
+        data = self.get_bytes(exercise.get("exerciseId"), thumbnail)
+        if data is not None:
+            return data
+        return exercise.get("gifUrl") if REMOTE_MEDIA else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = dict(self.served)
+        return {"served": served, "cache": self.cache.stats()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.served = dict.fromkeys(self.served, 0)
+
+
+_store = MediaStore()
+
+
+def image_source(exercise: Optional[Mapping[str, Any]], thumbnail: bool = False) -> Union[bytes, str, None]:
+    """Imagen del ejercicio para `st.image` (ver `MediaStore.image_source`), con el almacén del proceso."""
+    return _store.image_source(exercise, thumbnail)
+
+
+def get_bytes(exercise_id: Optional[str], thumbnail: bool = False) -> Optional[bytes]:
+    return _store.get_bytes(exercise_id, thumbnail)
+
+
+def configure(maxbytes: int = None, maxsize: int = None) -> None:
+    """Cambia los límites del LRU de imágenes del proceso."""
+    _store.cache.resize(maxsize, maxbytes)
+
+
+def media_stats() -> Dict[str, Any]:
+    return _store.stats()
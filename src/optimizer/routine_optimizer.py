@@ -0,0 +1,362 @@
+"""Optimizador de sesiones basado en grafo de transiciones + Programación Dinámica.
+
+Implementa la formulación descrita en el README:
+
+    V(t, M, last) = max_e  value(e, M, last) + V(t - time(e), M ∪ muscles(e), e)
+
+con memoización y backtracking, pensada para ejecutarse sobre el catálogo
+completo dentro de un presupuesto de latencia:
+
+- Los ejercicios equivalentes para el DP (mismos músculos objetivo, mismo
+  equipamiento y mismo tiempo) se agrupan en clases; el DP elige clases y la
+  reconstrucción asigna ejercicios concretos distintos de cada clase.
+- `M` es un entero usado como bitmask de músculos y la clave de memoización es
+  un único entero que codifica (t, M, last).
+- Las transiciones salen del grafo top-k precalculado del catálogo
+  (`catalog.get_catalog().transition_graph`, ver `src.transition_graph`): una
+  clase tiene arista hacia otra si algún ejercicio de la primera tiene entre
+  sus sucesores uno de la segunda, con el mayor de esos pesos. Se guardan como
+  listas de adyacencia dispersas (vecino, bonus) por clase; el bucle caliente
+  no consulta networkx.
+- Poda por cota superior: si el valor inmediato de un candidato más la mejor
+  densidad valor/minuto posible para el tiempo restante no supera lo ya
+  encontrado, no se explora.
+- Límite de estados y de tiempo: al superarlos, los estados nuevos se completan
+  de forma voraz (la rutina sigue siendo válida, pero deja de ser exacta;
+  `last_stats['exact']` lo indica).
+"""
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src import catalog, transition_graph
+from src.routine_builder import _choose_reps_sets_for_exercise, estimate_sets_and_time, is_compound
+
+# Fracción del valor de un músculo que aporta si ya se trabajó en la sesión
+REPEAT_FACTOR = 0.25
+# Peso de los músculos fuera de target_muscles (si se indicaron objetivos)
+NON_TARGET_WEIGHT = 0.25
+# Bonus máximo por transición entre ejercicios consecutivos: el peso de la arista del
+# grafo (cambio de músculo y continuidad de equipamiento) escalado a [0, TRANSITION_BONUS]
+TRANSITION_BONUS = 0.2
+MAX_TRANSITION_WEIGHT = transition_graph.MUSCLE_CHANGE_WEIGHT + transition_graph.EQUIPMENT_WEIGHT
+
+DEFAULT_MAX_STATES = 200_000
+DEFAULT_TIME_BUDGET_MS = 500.0
+
+
+class RoutineOptimizer:
+    def __init__(self, data_path: str = None, max_states: int = DEFAULT_MAX_STATES,
+                 time_budget_ms: float = DEFAULT_TIME_BUDGET_MS):
+        """`data_path` puede ser un `exercises.json` o un directorio que lo contenga."""
+        if data_path and os.path.isdir(data_path):
+            data_path = os.path.join(data_path, "exercises.json")
+        self.exercises_path = data_path if data_path and os.path.exists(data_path) else None
+        self.max_states = max_states
+        self.time_budget_ms = time_budget_ms
+        self.last_stats: Dict[str, Any] = {}
+
+    def optimize_workout(self, time_available: int, user_level: int = 2,
+                         target_muscles: Optional[Iterable[str]] = None,
+                         equipment_available: Optional[Set[str]] = None,
+                         stamina: Optional[Dict[str, float]] = None,
+                         goal: str = "hypertrophy") -> List[Dict[str, Any]]:
+        """Devuelve la secuencia de ejercicios de una sesión de `time_available` minutos.
+
+        - target_muscles: músculos a priorizar (None = todos por igual).
+        - equipment_available: equipamiento del usuario (None = todo disponible).
+        - stamina: frescura por músculo en [0, 1] (por defecto 1.0).
+        """
+        t0 = time.perf_counter()
+        exercises = catalog.get_catalog(self.exercises_path)
+        problem = _Problem(exercises.exercises, exercises.transition_graph, user_level, goal, target_muscles,
+                           equipment_available, stamina or {})
+        routine = problem.solve(int(time_available), self.max_states, t0 + self.time_budget_ms / 1000)
+        self.last_stats = {**problem.stats, "elapsed_ms": (time.perf_counter() - t0) * 1000}
+        return routine
+
+    def score(self, routine: List[Dict[str, Any]], target_muscles: Optional[Iterable[str]] = None,
+              stamina: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Puntúa una rutina (de este optimizador o de otro motor) con la misma función objetivo."""
+        exercises = catalog.get_catalog(self.exercises_path)
+        problem = _Problem(exercises.exercises, exercises.transition_graph, 2, "hypertrophy", target_muscles, None,
+                           stamina or {})
+        return problem.score(routine)
+
+    @property
+    def exercise_graph(self):
+        """Grafo de transiciones entre clases de ejercicios como `networkx.DiGraph` (para inspección)."""
+        import networkx as nx
+
+        exercises = catalog.get_catalog(self.exercises_path)
+        problem = _Problem(exercises.exercises, exercises.transition_graph, 2, "hypertrophy", None, None, {})
+        graph = nx.DiGraph()
+        for a, neighbors in enumerate(problem.adjacency):
+            graph.add_node(a, exercises=[ex.get("exerciseId") for ex in problem.members[a]])
+            for b, weight in neighbors:
+                graph.add_edge(a, b, weight=weight)
+        return graph
+
+
+class _Problem:
+    """Datos preparados para el DP: clases de ejercicios, bitmasks y adyacencia."""
+
+    def __init__(self, exercises, graph, level, goal, target_muscles, equipment_available, stamina):
+        targets = {m.lower() for m in target_muscles} if target_muscles else None
+        equipment = {e.lower() for e in equipment_available} if equipment_available is not None else None
+
+        # agrupar ejercicios equivalentes para el DP
+        classes: Dict[tuple, int] = {}
+        self.members: List[List[Dict[str, Any]]] = []
+        # clase de cada ejercicio (por exerciseId); los descartados por equipamiento no tienen
+        self.class_by_id: Dict[str, int] = {}
+        class_of = [-1] * len(exercises)
+        self.times: List[int] = []
+        self.masks: List[int] = []
+        self.equipments: List[frozenset] = []
+        self.muscle_bit: Dict[str, int] = {}
+        for i, ex in enumerate(exercises):
+            muscles = tuple(sorted({m.lower() for m in ex.get("targetMuscles", [])}))
+            eqs = frozenset(e.lower() for e in ex.get("equipments", []))
+            if equipment is not None and eqs and not eqs & equipment:
+                continue
+            _, minutes = estimate_sets_and_time(ex)
+            key = (muscles, eqs, minutes)
+            c = classes.get(key)
+            if c is None:
+                c = classes[key] = len(self.members)
+                mask = 0
+                for m in muscles:
+                    mask |= 1 << self.muscle_bit.setdefault(m, len(self.muscle_bit))
+                self.members.append([])
+                self.times.append(minutes)
+                self.masks.append(mask)
+                self.equipments.append(eqs)
+            self.members[c].append(ex)
+            self.class_by_id[ex.get("exerciseId")] = class_of[i] = c
+
+        # valor de cada músculo (objetivo y frescura)
+        self.muscle_value = [0.0] * len(self.muscle_bit)
+        for m, bit in self.muscle_bit.items():
+            weight = 1.0 if targets is None or m in targets else NON_TARGET_WEIGHT
+            self.muscle_value[bit] = weight * float(stamina.get(m, 1.0))
+        self.full_value = [self._mask_value(mask) for mask in self.masks]
+
+        # adyacencia entre clases a partir de las aristas del grafo precalculado, O(n·k)
+        n = len(self.members)
+        weights: List[Dict[int, float]] = [{} for _ in range(n)]
+        for i, a in enumerate(class_of):
+            if a < 0:
+                continue
+            successors, edge_weights = graph.neighbors(i)
+            for j, w in zip(successors.tolist(), edge_weights.tolist()):
+                b = class_of[j]
+                if b >= 0 and b != a and w > weights[a].get(b, -1.0):
+                    weights[a][b] = w
+        self.adjacency: List[List[tuple]] = [
+            sorted((b, self.transition_bonus(w)) for b, w in neighbors.items()) for neighbors in weights
+        ]
+        self.bonus_to = [dict(neighbors) for neighbors in self.adjacency]
+        self.max_bonus = max((bonus for neighbors in self.adjacency for _, bonus in neighbors), default=0.0)
+        self.start = [(b, 0.0) for b in range(n)]
+
+        self.level = level
+        self.goal = goal
+        self.stats: Dict[str, Any] = {"classes": n, "states": 0, "pruned": 0, "exact": True}
+
+    @staticmethod
+    def transition_bonus(weight: float) -> float:
+        return TRANSITION_BONUS * weight / MAX_TRANSITION_WEIGHT
+
+    def _mask_value(self, mask: int) -> float:
+        value = 0.0
+        bit = 0
+        while mask:
+            if mask & 1:
+                value += self.muscle_value[bit]
+            mask >>= 1
+            bit += 1
+        return value
+
+    def value(self, c: int, covered: int) -> float:
+        """value(e, M) sin el bonus de transición."""
+        repeated = self.masks[c] & covered
+        if not repeated:
+            return self.full_value[c]
+        return self.full_value[c] - (1 - REPEAT_FACTOR) * self._mask_value(repeated)
+
+    def _upper_bound_fn(self, t_min: int):
+        """Cota superior admisible de V(t, M) (independiente de `last`).
+
+        Cada ejercicio reparte su tiempo entre sus músculos; un músculo nuevo
+        aporta su valor como mucho una vez y ocupa al menos `share[m]` minutos,
+        y las repeticiones aportan como mucho `REPEAT_FACTOR` con la mejor
+        densidad. Es la mochila fraccionaria de esos ítems más el bonus máximo
+        de transición por cada ejercicio que quepa.
+        """
+        share = [float("inf")] * len(self.muscle_bit)
+        for c, mask in enumerate(self.masks):
+            count = bin(mask).count("1")
+            bit = 0
+            while mask:
+                if mask & 1:
+                    share[bit] = min(share[bit], self.times[c] / count)
+                mask >>= 1
+                bit += 1
+        items = sorted(
+            ((self.muscle_value[b] / share[b], 1 << b, self.muscle_value[b], share[b])
+             for b in range(len(share)) if self.muscle_value[b] > 0 and share[b] > 0),
+            reverse=True,
+        )
+        repeat_density = REPEAT_FACTOR * items[0][0] if items else 0.0
+
+        def upper_bound(t: int, covered: int) -> float:
+            if t < t_min:
+                return 0.0
+            value = self.max_bonus * (t // t_min)
+            left = float(t)
+            for density, bit, muscle_value, minutes in items:
+                if density <= repeat_density:
+                    break
+                if covered & bit:
+                    continue
+                if minutes >= left:
+                    return value + density * left
+                value += muscle_value
+                left -= minutes
+            return value + repeat_density * left
+
+        return upper_bound
+
+    def solve(self, capacity: int, max_states: int, deadline: float) -> List[Dict[str, Any]]:
+        n = len(self.members)
+        if n == 0:
+            return []
+        t_min = min(self.times)
+        n_bits = len(self.muscle_bit)
+        dp: Dict[int, float] = {}
+        backtrack: Dict[int, int] = {}
+        bounds: Dict[int, float] = {}
+        stats = self.stats
+        times, masks, adjacency, start = self.times, self.masks, self.adjacency, self.start
+        upper_bound = self._upper_bound_fn(t_min)
+
+        def key(t, covered, last):
+            return ((t << n_bits) | covered) * (n + 1) + last + 1
+
+        def greedy(t, covered, last):
+            # completar sin explorar: siempre el mayor valor por minuto que quepa
+            k = key(t, covered, last)
+            if k in dp:
+                return dp[k]
+            best, best_c, best_density = 0.0, -1, 0.0
+            for c, bonus in (adjacency[last] if last >= 0 else start):
+                if times[c] <= t:
+                    v = self.value(c, covered) + bonus
+                    if v / times[c] > best_density:
+                        best, best_c, best_density = v, c, v / times[c]
+            if best_c >= 0:
+                best += greedy(t - times[best_c], covered | masks[best_c], best_c)
+            dp[k] = best
+            backtrack[k] = best_c
+            return best
+
+        def solve_dp(t, covered, last):
+            if t < t_min:
+                return 0.0
+            k = key(t, covered, last)
+            if k in dp:
+                return dp[k]
+            if stats["states"] >= max_states or time.perf_counter() > deadline:
+                stats["exact"] = False
+                return greedy(t, covered, last)
+            stats["states"] += 1
+
+            candidates = []
+            for c, bonus in (adjacency[last] if last >= 0 else start):
+                if times[c] <= t:
+                    v = self.value(c, covered) + bonus
+                    if v > 0:
+                        candidates.append((v, c))
+            # mayor valor por minuto primero: encuentran antes buenas soluciones y la poda actúa más
+            candidates.sort(key=lambda vc: (-vc[0] / times[vc[1]], vc[1]))
+            best, best_c = 0.0, -1
+            for v, c in candidates:
+                if best_c >= 0 and not stats["exact"]:
+                    # presupuesto agotado: quedarse con lo mejor encontrado en este estado
+                    break
+                remaining = t - times[c]
+                next_covered = covered | masks[c]
+                bound_key = (remaining << n_bits) | next_covered
+                bound = bounds.get(bound_key)
+                if bound is None:
+                    bound = bounds[bound_key] = upper_bound(remaining, next_covered)
+                if v + bound <= best + 1e-9:
+                    stats["pruned"] += 1
+                    continue
+                total = v + solve_dp(remaining, next_covered, c)
+                if total > best:
+                    best, best_c = total, c
+            dp[k] = best
+            backtrack[k] = best_c
+            return best
+
+        best_value = solve_dp(capacity, 0, -1)
+        stats["value"] = best_value
+
+        # reconstrucción siguiendo backtrack; cada uso de una clase toma otro ejercicio
+        routine = []
+        used = [0] * n
+        t, covered, last = capacity, 0, -1
+        while t >= t_min:
+            c = backtrack.get(key(t, covered, last), -1)
+            if c < 0:
+                break
+            ex = self.members[c][used[c] % len(self.members[c])]
+            used[c] += 1
+            sets, reps = _choose_reps_sets_for_exercise(is_compound(ex), self.level, self.goal)
+            routine.append({
+                "id": ex.get("exerciseId"),
+                "name": ex.get("name"),
+                "sets": sets,
+                "reps": reps,
+                "time_min": times[c],
+                "muscles": ex.get("targetMuscles", []),
+                "equipments": ex.get("equipments", []),
+            })
+            t -= times[c]
+            covered |= masks[c]
+            last = c
+        return routine
+
+    def score(self, routine: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Evalúa una secuencia de ejercicios con la función objetivo del DP.
+
+        Las transiciones entre clases sin arista en el grafo (o con ejercicios que
+        no están en el catálogo) no suman bonus y se cuentan en
+        'invalid_transitions'.
+        """
+        total, covered, invalid = 0.0, 0, 0
+        previous = None
+        for k, item in enumerate(routine):
+            mask = 0
+            for m in item.get("muscles", []):
+                bit = self.muscle_bit.get(m.lower())
+                if bit is not None:
+                    mask |= 1 << bit
+            total += self._mask_value(mask) - (1 - REPEAT_FACTOR) * self._mask_value(mask & covered)
+            current = self.class_by_id.get(item.get("id"))
+            if k > 0:
+                bonus = self.bonus_to[previous].get(current) if previous is not None else None
+                if bonus is None:
+                    invalid += 1
+                else:
+                    total += bonus
+            covered |= mask
+            previous = current
+        return {
+            "value": total,
+            "muscles_covered": bin(covered).count("1"),
+            "time_min": sum(item.get("time_min", 0) for item in routine),
+            "invalid_transitions": invalid,
+        }
@@ -0,0 +1,102 @@
+"""Planificación de mesociclos: varias semanas con sobrecarga progresiva y descargas.
+
+`plan_mesocycle(num_weeks, num_days, ...)` devuelve un generador que produce
+una rutina semanal (mismo formato que `generate_routine`) por semana, a medida
+que se calcula, así la UI puede mostrar la semana 1 antes de terminar la 12.
+
+Entre semanas se arrastra el estado en lugar de empezar de cero:
+
+- volumen: el objetivo de sets de cada músculo crece `OVERLOAD_STEP` por semana
+  dentro de cada bloque, y los sets que quedaron sin hacer se suman a la semana
+  siguiente (hasta `MAX_CARRIED_SETS`);
+- estamina: una fracción (`FATIGUE_CARRYOVER`) de la estamina que gastó el
+  plan de la semana se descuenta una vez de la disponible la semana
+  siguiente. `stamina_used` es solo la carga planificada de la semana (sin la
+  fatiga arrastrada), así la fatiga no se acumula de semana en semana;
+- cada `deload_every` semanas hay una semana de descarga: volumen, estamina y
+  duración de las sesiones al `DELOAD_FACTOR`, sin arrastre de sets; después
+  se empieza de cero (sin fatiga ni sets pendientes).
+
+Las tablas de items del perfil se obtienen una sola vez (y están memoizadas en
+`routine_builder`), así que cada semana solo cuesta resolver sus días.
+"""
+from typing import Any, Dict, Iterator
+
+from src import routine_builder
+
+OVERLOAD_STEP = 0.1
+DELOAD_EVERY = 4
+DELOAD_FACTOR = 0.6
+FATIGUE_CARRYOVER = 0.25
+MAX_CARRIED_SETS = 4
+
+
+def week_volume_factor(week: int, deload_every: int = DELOAD_EVERY) -> float:
+    """Factor de volumen de la semana `week` (1-based)."""
+    if deload_every and week % deload_every == 0:
+        return DELOAD_FACTOR
+    block_week = (week - 1) % deload_every if deload_every else week - 1
+    return 1.0 + OVERLOAD_STEP * block_week
+
+
+def plan_mesocycle(num_weeks: int, num_days: int, time_per_session: int = 120, exercises_path: str = None,
+                   user_level: int = 2, solver: str = "python",
+                   deload_every: int = DELOAD_EVERY) -> Iterator[Dict[str, Any]]:
+    """Genera `num_weeks` semanas de `num_days` días, una por iteración.
+
+    Cada semana es un dict de rutina con además `week`, `deload`,
+    `volume_factor`, `carried_sets` (sets pendientes sumados de la semana
+    anterior) y `carried_fatigue` (estamina descontada por la semana anterior).
+    La primera semana coincide con `generate_routine`.
+    """
+    knapsack = routine_builder.get_knapsack_solver(solver)
+    tables = routine_builder.get_item_tables(user_level, exercises_path)
+    muscles = set()
+    for it in tables.items:
+        muscles.update(it["muscles"])
+    base_stamina = routine_builder.default_level_stamina_limit(tables.level)
+
+    fatigue = {m: 0 for m in muscles}
+    carried = {m: 0 for m in muscles}
+    for week in range(1, num_weeks + 1):
+        deload = bool(deload_every) and week % deload_every == 0
+        factor = week_volume_factor(week, deload_every)
+        target = int(round(routine_builder.WEEKLY_TARGET_SETS * factor))
+        if deload:
+            carried = {m: 0 for m in muscles}
+        stamina_limit = {m: int(round(base_stamina * factor)) for m in muscles}
+        remaining = {m: target + carried[m] for m in muscles}
+        start_remaining = dict(remaining)
+        stamina_available = {m: max(0, stamina_limit[m] - fatigue[m]) for m in muscles}
+        stamina_remaining = dict(stamina_available)
+        session_time = int(time_per_session * DELOAD_FACTOR) if deload else time_per_session
+
+        schedule: Dict[str, Any] = {f"day_{i+1}": [] for i in range(num_days)}
+        routine_builder._plan_days(schedule, range(1, num_days + 1), tables.items, tables.stamina_costs,
+                                   remaining, stamina_remaining, session_time, knapsack, tables.incidence)
+
+        # carga propia de la semana: la fatiga arrastrada ya se descontó de la disponible
+        stamina_used = {m: stamina_available[m] - stamina_remaining.get(m, 0) for m in muscles}
+        yield {
+            "schedule": schedule,
+            "weekly_sets_done": {m: start_remaining[m] - remaining[m] for m in muscles},
+            "weekly_target_per_muscle": target,
+            "stamina_limit_per_muscle": stamina_limit,
+            "stamina_used": stamina_used,
+            "stamina_remaining": stamina_remaining,
+            "plan_params": {"num_days": num_days, "time_per_session": session_time,
+                            "user_level": user_level, "solver": solver},
+            "week": week,
+            "deload": deload,
+            "volume_factor": factor,
+            "carried_sets": {m: c for m, c in carried.items() if c},
+            "carried_fatigue": {m: f for m, f in fatigue.items() if f},
+        }
+
+        # estado para la semana siguiente (tras una descarga se empieza de cero)
+        if deload:
+            carried = {m: 0 for m in muscles}
+            fatigue = {m: 0 for m in muscles}
+        else:
+            carried = {m: min(remaining[m], MAX_CARRIED_SETS) for m in muscles}
+            fatigue = {m: int(round(stamina_used[m] * FATIGUE_CARRYOVER)) for m in muscles}
@@ -0,0 +1,158 @@
+"""Registros compactos de items y de ejercicios programados.
+
+`build_items` y `_plan_day` devolvían un dict por ejercicio (y cada día de una
+rutina, otro dict por ejercicio con copias de la lista de músculos y de la
+tabla de estamina). Con las tablas de items cacheadas por perfil y muchas
+rutinas en memoria, ese coste se multiplica. Estas clases usan `__slots__`,
+comparten las tuplas de músculos (con cadenas internadas) entre el item y
+sus apariciones en la semana, y se comportan como el dict de antes: son
+`Mapping` de solo lectura (`it["time"]`, `it.get("reps")`, `dict(it)`) y se
+comparan iguales a él. Los atributos tampoco se pueden reasignar: los mismos
+registros los comparten el caché de tablas de items y todas sus rutinas.
+
+Solo al guardar (base de datos, caché de rutinas) se convierten a
+dicts y listas planos, con `to_plain`.
+"""
+import sys
+from typing import Any, Iterator, Mapping, Tuple
+
+
+def intern_all(values) -> Tuple[str, ...]:
+    """Tupla de cadenas internadas (la misma cadena de 'chest' para todo el catálogo)."""
+    return tuple(sys.intern(v) for v in values)
+
+
+class _Record(Mapping):
+    """Base: un `Mapping` de solo lectura sobre los atributos de `FIELDS`.
+
+    Los `__init__` asignan los slots a través de sus descriptores (ver
+    `_slot_setters`); después `it.sets = 5` (o `del it.sets`) lanza
+    AttributeError.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} es de solo lectura")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} es de solo lectura")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # atajo de Mapping.get (que pasa por __getitem__ y captura KeyError)
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, _Record):
+            other = other.as_dict()
+        elif isinstance(other, Mapping):
+            other = dict(other)
+        else:
+            return NotImplemented
+        return self.as_dict() == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # pickle / deepcopy (caché de rutinas, trabajos, procesos del lote)
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+def _slot_setters(cls) -> Tuple[Any, ...]:
+    """`__set__` de los descriptores de slot de `cls`, en el orden de `__slots__`.
+
+    Saltan el `__setattr__` de `_Record` y son bastante más rápidos que
+    `object.__setattr__` al construir miles de registros.
+    """
+    return tuple(cls.__dict__[name].__set__ for name in cls.__slots__)
+
+
+class ExerciseItem(_Record):
+    """Item de la mochila: un ejercicio del catálogo con sets/reps/tiempo del perfil.
+
+    `raw` es el ejercicio del catálogo (compartido, no se copia) y `compound`
+    el resultado de `is_compound(raw)`, calculado una vez.
+    """
+
+    __slots__ = ("id", "name", "muscles", "sets", "reps", "time", "raw", "compound")
+    FIELDS = __slots__
+
+    def __init__(self, id: str, name: str, muscles: Tuple[str, ...], sets: int, reps: int, time: int,
+                 raw: Mapping[str, Any], compound: bool):
+        set_id, set_name, set_muscles, set_sets, set_reps, set_time, set_raw, set_compound = _ITEM_SETTERS
+        set_id(self, id)
+        set_name(self, name)
+        set_muscles(self, muscles)
+        set_sets(self, sets)
+        set_reps(self, reps)
+        set_time(self, time)
+        set_raw(self, raw)
+        set_compound(self, compound)
+
+
+_ITEM_SETTERS = _slot_setters(ExerciseItem)
+
+
+class ScheduleEntry(_Record):
+    """Ejercicio de un día de la rutina.
+
+    `muscles` es la tupla del item y el consumo de estamina se guarda como
+    tupla de pares (músculo, consumo); `entry["muscles"]` devuelve la tupla y
+    `entry["stamina_costs"]` un dict nuevo. `as_dict()` da la forma guardada
+    (listas y dicts), la misma que leen el seguimiento y la re-planificación.
+    """
+
+    __slots__ = ("id", "name", "sets", "reps", "time_min", "muscles", "stamina_cost_pairs")
+    FIELDS = ("id", "name", "sets", "reps", "time_min", "muscles", "stamina_costs")
+
+    def __init__(self, id: str, name: str, sets: int, reps: int, time_min: int, muscles: Tuple[str, ...],
+                 stamina_cost_pairs: Tuple[Tuple[str, int], ...]):
+        set_id, set_name, set_sets, set_reps, set_time_min, set_muscles, set_pairs = _ENTRY_SETTERS
+        set_id(self, id)
+        set_name(self, name)
+        set_sets(self, sets)
+        set_reps(self, reps)
+        set_time_min(self, time_min)
+        set_muscles(self, muscles)
+        set_pairs(self, stamina_cost_pairs)
+
+    @property
+    def stamina_costs(self) -> dict:
+        return dict(self.stamina_cost_pairs)
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "sets": self.sets, "reps": self.reps,
+                "time_min": self.time_min, "muscles": list(self.muscles),
+                "stamina_costs": dict(self.stamina_cost_pairs)}
+
+
+_ENTRY_SETTERS = _slot_setters(ScheduleEntry)
+
+
+def to_plain(value: Any) -> Any:
+    """Copia de `value` con los registros (y tuplas) convertidos a dicts y listas, lista para JSON."""
+    if isinstance(value, _Record):
+        return to_plain(value.as_dict())
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
@@ -0,0 +1,125 @@
+"""Generación de rutinas en lote (p. ej. la re-planificación nocturna de todos los usuarios).
+
+`generate_routines_batch(profiles)`:
+
+1. carga el catálogo una sola vez;
+2. agrupa los perfiles por firma (nivel, objetivo, lesiones, equipamiento) y
+   construye las tablas de items y de consumo de estamina una vez por firma;
+3. reparte los usuarios entre un pool de procesos `forkserver` (o `spawn`
+   donde no existe). No se usa `fork`: el proceso que llama suele tener hilos
+   en marcha (Streamlit, el volcado periódico del `DocumentCache`, el pool de
+   `src.jobs`) y un hijo creado con `fork` puede quedarse bloqueado en un lock
+   que otro hilo tenía tomado. Cada worker recibe al arrancar un perfil por
+   firma y reconstruye sus tablas desde el catálogo (el snapshot se abre con
+   mmap): los items no se serializan, y `ExerciseItem.raw` respaldado por el
+   snapshot tampoco se podría serializar;
+4. devuelve las rutinas a medida que se completan, como `(usuario, rutina)`.
+
+Cada perfil es un dict con `num_days` (4 por defecto), `time_per_session` (120)
+y los campos de perfil de `routine_builder._parse_user_profile` (`level`,
+`goal`, `injuries`, `equipments`). La rutina de cada usuario es la misma que
+devolvería `generate_routine(num_days, time_per_session, user_level=perfil)`.
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from src import routine_builder
+
+DEFAULT_CHUNKSIZE = 16
+
+# firma -> (items, item_stamina_costs, incidence); en cada worker (y en el proceso
+# actual mientras dura un lote con un solo worker)
+_tables: Dict[Tuple, Tuple] = {}
+
+
+def _user_profile(profile: Mapping[str, Any]) -> Dict[str, Any]:
+    """Perfil (sin los parámetros de la semana) tal como lo recibe `generate_routine`."""
+    return {k: v for k, v in profile.items() if k not in ("num_days", "time_per_session")}
+
+
+def _signature_profiles(profiles: Mapping[str, Mapping[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+    """Un perfil de usuario por firma distinta (lo único que necesita un worker para sus tablas)."""
+    by_signature = {}
+    for profile in profiles.values():
+        user_profile = _user_profile(profile)
+        by_signature.setdefault(routine_builder.profile_signature(user_profile), user_profile)
+    return by_signature
+
+
+def _init_worker(signature_profiles: Dict[Tuple, Dict[str, Any]], exercises_path: Optional[str]) -> None:
+    _tables.clear()
+    for signature, user_profile in signature_profiles.items():
+        # memoizadas en routine_builder: un lote repetido no las reconstruye
+        item_tables = routine_builder.get_item_tables(user_profile, exercises_path)
+        _tables[signature] = (item_tables.items, item_tables.stamina_costs, item_tables.incidence)
+
+
+def _generate_chunk(chunk: List[Tuple[str, Dict[str, Any]]], solver: str) -> List[Tuple[str, Dict[str, Any]]]:
+    results = []
+    for username, profile in chunk:
+        user_profile = _user_profile(profile)
+        items, item_stamina_costs, incidence = _tables[routine_builder.profile_signature(user_profile)]
+        routine = routine_builder._generate_from_items(
+            profile.get("num_days", 4), profile.get("time_per_session", 120),
+            items, item_stamina_costs, user_profile, solver, incidence,
+        )
+        results.append((username, routine))
+    return results
+
+
+def _chunks(profiles: Mapping[str, Dict[str, Any]], size: int) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    chunk = []
+    for username, profile in profiles.items():
+        chunk.append((username, profile))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_routines_batch(profiles: Union[Mapping[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]],
+                            workers: Optional[int] = None, exercises_path: str = None, solver: str = "python",
+                            chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Genera la rutina de cada usuario de `profiles` (usuario -> perfil).
+
+    `workers` es el número de procesos (por defecto `os.cpu_count()`); con 1 se
+    genera en el proceso actual. Los resultados se van devolviendo como
+    `(usuario, rutina)` en orden de finalización, de a `chunksize` usuarios por
+    tarea enviada al pool.
+    """
+    profiles = dict(profiles)
+    routine_builder.get_knapsack_solver(solver)  # validar antes de arrancar el pool
+    workers = workers or os.cpu_count() or 1
+    signature_profiles = _signature_profiles(profiles)
+
+    if workers == 1:
+        try:
+            _init_worker(signature_profiles, exercises_path)
+            for chunk in _chunks(profiles, chunksize):
+                yield from _generate_chunk(chunk, solver)
+        finally:
+            # las tablas siguen en el caché de routine_builder; aquí no se retienen
+            _tables.clear()
+        return
+
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(signature_profiles, exercises_path)) as pool:
+        chunks = _chunks(profiles, chunksize)
+        pending = set()
+        # mantener acotadas las tareas en vuelo: no se encolan todos los usuarios de golpe
+        for chunk in chunks:
+            pending.add(pool.submit(_generate_chunk, chunk, solver))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(pool.submit(_generate_chunk, chunk, solver))
@@ -1,13 +1,23 @@
-import json
-import os
-from typing import List, Dict, Any, Tuple, Union
+import sys
+from array import array
+from datetime import datetime
+from types import MappingProxyType
+from typing import List, Dict, Any, Callable, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data-exercises")
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él usamos el solver en Python puro
+    np = None
+
+from src import catalog, instrumentation
+from src.lru import LRUCache
+from src.records import ExerciseItem, ScheduleEntry, intern_all
+
+DATA_DIR = catalog.DATA_DIR
 
 def load_exercises(path: str = None) -> List[Dict[str, Any]]:
-    p = path or os.path.join(DATA_DIR, "exercises.json")
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Ejercicios del catálogo; se parsean una vez por proceso (ver `src.catalog`)."""
+    return catalog.load_exercises(path)
 
 def is_compound(ex: Dict[str, Any]) -> bool:
     # Heurística: movimientos que trabajan grandes grupos musculares y usan barras/mancuernas/kettlebell/olympic
@@ -77,48 +87,228 @@ def _choose_reps_sets_for_exercise(is_cmp: bool, level: int, goal: str) -> Tuple
     sets = max(2, min(6, sets))
     return sets, reps
 
-def build_items(exercises: List[Dict[str, Any]], user_profile_or_level: Union[int, Dict[str, Any], None] = None) -> List[Dict[str, Any]]:
+def build_items(exercises: List[Dict[str, Any]], user_profile_or_level: Union[int, Dict[str, Any], None] = None) -> List[ExerciseItem]:
     """Construye la lista de items con sets/reps/time ajustados al perfil del usuario.
 
-    Filtra ejercicios por lesiones y por equipamiento disponible.
+    Filtra ejercicios por lesiones y por equipamiento disponible. Cada item es
+    un `ExerciseItem` (ver `src.records`), de solo lectura.
+    """
+    with instrumentation.span("items.build", exercises=len(exercises)) as span:
+        items = _build_items(exercises, user_profile_or_level)
+        span["items"] = len(items)
+    return items
+
+
+class CatalogTable(NamedTuple):
+    """El catálogo en columnas (struct-of-arrays), con las cadenas internadas.
+
+    La posición `i` de cada columna corresponde a `exercises[i]`. Se calcula una
+    vez por lista de ejercicios (`catalog_table`) y `build_items` la recorre en
+    lugar de volver a normalizar cada ejercicio del JSON en cada llamada.
+
+    Los músculos objetivo y el equipamiento, en minúsculas, se codifican como
+    enteros (`muscle_codes` / `equipment_codes`: valor -> código) y cada
+    ejercicio guarda la máscara de bits de sus códigos (bit `k` = código `k`).
+    Con numpy las máscaras son un array (uint64, u object si el vocabulario
+    pasa de 64 valores) y los filtros de `filter_indices` se evalúan sobre todo
+    el catálogo a la vez.
+    """
+    exercises: Sequence[Mapping[str, Any]]
+    ids: Tuple[Optional[str], ...]
+    names: Tuple[Optional[str], ...]
+    # músculos objetivo tal cual (los que ve el item)
+    muscles: Tuple[Tuple[str, ...], ...]
+    muscle_codes: Dict[str, int]
+    muscle_masks: Any
+    equipment_codes: Dict[str, int]
+    equipment_masks: Any
+    compound: array
+    time: array
+
+
+def _bitmasks(values_per_exercise: Iterable[Iterable[str]]) -> Tuple[Dict[str, int], Any]:
+    """Códigos de los valores (en orden de aparición) y la máscara de bits de cada ejercicio."""
+    codes: Dict[str, int] = {}
+    masks = []
+    for values in values_per_exercise:
+        mask = 0
+        for v in values:
+            mask |= 1 << codes.setdefault(sys.intern(v.lower()), len(codes))
+        masks.append(mask)
+    if np is None:
+        return codes, tuple(masks)
+    return codes, np.array(masks, dtype=np.uint64 if len(codes) <= 64 else object)
+
+
+def _make_catalog_table(exercises: Sequence[Mapping[str, Any]]) -> CatalogTable:
+    muscles = [intern_all(ex.get("targetMuscles", [])) for ex in exercises]
+    muscle_codes, muscle_masks = _bitmasks(muscles)
+    equipment_codes, equipment_masks = _bitmasks(ex.get("equipments", []) for ex in exercises)
+    return CatalogTable(
+        exercises=exercises,
+        ids=tuple(ex.get("exerciseId") for ex in exercises),
+        names=tuple(ex.get("name") for ex in exercises),
+        muscles=tuple(muscles),
+        muscle_codes=muscle_codes,
+        muscle_masks=muscle_masks,
+        equipment_codes=equipment_codes,
+        equipment_masks=equipment_masks,
+        compound=array("b", (is_compound(ex) for ex in exercises)),
+        time=array("H", (estimate_sets_and_time(ex)[1] for ex in exercises)),
+    )
+
+
+# lista de ejercicios -> tabla; la entrada guarda la lista, así su id no se reutiliza mientras esté en caché
+_catalog_tables = LRUCache(4)
+
+
+def catalog_table(exercises: Sequence[Mapping[str, Any]]) -> CatalogTable:
+    """Tabla en columnas de `exercises`, memoizada por identidad de la lista (que es de solo lectura)."""
+    table = _catalog_tables.get(id(exercises))
+    if table is None or table.exercises is not exercises:
+        table = _make_catalog_table(exercises)
+        _catalog_tables.put(id(exercises), table)
+    return table
+
+
+def _mask(codes: Mapping[str, int], values: Iterable[str]) -> int:
+    mask = 0
+    for v in values:
+        if v in codes:
+            mask |= 1 << codes[v]
+    return mask
+
+
+def filter_indices(table: CatalogTable, injuries: Iterable[str], equipments_avail: Optional[Iterable[str]]):
+    """Índices (crecientes) de los ejercicios de `table` que pasan los filtros de `build_items`.
+
+    Se descarta un ejercicio si alguno de sus músculos objetivo (en minúsculas)
+    está en `injuries` (ya en minúsculas) o si, con `equipments_avail` indicado,
+    requiere equipamiento y ninguno de sus equipamientos (en minúsculas) está
+    en la lista (que se compara tal cual). Devuelve un array de numpy, o un
+    `array('l')` sin numpy.
     """
+    injured = _mask(table.muscle_codes, injuries)
+    avail = None if equipments_avail is None else _mask(table.equipment_codes, equipments_avail)
+    if np is None:
+        return array("l", (i for i, (m, e) in enumerate(zip(table.muscle_masks, table.equipment_masks))
+                           if not m & injured and (avail is None or not e or e & avail)))
+    muscle_masks, equipment_masks = table.muscle_masks, table.equipment_masks
+    keep = (muscle_masks & muscle_masks.dtype.type(injured)) == 0
+    if avail is not None:
+        keep &= (equipment_masks == 0) | ((equipment_masks & equipment_masks.dtype.type(avail)) != 0)
+    return np.flatnonzero(keep)
+
+
+def _build_items(exercises: List[Dict[str, Any]], user_profile_or_level) -> List[ExerciseItem]:
     profile = _parse_user_profile(user_profile_or_level)
     level = profile["level"]
     goal = profile["goal"]
     injuries = set([m.lower() for m in profile.get("injuries", [])])
     equipments_avail = profile.get("equipments")
+    table = catalog_table(exercises)
+    # sets/reps solo dependen de si el ejercicio es compuesto
+    sets_reps = {is_cmp: _choose_reps_sets_for_exercise(is_cmp, level, goal) for is_cmp in (False, True)}
 
     items = []
-    for ex in exercises:
-        muscles = [m.lower() for m in ex.get("targetMuscles", [])]
-        # Si alguna muscle objetivo está en lesiones, saltar ejercicio
-        if any(m in injuries for m in muscles):
-            continue
-
-        # Filtrar por equipamiento si se indicó disponibilidad
-        if equipments_avail is not None:
-            # si el ejercicio requiere un equipamiento que no está en la lista, saltarlo
-            eqs = [e.lower() for e in ex.get("equipments", [])]
-            if eqs and not any(e in equipments_avail for e in eqs):
-                # si todos los equipamientos necesarios no están disponibles, saltar
-                continue
-
-        is_cmp = is_compound(ex)
-        _, time = estimate_sets_and_time(ex)
+    # lesiones y equipamiento se filtran con máscaras de bits sobre todo el catálogo
+    for i in filter_indices(table, injuries, equipments_avail).tolist():
+        is_cmp = bool(table.compound[i])
         # override sets/reps basados en perfil
-        computed_sets, computed_reps = _choose_reps_sets_for_exercise(is_cmp, level, goal)
-
-        items.append({
-            "id": ex.get("exerciseId"),
-            "name": ex.get("name"),
-            "muscles": ex.get("targetMuscles", []),
-            "sets": computed_sets,
-            "reps": computed_reps,
-            "time": time,
-            "raw": ex,
-        })
+        computed_sets, computed_reps = sets_reps[is_cmp]
+        items.append(ExerciseItem(table.ids[i], table.names[i], table.muscles[i], computed_sets, computed_reps,
+                                  table.time[i], exercises[i], is_cmp))
     return items
 
+def profile_signature(user_profile_or_level: Union[int, Dict[str, Any], None]) -> Tuple:
+    """Parámetros normalizados del perfil de los que dependen los items y su estamina.
+
+    (nivel, objetivo, lesiones, equipamiento): la edad u otros campos no cambian
+    los items, así que perfiles que solo difieren en ellos comparten tablas.
+    """
+    profile = _parse_user_profile(user_profile_or_level)
+    equipments = profile["equipments"]
+    return (
+        profile["level"],
+        profile["goal"],
+        tuple(sorted({m.lower() for m in profile["injuries"]})),
+        # build_items compara el equipamiento tal cual, sin normalizar mayúsculas
+        None if equipments is None else tuple(sorted(set(equipments))),
+    )
+
+
+class MuscleIncidence(NamedTuple):
+    """Relación items x músculos en formato coordenado, con los músculos internados a enteros.
+
+    Cada entrada `k` de `set_*` es un (item, músculo) de `item["muscles"]` con
+    los sets del item; cada entrada de `cost_*` es un (item, músculo, consumo)
+    de su tabla de estamina.
+    """
+    muscles: Tuple[str, ...]
+    set_rows: Any
+    set_cols: Any
+    set_sets: Any
+    cost_rows: Any
+    cost_cols: Any
+    cost_values: Any
+    compound: Any
+    n_items: int
+
+
+class ItemTables(NamedTuple):
+    """Items y consumo de estamina de un perfil, de solo lectura (compartidos por el caché).
+
+    Los items son registros inmutables, el consumo va en `MappingProxyType` y
+    los arrays de `incidence` no admiten escritura.
+    """
+    items: Tuple[ExerciseItem, ...]
+    stamina_costs: Tuple[Mapping[str, int], ...]
+    level: int
+    # None sin numpy: se usa la contabilidad por diccionarios
+    incidence: Optional[MuscleIncidence] = None
+
+
+# Tablas de items por (catálogo, firma de perfil); la mayoría de usuarios cae en
+# unas pocas decenas de firmas
+ITEM_CACHE_SIZE = 64
+_item_tables_cache = LRUCache(ITEM_CACHE_SIZE)
+
+
+def _build_item_tables(exercises: List[Dict[str, Any]], user_profile_or_level) -> ItemTables:
+    items = build_items(exercises, user_profile_or_level)
+    level = _parse_user_profile(user_profile_or_level)["level"]
+    costs = _item_stamina_costs(items, level)
+    return ItemTables(
+        items=tuple(items),
+        stamina_costs=tuple(MappingProxyType(c) for c in costs),
+        level=level,
+        incidence=build_muscle_incidence(items, costs) if np is not None else None,
+    )
+
+
+def get_item_tables(user_profile_or_level: Union[int, Dict[str, Any], None] = None,
+                    exercises_path: str = None) -> ItemTables:
+    """Tablas de items del perfil, memoizadas por firma de perfil y versión del catálogo."""
+    exercises = catalog.get_catalog(exercises_path)
+    key = (exercises.path, exercises.stamp, profile_signature(user_profile_or_level))
+    return _item_tables_cache.get_or_compute(
+        key, lambda: _build_item_tables(exercises.exercises, user_profile_or_level))
+
+
+def item_cache_stats() -> Dict[str, int]:
+    """hits / misses / evictions / size / maxsize del caché de tablas de items."""
+    return _item_tables_cache.stats()
+
+
+def configure_item_cache(maxsize: int) -> None:
+    """Cambia el tamaño del caché de tablas de items (0 lo desactiva)."""
+    _item_tables_cache.resize(maxsize)
+
+
+def clear_item_cache() -> None:
+    _item_tables_cache.clear()
+
+
 # Reps por nivel (heurística). Se usan para calcular consumo de estamina.
 REPS_BY_LEVEL = {
     0: 8,   # principiante
@@ -138,45 +328,395 @@ def knapsack_max_value(items: List[Dict[str, Any]], capacity: int, values: List[
     """
     Solve 0/1 knapsack returning selected indices. capacity in minutes.
     values aligned with items.
+
+    Solo guardamos una tabla de decisiones compacta (un byte por item y minuto)
+    y reconstruimos la selección al final recorriendo los items hacia atrás.
+    Suma al contador `knapsack_cells` las celdas que relaja el bucle interno.
     """
     n = len(items)
+    width = capacity + 1
     # DP table: dp[t] = max value achievable with capacity t
-    dp = [0] * (capacity + 1)
-    # keep choice by remembering last taken index for each t (store -1 or index)
-    pick = [[False] * n for _ in range(capacity + 1)]
+    dp = [0] * width
+    # take[i * width + t] = 1 si el item i mejoró dp[t] al procesarlo
+    take = bytearray(n * width)
+    cells = 0
 
     for i in range(n):
         w = items[i]["time"]
         v = values[i]
+        base = i * width
+        if w <= capacity:
+            cells += width - w
         # iterate backwards for 0/1 knapsack
         for t in range(capacity, w - 1, -1):
             if dp[t - w] + v > dp[t]:
                 dp[t] = dp[t - w] + v
-                # copy previous picks
-                pick[t] = pick[t - w].copy()
-                pick[t][i] = True
+                take[base + t] = 1
+    instrumentation.add("knapsack_cells", cells)
 
     # find best t
-    best_t = max(range(capacity + 1), key=lambda x: dp[x])
-    selected = [i for i, chosen in enumerate(pick[best_t]) if chosen]
+    best_t = max(range(width), key=lambda x: dp[x])
+    # backtracking: el último item que mejoró t es el que forma parte de la solución
+    selected = []
+    t = best_t
+    for i in range(n - 1, -1, -1):
+        if take[i * width + t]:
+            selected.append(i)
+            t -= items[i]["time"]
+    selected.reverse()
     return selected
 
-def generate_routine(num_days: int, time_per_session: int = 120, exercises_path: str = None, user_level: int = 2) -> Dict[str, Any]:
+def knapsack_numpy(items: List[Dict[str, Any]], capacity: int, values: List[int]) -> List[int]:
+    """Misma mochila 0/1 que `knapsack_max_value`, vectorizada con numpy.
+
+    Cada item relaja todas las capacidades en una sola operación de arrays
+    (`np.maximum(dp[w:], dp[:-w] + v)`) y guarda la máscara de mejoras para el
+    backtracking. Devuelve exactamente los mismos índices que la versión en Python.
+
+    Si un item de (tiempo, valor) no mejora ninguna capacidad, ningún item
+    posterior igual puede mejorarla (dp ya cumple dp[t] >= dp[t - w] + v, y
+    añadir items lo conserva), así que esos items se saltan sin tocar el array:
+    con catálogos grandes, casi todos los candidatos caen en pocas clases.
+    `knapsack_cells` cuenta solo las celdas de los items que sí se relajan.
+    """
+    n = len(items)
+    width = capacity + 1
+    dp = np.zeros(width, dtype=np.int64)
+    # (índice, tiempo, máscara de mejoras sobre dp[w:]) de los items que mejoraron algo
+    take = []
+    saturated = set()
+    cells = 0
+
+    # vistas de dp por peso: con pocos pesos distintos evitamos recrear slices
+    views = {}
+    for i in range(n):
+        w = items[i]["time"]
+        v = values[i]
+        if w > capacity or (w, v) in saturated:
+            continue
+        if w not in views:
+            views[w] = (dp[:width - w], dp[w:])
+        lo, hi = views[w]
+        cells += width - w
+        # lo todavía tiene los valores previos al item i (semántica 0/1)
+        cand = lo + v
+        improved = cand > hi
+        if not improved.any():
+            saturated.add((w, v))
+            continue
+        np.maximum(hi, cand, out=hi)
+        take.append((i, w, improved))
+    instrumentation.add("knapsack_cells", cells)
+
+    # argmax devuelve el primer máximo, igual que max(range(...)) en la versión Python
+    t = int(np.argmax(dp))
+    selected = []
+    for i, w, improved in reversed(take):
+        if t >= w and improved[t - w]:
+            selected.append(i)
+            t -= w
+    selected.reverse()
+    return selected
+
+def knapsack_grouped(items: List[Dict[str, Any]], capacity: int, values: List[int]) -> List[int]:
+    """Mochila agrupando items iguales por (tiempo, valor) y resolviendo una mochila acotada.
+
+    Como `estimate_sets_and_time` solo devuelve unos pocos tiempos distintos, la
+    mayoría de candidatos son intercambiables para el DP. Cada grupo aporta como
+    mucho `capacity // tiempo` copias, que se descomponen en potencias de 2
+    (1, 2, 4, ...) para resolver un 0/1 con `knapsack_max_value` sobre pocos
+    pseudo-items. El coste depende del número de clases (tiempo, valor), no del
+    tamaño del catálogo (las celdas de `knapsack_cells` son las de esos pseudo-items).
+
+    El valor total es óptimo, igual que en los otros solvers, pero ante empates
+    la selección puede diferir: dentro de cada grupo se toman siempre los
+    primeros items por índice, de modo que el resultado es determinista.
+    """
+    # agrupar conservando el orden de aparición (determinista)
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for i, it in enumerate(items):
+        w = it["time"]
+        v = values[i]
+        if v <= 0 or w > capacity:
+            continue
+        buckets.setdefault((w, v), []).append(i)
+
+    pseudo_keys: List[Tuple[Tuple[int, int], int]] = []
+    pseudo_items: List[Dict[str, int]] = []
+    pseudo_values: List[int] = []
+    for key, members in buckets.items():
+        w, v = key
+        # los mejores miembros de cada grupo son los primeros: no hace falta guardar más
+        count = len(members) if w == 0 else min(len(members), capacity // w)
+        k = 1
+        while count > 0:
+            copies = min(k, count)
+            pseudo_keys.append((key, copies))
+            pseudo_items.append({"time": w * copies})
+            pseudo_values.append(v * copies)
+            count -= copies
+            k *= 2
+
+    taken: Dict[Tuple[int, int], int] = {}
+    for p in knapsack_max_value(pseudo_items, capacity, pseudo_values):
+        key, copies = pseudo_keys[p]
+        taken[key] = taken.get(key, 0) + copies
+
+    selected = []
+    for key, copies in taken.items():
+        selected.extend(buckets[key][:copies])
+    selected.sort()
+    return selected
+
+KNAPSACK_SOLVERS = {
+    "python": knapsack_max_value,
+    "numpy": knapsack_numpy,
+    "grouped": knapsack_grouped,
+}
+
+def get_knapsack_solver(solver: str = "python"):
+    """Devuelve la función solver registrada con ese nombre.
+
+    Si se pide "numpy" y numpy no está instalado, se usa el solver en Python puro.
+    """
+    if solver not in KNAPSACK_SOLVERS:
+        raise ValueError(f"Solver desconocido: {solver!r} (opciones: {', '.join(KNAPSACK_SOLVERS)})")
+    if solver == "numpy" and np is None:
+        return knapsack_max_value
+    return KNAPSACK_SOLVERS[solver]
+
+# Factor sobre el consumo de estamina según la dificultad registrada en el seguimiento
+DIFFICULTY_STAMINA_FACTOR = {
+    "Muy fácil": 0.8,
+    "Fácil": 0.9,
+    "Moderado": 1.0,
+    "Difícil": 1.15,
+    "Muy difícil": 1.3,
+}
+
+# objetivo semanal de sets por músculo (hipertrofia)
+WEEKLY_TARGET_SETS = 10
+
+
+def _item_stamina_costs(items: List[Dict[str, Any]], level: int) -> List[Dict[str, int]]:
+    """Consumo de estamina por ejercicio (distribuido entre músculos objetivo).
+
+    fórmula: consumo_total = sets * reps(exercise) * intensidad
+    intensidad: 1.5 para compuestos, 1.0 para aislados
+    """
+    item_stamina_costs: List[Dict[str, int]] = []
+    for it in items:
+        intensity = 1.5 if it["compound"] else 1.0
+        reps_for_item = it.get("reps") or REPS_BY_LEVEL.get(level, 10)
+        total_cost = int(it["sets"] * reps_for_item * intensity)
+        muscles_target = it["muscles"] or []
+        costs = {}
+        if muscles_target:
+            per_m = max(1, total_cost // len(muscles_target))
+            for m in muscles_target:
+                costs[m] = per_m
+        item_stamina_costs.append(costs)
+    return item_stamina_costs
+
+
+def _fits_stamina(costs: Dict[str, int], stamina_remaining: Dict[str, int]) -> bool:
+    for m, cost in costs.items():
+        if cost > stamina_remaining.get(m, 0):
+            return False
+    return True
+
+
+def build_muscle_incidence(items: Sequence[Mapping[str, Any]],
+                           item_stamina_costs: Sequence[Mapping[str, int]]) -> MuscleIncidence:
+    """Interna los músculos y construye las matrices dispersas de sets y de consumo (requiere numpy)."""
+    ids: Dict[str, int] = {}
+    set_rows, set_cols, set_sets = [], [], []
+    cost_rows, cost_cols, cost_values = [], [], []
+    for i, it in enumerate(items):
+        for m in it["muscles"]:
+            set_rows.append(i)
+            set_cols.append(ids.setdefault(m, len(ids)))
+            set_sets.append(it["sets"])
+        for m, cost in item_stamina_costs[i].items():
+            cost_rows.append(i)
+            cost_cols.append(ids.setdefault(m, len(ids)))
+            cost_values.append(cost)
+    incidence = MuscleIncidence(
+        muscles=tuple(ids),
+        set_rows=np.array(set_rows, dtype=np.intp),
+        set_cols=np.array(set_cols, dtype=np.intp),
+        set_sets=np.array(set_sets, dtype=np.int64),
+        cost_rows=np.array(cost_rows, dtype=np.intp),
+        cost_cols=np.array(cost_cols, dtype=np.intp),
+        cost_values=np.array(cost_values, dtype=np.int64),
+        compound=np.array([it["compound"] for it in items], dtype=bool),
+        n_items=len(items),
+    )
+    # las tablas cacheadas se comparten entre rutinas: arrays de solo lectura
+    for value in incidence:
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+    return incidence
+
+
+class _MuscleArrays:
+    """`remaining` / `stamina_remaining` como arrays indexados por id de músculo.
+
+    Refleja los diccionarios de la semana: se inicializa desde ellos y se
+    actualiza con `consume` por cada item elegido, así la valoración y el
+    filtro de estamina de cada día son unas pocas operaciones vectorizadas.
+    """
+
+    def __init__(self, incidence: MuscleIncidence, remaining: Dict[str, int], stamina_remaining: Dict[str, int]):
+        self.incidence = incidence
+        self.remaining = np.array([remaining.get(m, 0) for m in incidence.muscles], dtype=np.int64)
+        self.stamina = np.array([stamina_remaining.get(m, 0) for m in incidence.muscles], dtype=np.int64)
+
+    def day_candidates(self) -> Tuple[List[int], List[int]]:
+        inc = self.incidence
+        # valor = suma sobre los músculos del item de min(sets, remaining[m]) (remaining >= 0)
+        contrib = np.minimum(inc.set_sets, self.remaining[inc.set_cols])
+        values = np.bincount(inc.set_rows, weights=contrib, minlength=inc.n_items).astype(np.int64)
+        # factible si ningún consumo supera la estamina restante de su músculo
+        over = inc.cost_values > self.stamina[inc.cost_cols]
+        feasible = np.bincount(inc.cost_rows, weights=over, minlength=inc.n_items) == 0
+        candidate_indices = np.flatnonzero((values > 0) & feasible)
+        if not len(candidate_indices):
+            return np.flatnonzero(feasible & inc.compound).tolist(), None
+        return candidate_indices.tolist(), values[candidate_indices].tolist()
+
+    def consume(self, idx: int) -> None:
+        inc = self.incidence
+        for k in range(*np.searchsorted(inc.set_rows, [idx, idx + 1])):
+            m = inc.set_cols[k]
+            self.remaining[m] = max(0, self.remaining[m] - inc.set_sets[k])
+        for k in range(*np.searchsorted(inc.cost_rows, [idx, idx + 1])):
+            m = inc.cost_cols[k]
+            self.stamina[m] = max(0, self.stamina[m] - inc.cost_values[k])
+
+
+def _day_candidates(items: Sequence[Mapping[str, Any]], item_stamina_costs: Sequence[Mapping[str, int]],
+                    remaining: Dict[str, int], stamina_remaining: Dict[str, int]) -> Tuple[List[int], Optional[List[int]]]:
+    """Índices candidatos del día y sus valores (None si son los compuestos de relleno)."""
+    # calcular valor heurístico de cada item según remaining required sets
+    values = []
+    for it in items:
+        v = 0
+        for m in it["muscles"]:
+            if remaining.get(m, 0) > 0:
+                v += min(it["sets"], remaining[m])
+        values.append(v)
+    # descartar items sin valor (aceleran el DP) y los que exceden la estamina restante
+    candidate_indices = [i for i, val in enumerate(values)
+                         if val > 0 and _fits_stamina(item_stamina_costs[i], stamina_remaining)]
+    if candidate_indices:
+        return candidate_indices, [values[i] for i in candidate_indices]
+    # si no quedan candidatos que aporten o que cumplan estamina, intentamos buscar ejercicios compuestos
+    return [i for i in range(len(items))
+            if _fits_stamina(item_stamina_costs[i], stamina_remaining) and items[i]["compound"]], None
+
+
+def _plan_day(items: Sequence[Mapping[str, Any]], item_stamina_costs: Sequence[Mapping[str, int]],
+              remaining: Dict[str, int], stamina_remaining: Dict[str, int], time_per_session: int, knapsack,
+              arrays: Optional[_MuscleArrays] = None) -> Optional[List[Dict[str, Any]]]:
+    """Resuelve la mochila de un día y descuenta `remaining` / `stamina_remaining` (in place).
+
+    Con `arrays`, la valoración y el filtro de estamina se hacen sobre arrays
+    (mismo resultado). Devuelve los ejercicios del día, o None si no queda
+    ningún candidato (estamina o sets semanales agotados).
+    """
+    if arrays is not None:
+        candidate_indices, cand_values = arrays.day_candidates()
+    else:
+        candidate_indices, cand_values = _day_candidates(items, item_stamina_costs, remaining, stamina_remaining)
+    # si aun así está vacío, no podemos llenar más este día (estamina/semanal cumplida)
+    if not candidate_indices:
+        return None
+    if cand_values is None:
+        # compuestos de relleno: ninguno aporta a los sets pendientes
+        cand_values = [0] * len(candidate_indices)
+
+    candidates = [items[i] for i in candidate_indices]
+    # el solver suma al span las celdas que relaja de verdad (`knapsack_cells`)
+    with instrumentation.span("knapsack.solve", items=len(candidates), capacity=time_per_session) as span:
+        selected_local = knapsack(candidates, time_per_session, cand_values)
+        span["selected"] = len(selected_local)
+    selected = [candidate_indices[i] for i in selected_local]
+
+    day = []
+    for idx in selected:
+        it = items[idx]
+        # registro inmutable: comparte la tupla de músculos del item (ver src.records)
+        day.append(ScheduleEntry(it["id"], it["name"], it["sets"], it.get("reps"), it["time"],
+                                 tuple(it["muscles"]), tuple(item_stamina_costs[idx].items())))
+        # reducir remaining
+        for m in it["muscles"]:
+            if remaining.get(m, 0) > 0:
+                remaining[m] = max(0, remaining[m] - it["sets"])
+        # reducir estamina restante
+        for m, cost in item_stamina_costs[idx].items():
+            stamina_remaining[m] = max(0, stamina_remaining.get(m, 0) - cost)
+        if arrays is not None:
+            arrays.consume(idx)
+    return day
+
+
+# progress(número de día, ejercicios del día): se llama al terminar de resolver cada día
+ProgressCallback = Optional[Callable[[int, List[Dict[str, Any]]], None]]
+
+
+def _plan_days(schedule: Dict[str, Any], day_numbers: Iterable[int], items: Sequence[Mapping[str, Any]],
+               item_stamina_costs: Sequence[Mapping[str, int]], remaining: Dict[str, int],
+               stamina_remaining: Dict[str, int], time_per_session: int, knapsack,
+               incidence: Optional[MuscleIncidence] = None, progress: ProgressCallback = None) -> None:
+    arrays = None
+    if np is not None:
+        if incidence is None:
+            incidence = build_muscle_incidence(items, item_stamina_costs)
+        arrays = _MuscleArrays(incidence, remaining, stamina_remaining)
+    for d in day_numbers:
+        day = _plan_day(items, item_stamina_costs, remaining, stamina_remaining, time_per_session, knapsack, arrays)
+        schedule[f"day_{d}"] = day or []
+        schedule[f"day_{d}_meta"] = {"total_time_min": sum(ex["time_min"] for ex in day or [])}
+        if progress is not None:
+            progress(d, schedule[f"day_{d}"])
+
+
+def _weekly_summary(schedule: Dict[str, Any], target_per_muscle: int, stamina_limit_per_muscle: Dict[str, int],
+                    remaining: Dict[str, int], stamina_remaining: Dict[str, int]) -> Dict[str, Any]:
+    done = {m: (target_per_muscle - remaining[m]) for m in remaining}
+    # incluir resumen de estamina usada y restante
+    stamina_used = {m: stamina_limit_per_muscle[m] - stamina_remaining.get(m, 0) for m in stamina_limit_per_muscle}
+    return {"schedule": schedule, "weekly_sets_done": done, "weekly_target_per_muscle": target_per_muscle,
+        "stamina_limit_per_muscle": stamina_limit_per_muscle, "stamina_used": stamina_used,
+        "stamina_remaining": stamina_remaining}
+
+
+def generate_routine(num_days: int, time_per_session: int = 120, exercises_path: str = None, user_level: int = 2,
+                     solver: str = "python", progress: ProgressCallback = None) -> Dict[str, Any]:
     """
     Genera una rutina semanal distribuida en `num_days` días.
     Estrategia:
       - Objetivo semanal por músculo: 10 sets (heurística para hipertrofia)
       - Para cada día, resolvemos una mochila (knapsack) que maximiza la contribución a los sets faltantes
         por minuto de entrenamiento.
+    `solver` elige el motor de la mochila ("python", "numpy" o "grouped", ver KNAPSACK_SOLVERS).
+    `progress(día, ejercicios)`, si se indica, se llama al terminar cada día (ver src.jobs).
     Devuelve un diccionario con la lista de ejercicios por día y métricas.
     """
     # soportar pasar tanto un entero user_level (compat) como un dict de perfil
-    user_profile_or_level = user_level
-    exercises = load_exercises(exercises_path)
-    items = build_items(exercises, user_profile_or_level)
-
-    # weekly target sets por músculo (hipertrofia)
-    target_per_muscle = 10
+    tables = get_item_tables(user_level, exercises_path)
+    return _generate_from_items(num_days, time_per_session, tables.items, tables.stamina_costs, user_level, solver,
+                                tables.incidence, progress)
+
+
+def _generate_from_items(num_days: int, time_per_session: int, items: Sequence[Mapping[str, Any]],
+                         item_stamina_costs: Sequence[Mapping[str, int]], user_level, solver: str,
+                         incidence: Optional[MuscleIncidence] = None,
+                         progress: ProgressCallback = None) -> Dict[str, Any]:
+    """Planifica la semana a partir de las tablas de items ya construidas (no las modifica)."""
+    knapsack = get_knapsack_solver(solver)
+    target_per_muscle = WEEKLY_TARGET_SETS
     # construir lista de músculos presentes
     muscles = set()
     for it in items:
@@ -184,112 +724,113 @@ def generate_routine(num_days: int, time_per_session: int = 120, exercises_path:
     remaining = {m: target_per_muscle for m in muscles}
 
     # Estamina semanal por músculo según nivel (extraída del perfil)
-    level = _parse_user_profile(user_profile_or_level).get("level", 2)
+    level = _parse_user_profile(user_level).get("level", 2)
     stamina_limit_per_muscle = {m: default_level_stamina_limit(level) for m in muscles}
     stamina_remaining = stamina_limit_per_muscle.copy()
 
-    # calcular consumo de estamina por ejercicio (distribuido entre músculos objetivo)
-    # fórmula: consumo_total = sets * reps(exercise) * intensidad
-    # intensidad: 1.5 para compuestos, 1.0 para aislados
-    item_stamina_costs: List[Dict[str, int]] = []
-    for it in items:
-        intensity = 1.5 if is_compound(it["raw"]) else 1.0
-        reps_for_item = it.get("reps") or REPS_BY_LEVEL.get(level, 10)
-        total_cost = int(it["sets"] * reps_for_item * intensity)
-        muscles_target = it["muscles"] or []
-        costs = {}
-        if muscles_target:
-            per_m = max(1, total_cost // len(muscles_target))
-            for m in muscles_target:
-                costs[m] = per_m
-        item_stamina_costs.append(costs)
+    schedule: Dict[str, Any] = {f"day_{i+1}": [] for i in range(num_days)}
+    _plan_days(schedule, range(1, num_days + 1), items, item_stamina_costs, remaining, stamina_remaining,
+               time_per_session, knapsack, incidence, progress)
+    routine = _weekly_summary(schedule, target_per_muscle, stamina_limit_per_muscle, remaining, stamina_remaining)
+    # parámetros de generación, para poder re-planificar la semana (ver replan_routine)
+    routine["plan_params"] = {"num_days": num_days, "time_per_session": time_per_session,
+                              "user_level": user_level, "solver": solver}
+    return routine
 
-    schedule = {f"day_{i+1}": [] for i in range(num_days)}
 
-    for d in range(num_days):
-        # calcular valor heurístico de cada item según remaining required sets
-        values = []
-        for it in items:
-            v = 0
-            for m in it["muscles"]:
-                if remaining.get(m, 0) > 0:
-                    v += min(it["sets"], remaining[m])
-            # si no contribuye a remaining, dar un pequeño valor para variedad
-            if v == 0:
-                v = 0  # preferimos no seleccionar inútiles; permitirá llenar tiempo con primeros compuestos
-            values.append(v)
-        # filter out zero-value items to speed DP; but keep some if nothing remains
-        candidate_indices = [i for i, val in enumerate(values) if val > 0]
-        # además filtrar por estamina restante: eliminar items que excedan stamina_remaining en cualquier músculo
-        filtered = []
-        for i in candidate_indices:
-            costs = item_stamina_costs[i]
-            ok = True
-            for m, cost in costs.items():
-                if cost > stamina_remaining.get(m, 0):
-                    ok = False
-                    break
-            if ok:
-                filtered.append(i)
-        candidate_indices = filtered
-        if not candidate_indices:
-            # si no quedan candidatos que aporten o que cumplan estamina, intentamos buscar ejercicios compuestos
-            candidate_indices = []
-            for i in range(len(items)):
-                costs = item_stamina_costs[i]
-                # incluir solo si no excede estamina
-                ok = True
-                for m, cost in costs.items():
-                    if cost > stamina_remaining.get(m, 0):
-                        ok = False
-                        break
-                if ok and is_compound(items[i]["raw"]):
-                    candidate_indices.append(i)
-            # si aun así está vacío, no podemos llenar más este día (estamina/semanal cumplida)
-            if not candidate_indices:
-                # marcar día vacío y continuar
-                schedule[f"day_{d+1}" + "_meta"] = {"total_time_min": 0}
+def _apply_tracked_day(day_items: List[Dict[str, Any]], record: Optional[Dict[str, Any]],
+                       remaining: Dict[str, int], stamina_remaining: Dict[str, int]) -> None:
+    """Descuenta del estado semanal lo realmente hecho en un día ya transcurrido.
+
+    Sin registro, el día se considera no entrenado. Un ejercicio que no aparece
+    en el registro se considera hecho según lo planificado.
+    """
+    if record is None:
+        return
+    logged = record.get("exercises") or {}
+    for ex in day_items:
+        sets = ex.get("sets") or 0
+        log = logged.get(ex.get("name"))
+        if log is None:
+            done, factor = sets, 1.0
+        else:
+            done = min(int(log.get("sets_completed", sets) or 0), sets)
+            factor = DIFFICULTY_STAMINA_FACTOR.get(log.get("difficulty"), 1.0)
+        for m in ex.get("muscles", []):
+            if remaining.get(m, 0) > 0:
+                remaining[m] = max(0, remaining[m] - done)
+        for m, cost in (ex.get("stamina_costs") or {}).items():
+            actual = int(round(cost * (done / sets if sets else 0) * factor))
+            stamina_remaining[m] = max(0, stamina_remaining.get(m, 0) - actual)
+
+
+def _records_since(tracking: Dict[str, Dict[str, Any]], since: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Registros de `tracking` con fecha igual o posterior a `since` (ISO); los que no tienen fecha se conservan."""
+    if not since:
+        return tracking or {}
+    start = datetime.fromisoformat(since)
+    kept = {}
+    for day, record in (tracking or {}).items():
+        try:
+            if datetime.fromisoformat(record["date"]) < start:
                 continue
+        except (KeyError, TypeError, ValueError):
+            pass
+        kept[day] = record
+    return kept
+
+
+def replan_routine(routine: Dict[str, Any], tracking: Dict[str, Dict[str, Any]], time_per_session: int = None,
+                   exercises_path: str = None, user_level: int = None, solver: str = None,
+                   since: Optional[str] = None) -> Dict[str, Any]:
+    """Re-planifica solo los días pendientes de `routine` según el seguimiento registrado.
+
+    `tracking` es lo que devuelve `DatabaseManager.get_tracking(username)`: el
+    registro con clave `i` corresponde a `day_{i+1}` (misma convención que
+    `get_current_day_exercises`). Los días hasta el último con registro se
+    conservan tal cual y el estado semanal (`remaining` / `stamina_remaining`) se
+    reconstruye a partir de los ejercicios ya guardados en ellos y de lo hecho
+    (sets completados, dificultad), sin volver a resolverlos; después se
+    resuelven los días siguientes. Los parámetros no indicados se toman de
+    `routine['plan_params']`.
+
+    `since` (ISO, normalmente `DatabaseManager.get_routine_updated_at`) descarta
+    los registros fechados antes: son de semanas anteriores a esta rutina y sus
+    claves de día no corresponden a sus días.
+    """
+    params = routine.get("plan_params", {})
+    time_per_session = time_per_session if time_per_session is not None else params.get("time_per_session", 120)
+    user_level = user_level if user_level is not None else params.get("user_level", 2)
+    solver = solver if solver is not None else params.get("solver", "python")
+
+    schedule = {k: v for k, v in routine.get("schedule", {}).items()}
+    num_days = params.get("num_days") or sum(1 for k in schedule if not k.endswith("_meta"))
+    tracked = {int(k) + 1: record for k, record in _records_since(tracking, since).items() if str(k).isdigit()}
+    last_tracked = max((d for d in tracked if d <= num_days), default=0)
+
+    target_per_muscle = routine.get("weekly_target_per_muscle", WEEKLY_TARGET_SETS)
+    stamina_limit_per_muscle = dict(routine.get("stamina_limit_per_muscle", {}))
+    remaining = {m: target_per_muscle for m in stamina_limit_per_muscle}
+    stamina_remaining = stamina_limit_per_muscle.copy()
+    for d in range(1, last_tracked + 1):
+        _apply_tracked_day(schedule.get(f"day_{d}", []), tracked.get(d), remaining, stamina_remaining)
 
-        # Build candidate list
-        candidates = [items[i] for i in candidate_indices]
-        # valores para los candidatos (siempre tomamos desde la lista `values` original)
-        cand_values = [values[i] for i in candidate_indices]
-
-        selected_local = knapsack_max_value(candidates, time_per_session, cand_values)
-        # map back indices
-        selected = [candidate_indices[i] for i in selected_local]
-
-        total_time = 0
-        for idx in selected:
-            it = items[idx]
-            schedule[f"day_{d+1}"].append({
-                "id": it["id"],
-                "name": it["name"],
-                "sets": it["sets"],
-                "reps": it.get("reps"),
-                "time_min": it["time"],
-                "muscles": it["muscles"],
-                "stamina_costs": item_stamina_costs[idx],
-            })
-            total_time += it["time"]
-            # reducir remaining
+    if last_tracked < num_days:
+        tables = get_item_tables(user_level, exercises_path)
+        items, level = tables.items, tables.level
+        for it in items:
             for m in it["muscles"]:
-                if remaining.get(m, 0) > 0:
-                    remaining[m] = max(0, remaining[m] - it["sets"])
-            # reducir estamina restante
-            for m, cost in item_stamina_costs[idx].items():
-                stamina_remaining[m] = max(0, stamina_remaining.get(m, 0) - cost)
-
-        schedule[f"day_{d+1}" + "_meta"] = {"total_time_min": total_time}
-
-    # resumen semanal
-    done = {m: (target_per_muscle - remaining[m]) for m in muscles}
-    # incluir resumen de estamina usada y restante
-    stamina_used = {m: stamina_limit_per_muscle[m] - stamina_remaining.get(m, 0) for m in muscles}
-    return {"schedule": schedule, "weekly_sets_done": done, "weekly_target_per_muscle": target_per_muscle,
-        "stamina_limit_per_muscle": stamina_limit_per_muscle, "stamina_used": stamina_used,
-        "stamina_remaining": stamina_remaining}
+                if m not in remaining:
+                    remaining[m] = target_per_muscle
+                    stamina_limit_per_muscle[m] = stamina_remaining[m] = default_level_stamina_limit(level)
+        _plan_days(schedule, range(last_tracked + 1, num_days + 1), items, tables.stamina_costs,
+                   remaining, stamina_remaining, time_per_session, get_knapsack_solver(solver), tables.incidence)
+
+    replanned = _weekly_summary(schedule, target_per_muscle, stamina_limit_per_muscle, remaining, stamina_remaining)
+    replanned["plan_params"] = {"num_days": num_days, "time_per_session": time_per_session,
+                                "user_level": user_level, "solver": solver}
+    replanned["replanned_from_day"] = last_tracked + 1
+    return replanned
 
 
 def pretty_print_routine(routine: Dict[str, Any]):
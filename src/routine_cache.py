@@ -0,0 +1,170 @@
+"""Caché de rutinas generadas, por parámetros de generación y contenido del catálogo.
+
+`generate_routine` es determinista: con los mismos `num_days`,
+`time_per_session`, `user_level` y `solver` sobre el mismo `exercises.json`
+devuelve la misma rutina. `generate_routine_cached` guarda el resultado:
+
+- en memoria, en un LRU acotado, serializado con pickle: cada acierto devuelve
+  una copia nueva (el llamador puede modificarla sin afectar al caché);
+- opcionalmente en disco (`disk_dir`, o la variable de entorno
+  $MUSCLERPG_ROUTINE_CACHE_DIR), como un JSON por entrada, para compartir
+  resultados entre procesos y reinicios.
+
+Ambos niveles guardan la rutina como dicts y listas planos (`records.to_plain`),
+así que el resultado tiene la misma forma venga de memoria, de disco o de
+generarla.
+  El nivel de disco también está acotado: al superar `disk_maxsize` se borran
+  las entradas más antiguas.
+
+La clave incluye el sha256 de `exercises.json`, así que un cambio del catálogo
+invalida las entradas anteriores sin intervención.
+"""
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+from src import catalog, records, routine_builder
+from src.database.atomic_io import atomic_write_json, read_json
+from src.lru import LRUCache
+
+ROUTINE_CACHE_SIZE = 32
+DISK_CACHE_SIZE = 512
+CACHE_DIR_ENV = "MUSCLERPG_ROUTINE_CACHE_DIR"
+
+
+class RoutineCache:
+    def __init__(self, maxsize: int = ROUTINE_CACHE_SIZE, disk_dir: Optional[str] = None,
+                 disk_maxsize: int = DISK_CACHE_SIZE):
+        self.memory = LRUCache(maxsize)
+        self.disk_dir = disk_dir
+        self.disk_maxsize = disk_maxsize
+        self.disk_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(num_days: int, time_per_session: int, exercises_path: Optional[str], user_level: Any,
+            solver: str) -> str:
+        exercises = catalog.get_catalog(exercises_path)
+        params = json.dumps([num_days, time_per_session, user_level, solver], sort_keys=True)
+        return hashlib.sha256(f"{exercises.content_hash}:{params}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.memory.get(key)
+        if data is not None:
+            return pickle.loads(data)
+        if not self.disk_dir:
+            return None
+        try:
+            routine = read_json(self._disk_path(key))
+        except (OSError, ValueError):
+            self.disk_stats["misses"] += 1
+            return None
+        self.disk_stats["hits"] += 1
+        self.memory.put(key, pickle.dumps(routine, pickle.HIGHEST_PROTOCOL))
+        return routine
+
+    def put(self, key: str, routine: Dict[str, Any]) -> None:
+        routine = records.to_plain(routine)
+        self.memory.put(key, pickle.dumps(routine, pickle.HIGHEST_PROTOCOL))
+        if self.disk_dir:
+            try:
+                atomic_write_json(self._disk_path(key), routine, indent=None)
+                self.disk_stats["writes"] += 1
+                self._evict_disk()
+            except OSError:
+                pass  # el nivel de disco es opcional: si falla, queda solo en memoria
+
+    def invalidate(self, key: str = None) -> None:
+        """Descarta una entrada (o todas, si `key` es None) de memoria y disco."""
+        if key is not None:
+            self.memory.pop(key)
+            paths = [self._disk_path(key)] if self.disk_dir else []
+        else:
+            self.memory.clear()
+            paths = self._disk_entries()
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def resize(self, maxsize: int = None, disk_maxsize: int = None) -> None:
+        if maxsize is not None:
+            self.memory.resize(maxsize)
+        if disk_maxsize is not None:
+            self.disk_maxsize = disk_maxsize
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"memory": self.memory.stats(),
+                "disk": dict(self.disk_stats, enabled=bool(self.disk_dir), maxsize=self.disk_maxsize)}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".json")
+
+    def _disk_entries(self):
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return []
+        return [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith(".json")]
+
+    def _evict_disk(self) -> None:
+        entries = self._disk_entries()
+        if len(entries) <= self.disk_maxsize:
+            return
+        entries.sort(key=lambda path: os.stat(path).st_mtime_ns)
+        for path in entries[:len(entries) - self.disk_maxsize]:
+            try:
+                os.remove(path)
+                self.disk_stats["evictions"] += 1
+            except FileNotFoundError:
+                pass
+
+
+_cache = RoutineCache(disk_dir=os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def generate_routine_cached(num_days: int, time_per_session: int = 120, exercises_path: str = None,
+                            user_level: int = 2, solver: str = "python",
+                            progress: routine_builder.ProgressCallback = None) -> Dict[str, Any]:
+    """Como `routine_builder.generate_routine`, pero sirve resultados repetidos desde el caché.
+
+    Siempre devuelve una copia propia de la rutina, en dicts y listas planos
+    (también los ítems que recibe `progress`). Con un acierto, `progress` se
+    llama igualmente para cada día (todos de inmediato).
+    """
+    key = RoutineCache.key(num_days, time_per_session, exercises_path, user_level, solver)
+    routine = _cache.get(key)
+    if routine is None:
+        plain_progress = None
+        if progress is not None:
+            def plain_progress(day, items):
+                progress(day, records.to_plain(items))
+        routine = records.to_plain(routine_builder.generate_routine(
+            num_days, time_per_session, exercises_path, user_level, solver, plain_progress))
+        _cache.put(key, routine)
+    elif progress is not None:
+        for d in range(1, num_days + 1):
+            progress(d, routine["schedule"].get(f"day_{d}", []))
+    return routine
+
+
+def configure(maxsize: int = None, disk_dir: Optional[str] = None, disk_maxsize: int = None) -> None:
+    """Cambia los tamaños del caché y/o activa el nivel de disco en `disk_dir`."""
+    global _cache
+    if disk_dir is not None and disk_dir != _cache.disk_dir:
+        _cache = RoutineCache(maxsize if maxsize is not None else _cache.memory.maxsize, disk_dir,
+                              disk_maxsize if disk_maxsize is not None else _cache.disk_maxsize)
+        return
+    _cache.resize(maxsize, disk_maxsize)
+
+
+def invalidate() -> None:
+    """Vacía el caché de rutinas (memoria y disco)."""
+    _cache.invalidate()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
@@ -1,8 +1,32 @@
+import os
+import time
+from contextlib import contextmanager
+
 import streamlit as st
 
+# Si está definida, las páginas muestran cuánto tardó cada bloque cronometrado
+RENDER_TIMINGS_ENV = "MUSCLERPG_RENDER_TIMINGS"
+
 def check_login_state():
     if not st.session_state.get('logged_in', False):
         st.warning("⚠️ Debes iniciar sesión primero")
         st.markdown("[Ir a inicio](/) para iniciar sesión")
         st.stop()
-    return st.session_state.get('username')
\ No newline at end of file
+    return st.session_state.get('username')
+
+@contextmanager
+def render_timer(name: str):
+    """Cronometra un bloque de renderizado.
+
+    Guarda {'ms': ..., 'items': ...} en st.session_state['render_timings'][name];
+    el bloque puede actualizar 'items' con el número de elementos dibujados.
+    """
+    stats = {'items': 0}
+    t0 = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats['ms'] = (time.perf_counter() - t0) * 1000
+        st.session_state.setdefault('render_timings', {})[name] = stats
+        if os.environ.get(RENDER_TIMINGS_ENV):
+            st.caption(f"⏱️ {name}: {stats['ms']:.1f} ms ({stats['items']} ejercicios)")
@@ -0,0 +1,172 @@
+"""Agregados incrementales del seguimiento (página 'Seguimiento').
+
+En lugar de recorrer todo el historial de un usuario en cada render, se
+mantiene un documento de agregados que se actualiza al guardar cada registro:
+
+- volumen semanal por músculo (sets completados);
+- tasa de cumplimiento (sets completados / programados), total y por semana;
+- tendencia de dificultad percibida (media por semana, escala 1-5);
+- estamina estimada consumida por músculo y semana, a partir de los
+  `stamina_costs` de la rutina (misma estimación que `replan_routine`).
+
+Cada ejercicio del registro lleva sus objetivos tal como estaban en la rutina
+al registrarlo (`target_sets`, `muscles`, `stamina_costs`), así la
+contribución de un día no cambia aunque después se re-planifique la rutina.
+Los registros anteriores que no los traen usan la rutina guardada.
+
+El documento guarda también la contribución de cada día registrado: como
+`save_tracking` sobrescribe el registro de un día, al actualizarlo se resta la
+contribución anterior y se suma la nueva, sin mirar el resto del historial.
+Así los agregados siempre coinciden con recalcularlos desde `get_tracking`
+(`rebuild`). Todos los contadores son enteros, para que restar sea exacto.
+
+La semana de un registro es la semana ISO del día entrenado: la fecha de
+guardado menos `day` días (la clave `day` es "hace cuántos días", ver la
+página de seguimiento).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.routine_builder import DIFFICULTY_STAMINA_FACTOR
+
+# escala numérica de la dificultad percibida
+DIFFICULTY_SCORE = {
+    "Muy fácil": 1,
+    "Fácil": 2,
+    "Moderado": 3,
+    "Difícil": 4,
+    "Muy difícil": 5,
+}
+
+_COUNTERS = ("sessions", "sets_completed", "target_sets", "difficulty_sum", "difficulty_count")
+
+
+def exercise_index(routine: Optional[Mapping[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Ejercicios de la rutina por nombre (músculos, sets y consumo de estamina)."""
+    index: Dict[str, Dict[str, Any]] = {}
+    for key, items in ((routine or {}).get("schedule") or {}).items():
+        if key.endswith("_meta"):
+            continue
+        for ex in items:
+            index.setdefault(ex.get("name"), ex)
+    return index
+
+
+def needs_routine(record: Mapping[str, Any]) -> bool:
+    """True si algún ejercicio del registro no trae sus músculos y consumo (registros anteriores)."""
+    return any("muscles" not in log or "stamina_costs" not in log
+               for log in (record.get("exercises") or {}).values())
+
+
+def record_week(day: Any, record: Mapping[str, Any]) -> str:
+    """Semana ISO ('2025-W45') del día entrenado en `record`."""
+    try:
+        saved = datetime.fromisoformat(record["date"])
+    except (KeyError, TypeError, ValueError):
+        saved = datetime.now()
+    if str(day).isdigit():
+        saved -= timedelta(days=int(day))
+    year, week, _ = saved.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def day_contribution(day: Any, record: Mapping[str, Any],
+                     exercises: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """Lo que aporta un registro diario a los agregados."""
+    contribution = {"week": record_week(day, record), "volume": {}, "stamina": {},
+                    "sessions": 1, "sets_completed": 0, "target_sets": 0,
+                    "difficulty_sum": 0, "difficulty_count": 0}
+    volume, stamina = contribution["volume"], contribution["stamina"]
+    for name, log in (record.get("exercises") or {}).items():
+        ex = exercises.get(name) or {}
+        planned = int(log.get("target_sets") or ex.get("sets") or 0)
+        done = int(log.get("sets_completed") or 0)
+        contribution["sets_completed"] += done
+        contribution["target_sets"] += planned
+        score = DIFFICULTY_SCORE.get(log.get("difficulty"))
+        if score is not None:
+            contribution["difficulty_sum"] += score
+            contribution["difficulty_count"] += 1
+        for m in log.get("muscles", ex.get("muscles")) or []:
+            volume[m] = volume.get(m, 0) + done
+        factor = DIFFICULTY_STAMINA_FACTOR.get(log.get("difficulty"), 1.0)
+        for m, cost in (log.get("stamina_costs", ex.get("stamina_costs")) or {}).items():
+            actual = int(round(cost * (done / planned if planned else 0) * factor))
+            stamina[m] = stamina.get(m, 0) + actual
+    return contribution
+
+
+def _empty() -> Dict[str, Any]:
+    return {"days": {}, "weeks": {}, "totals": dict.fromkeys(_COUNTERS, 0)}
+
+
+def _add(target: Dict[str, Any], contribution: Mapping[str, Any], sign: int) -> None:
+    for name in _COUNTERS:
+        target[name] = target.get(name, 0) + sign * contribution[name]
+
+
+def _add_counts(target: Dict[str, int], counts: Mapping[str, int], sign: int) -> None:
+    for m, n in counts.items():
+        value = target.get(m, 0) + sign * n
+        if value:
+            target[m] = value
+        else:
+            target.pop(m, None)
+
+
+def _apply(doc: Dict[str, Any], contribution: Mapping[str, Any], sign: int) -> None:
+    _add(doc["totals"], contribution, sign)
+    week = doc["weeks"].setdefault(contribution["week"], {"volume": {}, "stamina": {}})
+    _add(week, contribution, sign)
+    _add_counts(week["volume"], contribution["volume"], sign)
+    _add_counts(week["stamina"], contribution["stamina"], sign)
+    if week["sessions"] == 0:
+        del doc["weeks"][contribution["week"]]
+
+
+def apply_day(doc: Optional[Dict[str, Any]], day: Any, contribution: Mapping[str, Any]) -> Dict[str, Any]:
+    """Actualiza `doc` (o uno nuevo) con el registro de `day`, reemplazando el anterior. O(1)."""
+    doc = doc if doc is not None else _empty()
+    day = str(day)
+    previous = doc["days"].get(day)
+    if previous is not None:
+        _apply(doc, previous, -1)
+    _apply(doc, contribution, 1)
+    doc["days"][day] = dict(contribution)
+    return doc
+
+
+def rebuild(tracking: Mapping[str, Mapping[str, Any]], routine: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Agregados recalculados desde todo el historial (migración y verificación)."""
+    exercises = exercise_index(routine)
+    doc = _empty()
+    for day, record in (tracking or {}).items():
+        apply_day(doc, day, day_contribution(day, record, exercises))
+    return doc
+
+
+def summary(doc: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Vista para la UI: métricas totales y series por semana (ordenadas)."""
+    doc = doc or _empty()
+    totals = doc["totals"]
+    weeks = sorted(doc["weeks"])
+
+    def rate(counts):
+        return counts["sets_completed"] / counts["target_sets"] * 100 if counts["target_sets"] else None
+
+    def difficulty(counts):
+        return counts["difficulty_sum"] / counts["difficulty_count"] if counts["difficulty_count"] else None
+
+    trend: List[Dict[str, Any]] = [
+        {"week": w, "sessions": doc["weeks"][w]["sessions"],
+         "completion_rate": rate(doc["weeks"][w]), "avg_difficulty": difficulty(doc["weeks"][w])}
+        for w in weeks
+    ]
+    return {
+        "sessions": totals["sessions"],
+        "completion_rate": rate(totals),
+        "avg_difficulty": difficulty(totals),
+        "weekly_volume": {w: dict(doc["weeks"][w]["volume"]) for w in weeks},
+        "weekly_stamina": {w: dict(doc["weeks"][w]["stamina"]) for w in weeks},
+        "trend": trend,
+    }
@@ -0,0 +1,209 @@
+"""Grafo de transiciones entre ejercicios, precalculado y guardado en disco.
+
+Para cada ejercicio guarda sus `k` mejores sucesores según:
+
+    peso(a, b) = EQUIPMENT_WEIGHT * [comparten equipamiento]
+               + MUSCLE_CHANGE_WEIGHT * (1 - jaccard(músculos(a), músculos(b)))
+
+donde los músculos incluyen los secundarios. Como en el optimizador, solo hay
+arista si comparten equipamiento o si no comparten ningún músculo objetivo.
+
+Los pesos se calculan por bloques de filas con matrices de incidencia
+(ejercicio x músculo, ejercicio x equipamiento) y productos de matrices, en vez
+de recorrer los ~2.25M pares en Python. El resultado se guarda en formato CSR
+(`indptr`, `indices`, `weights`) en un `.npz` junto a `exercises.json`, con el
+hash del JSON del que salió; `src.catalog` lo expone como
+`get_catalog().transition_graph` y solo lo reconstruye si el dataset cambió.
+
+Paso de build (opcional, el catálogo lo genera si falta):
+
+    python -m src.transition_graph [exercises.json] [--k K]
+"""
+import argparse
+import os
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.catalog import file_sha256
+
+DEFAULT_TOP_K = 32
+EQUIPMENT_WEIGHT = 0.2
+MUSCLE_CHANGE_WEIGHT = 1.0
+BLOCK_ROWS = 256
+WEIGHT_DECIMALS = 6
+FORMAT_VERSION = 1
+
+
+def dataset_hash(json_path: str) -> str:
+    """sha256 del contenido de `exercises.json`."""
+    return file_sha256(json_path)
+
+
+def graph_path_for(json_path: str) -> str:
+    """Ruta del grafo precalculado asociado a un `exercises.json`."""
+    return os.path.splitext(json_path)[0] + ".transitions.npz"
+
+
+class TransitionGraph:
+    """Grafo top-k en formato CSR: los sucesores de `i` son `indices[indptr[i]:indptr[i+1]]`."""
+
+    def __init__(self, ids: Sequence[str], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                 source_hash: str = "", k: int = DEFAULT_TOP_K):
+        self.ids = list(ids)
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.source_hash = source_hash
+        self.k = k
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_of(self, exercise_id: str) -> Optional[int]:
+        if self._index is None:
+            self._index = {ex_id: i for i, ex_id in enumerate(self.ids)}
+        return self._index.get(exercise_id)
+
+    def neighbors(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(índices, pesos) de los sucesores de `i`, de mayor a menor peso."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def successors(self, exercise_id: str) -> List[Tuple[str, float]]:
+        """Sucesores de un ejercicio como `(exerciseId, peso)`."""
+        i = self.index_of(exercise_id)
+        if i is None:
+            return []
+        indices, weights = self.neighbors(i)
+        return [(self.ids[j], float(w)) for j, w in zip(indices.tolist(), weights.tolist())]
+
+    def save(self, path: str) -> None:
+        # temporal propio en el mismo directorio: dos procesos que construyen a la vez no se pisan
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                   prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=np.int32(FORMAT_VERSION),
+                    source_hash=np.array(self.source_hash),
+                    k=np.int32(self.k),
+                    ids=np.array(self.ids),
+                    indptr=self.indptr,
+                    indices=self.indices,
+                    weights=self.weights,
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TransitionGraph":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Versión de grafo no soportada: {path}")
+            return cls(data["ids"].tolist(), data["indptr"], data["indices"], data["weights"],
+                       str(data["source_hash"]), int(data["k"]))
+
+
+def _incidence(exercises: Sequence[Dict[str, Any]], fields: Sequence[str]) -> np.ndarray:
+    """Matriz binaria ejercicio x valor (en minúsculas) de los campos lista `fields`."""
+    vocab: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, ex in enumerate(exercises):
+        for value in {v.lower() for field in fields for v in ex.get(field, [])}:
+            rows.append(i)
+            cols.append(vocab.setdefault(value, len(vocab)))
+    matrix = np.zeros((len(exercises), max(len(vocab), 1)), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    return matrix
+
+
+def build_transition_graph(exercises: Sequence[Dict[str, Any]], k: int = DEFAULT_TOP_K,
+                           source_hash: str = "") -> TransitionGraph:
+    """Calcula el grafo top-k de `exercises` (vectorizado, por bloques de filas)."""
+    n = len(exercises)
+    muscles = _incidence(exercises, ("targetMuscles", "secondaryMuscles"))
+    targets = _incidence(exercises, ("targetMuscles",))
+    equipment = _incidence(exercises, ("equipments",))
+    sizes = muscles.sum(axis=1)
+    top_k = min(k, max(n - 1, 0))
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices_blocks, weights_blocks = [], []
+    for start in range(0, n, BLOCK_ROWS):
+        end = min(start + BLOCK_ROWS, n)
+        shared = muscles[start:end] @ muscles.T
+        union = sizes[start:end, None] + sizes[None, :] - shared
+        jaccard = np.divide(shared, union, out=np.zeros(shared.shape), where=union > 0)
+        same_equipment = (equipment[start:end] @ equipment.T) > 0
+        shares_target = (targets[start:end] @ targets.T) > 0
+
+        weights = MUSCLE_CHANGE_WEIGHT * (1.0 - jaccard) + EQUIPMENT_WEIGHT * same_equipment
+        # redondeo: pesos iguales en teoría empatan aunque difieran en el último bit
+        weights = np.round(weights, WEIGHT_DECIMALS)
+        weights[~(same_equipment | ~shares_target)] = -np.inf
+        weights[np.arange(end - start), np.arange(start, end)] = -np.inf
+
+        # orden estable: a igual peso gana el índice menor (resultado reproducible)
+        top = np.argsort(-weights, axis=1, kind="stable")[:, :top_k]
+        top_weights = np.take_along_axis(weights, top, axis=1)
+        valid = np.isfinite(top_weights)
+        indices_blocks.append(top[valid].astype(np.int32))
+        weights_blocks.append(top_weights[valid].astype(np.float32))
+        indptr[start + 1:end + 1] = valid.sum(axis=1)
+
+    np.cumsum(indptr, out=indptr)
+    ids = [ex.get("exerciseId") for ex in exercises]
+    indices = np.concatenate(indices_blocks) if indices_blocks else np.zeros(0, dtype=np.int32)
+    weights = np.concatenate(weights_blocks) if weights_blocks else np.zeros(0, dtype=np.float32)
+    return TransitionGraph(ids, indptr, indices, weights, source_hash, k)
+
+
+def load_or_build(json_path: str, exercises: Sequence[Dict[str, Any]], k: int = DEFAULT_TOP_K,
+                  source_hash: str = None) -> TransitionGraph:
+    """Carga el grafo guardado de `json_path` o lo reconstruye si falta o el dataset cambió."""
+    source_hash = source_hash or dataset_hash(json_path)
+    path = graph_path_for(json_path)
+    try:
+        graph = TransitionGraph.load(path)
+        if graph.source_hash == source_hash and graph.k == k and len(graph) == len(exercises):
+            return graph
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        pass  # no existe, está truncado o corrupto, o es de otro formato: se reconstruye
+    graph = build_transition_graph(exercises, k, source_hash)
+    try:
+        graph.save(path)
+    except OSError:
+        pass  # directorio de solo lectura: se usa el grafo en memoria
+    return graph
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from src.catalog import DEFAULT_EXERCISES_PATH
+
+    parser = argparse.ArgumentParser(description="Precalcula el grafo de transiciones de exercises.json")
+    parser.add_argument("json_path", nargs="?", default=DEFAULT_EXERCISES_PATH)
+    parser.add_argument("--k", type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    with open(args.json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    t0 = time.perf_counter()
+    built = build_transition_graph(data, args.k, dataset_hash(args.json_path))
+    elapsed = time.perf_counter() - t0
+    out = graph_path_for(args.json_path)
+    built.save(out)
+    print(f"Grafo escrito en {out}: {len(built)} ejercicios, {len(built.indices)} aristas, "
+          f"{os.path.getsize(out)} bytes ({elapsed * 1000:.0f} ms)")
@@ -0,0 +1,126 @@
+"""Snapshots truncados o corruptos: `CatalogSnapshot` lanza SnapshotError y el catálogo vuelve al JSON.
+
+También: builds concurrentes y cierre del mmap al recargar o descartar el catálogo.
+
+    python -m pytest tests
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from src import catalog, catalog_snapshot
+from src.catalog_snapshot import CatalogSnapshot, SnapshotError
+
+EXERCISES = [
+    {
+        "exerciseId": "ex1",
+        "name": "push up",
+        "gifUrl": "https://example.com/ex1.gif",
+        "targetMuscles": ["pectorals"],
+        "bodyParts": ["chest"],
+        "equipments": ["body weight"],
+        "secondaryMuscles": ["triceps", "shoulders"],
+        "instructions": ["Step:1 Baja.", "Step:2 Sube."],
+    },
+    {
+        "exerciseId": "ex2",
+        "name": "barbell squat",
+        "gifUrl": "https://example.com/ex2.gif",
+        "targetMuscles": ["quads"],
+        "bodyParts": ["upper legs"],
+        "equipments": ["barbell"],
+        "secondaryMuscles": ["glutes"],
+        "instructions": ["Step:1 Baja."],
+    },
+]
+
+
+class TruncatedSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, "exercises.json")
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(EXERCISES, f)
+        self.snapshot_path = catalog_snapshot.build_snapshot(self.json_path)
+        with open(self.snapshot_path, "rb") as f:
+            self.data = f.read()
+
+    def tearDown(self):
+        catalog._catalogs.pop(os.path.abspath(self.json_path), None)
+        self.tmp.cleanup()
+
+    def truncate(self, size):
+        with open(self.snapshot_path, "wb") as f:
+            f.write(self.data[:size])
+
+    def test_complete_snapshot_loads(self):
+        exercises = catalog_snapshot.load_snapshot(self.snapshot_path)
+        self.assertEqual([dict(ex) for ex in exercises], EXERCISES)
+
+    def test_truncated_snapshot_raises_snapshot_error(self):
+        for size in range(len(self.data)):
+            with self.subTest(size=size):
+                self.truncate(size)
+                with self.assertRaises(SnapshotError):
+                    CatalogSnapshot(self.snapshot_path)
+
+    def test_truncated_header_falls_back_to_json(self):
+        # cabecera completa, tabla de secciones cortada
+        self.truncate(catalog_snapshot.HEADER.size + catalog_snapshot.SECTION.size // 2)
+        loaded = catalog.get_catalog(self.json_path)
+        self.assertEqual(loaded.source, "json")
+        self.assertEqual(loaded.exercises, EXERCISES)
+
+
+class SnapshotLifecycleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, "exercises.json")
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(EXERCISES, f)
+        self.snapshot_path = catalog_snapshot.build_snapshot(self.json_path)
+
+    def tearDown(self):
+        catalog._catalogs.pop(os.path.abspath(self.json_path), None)
+        self.tmp.cleanup()
+
+    def test_concurrent_builds_leave_a_valid_snapshot(self):
+        threads = [threading.Thread(target=catalog_snapshot.build_snapshot, args=(self.json_path,))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["exercises.json", "exercises.snapshot"])
+        self.assertEqual([dict(ex) for ex in catalog_snapshot.load_snapshot(self.snapshot_path)], EXERCISES)
+
+    def test_close_releases_the_mmap(self):
+        snapshot = CatalogSnapshot(self.snapshot_path)
+        exercises = snapshot.exercises()
+        self.assertEqual(exercises[0]["instructions"], EXERCISES[0]["instructions"])
+        snapshot.close()
+        snapshot.close()
+        self.assertTrue(snapshot.closed)
+        # las columnas ya decodificadas y las instrucciones leídas siguen disponibles
+        self.assertEqual(exercises[1]["name"], "barbell squat")
+        self.assertEqual(exercises[0]["instructions"], EXERCISES[0]["instructions"])
+        with self.assertRaises(SnapshotError):
+            exercises[1]["instructions"]
+
+    def test_reloading_the_catalog_closes_the_previous_snapshot(self):
+        first = catalog.get_catalog(self.json_path)
+        self.assertEqual(first.source, "snapshot")
+        stat = os.stat(self.snapshot_path)
+        os.utime(self.snapshot_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        second = catalog.get_catalog(self.json_path)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.snapshot.closed)
+        self.assertFalse(second.snapshot.closed)
+        catalog.clear_cache()
+        self.assertTrue(second.snapshot.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""`DocumentCache`: durabilidad, escrituras concurrentes y lectores que no esperan al disco.
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.database import cache as cache_module
+from src.database.atomic_io import atomic_write_json, read_json
+from src.database.cache import DocumentCache
+
+
+def put(key, value):
+    def op(doc):
+        doc[key] = value
+    return op
+
+
+class DocumentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "doc.json")
+        self.other = os.path.join(self.tmp.name, "other.json")
+        for path in (self.path, self.other):
+            atomic_write_json(path, {})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_updates_are_all_persisted(self):
+        for durability in ("sync", "interval", "manual"):
+            with self.subTest(durability=durability):
+                atomic_write_json(self.path, {})
+                cache = DocumentCache(durability=durability, flush_interval=0.01)
+                threads = [threading.Thread(target=lambda k=k: [cache.update(self.path, put(f"{k}-{i}", i))
+                                                                 for i in range(25)])
+                           for k in range(4)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                cache.close()
+                self.assertEqual(len(read_json(self.path)), 100)
+                self.assertEqual(cache.pending(), 0)
+
+    def test_manual_writes_are_visible_before_flush(self):
+        cache = DocumentCache(durability="manual")
+        cache.update(self.path, put("a", 1))
+        self.assertEqual(cache.read_copy(self.path), {"a": 1})
+        self.assertEqual(read_json(self.path), {})
+        cache.flush()
+        self.assertEqual(read_json(self.path), {"a": 1})
+
+    def test_flush_replays_pending_over_other_writers(self):
+        # dos cachés sobre el mismo archivo, como dos procesos
+        first = DocumentCache(durability="manual")
+        second = DocumentCache(durability="sync")
+        first.update(self.path, put("a", 1))
+        second.update(self.path, put("b", 2))
+        first.flush()
+        self.assertEqual(read_json(self.path), {"a": 1, "b": 2})
+        self.assertEqual(second.read_copy(self.path), {"a": 1, "b": 2})
+
+    def test_readers_do_not_wait_for_a_write_being_persisted(self):
+        cache = DocumentCache(durability="sync")
+        cache.update(self.path, put("a", 1))
+        writing = threading.Event()
+        release = threading.Event()
+        real_write_temp = cache_module.write_temp
+
+        def slow_write_temp(path, data):
+            writing.set()
+            release.wait(5)
+            return real_write_temp(path, data)
+
+        with mock.patch.object(cache_module, "write_temp", slow_write_temp):
+            writer = threading.Thread(target=cache.update, args=(self.path, put("a", 2)))
+            writer.start()
+            self.assertTrue(writing.wait(5))
+            reads = {}
+            reader = threading.Thread(target=lambda: reads.update(
+                same=cache.read_copy(self.path), other=cache.read_copy(self.other)))
+            reader.start()
+            reader.join(1)
+            blocked = reader.is_alive()
+            release.set()
+            writer.join()
+            reader.join()
+        self.assertFalse(blocked, "la lectura esperó al fsync de otra escritura")
+        self.assertEqual(reads["other"], {})
+        self.assertEqual(read_json(self.path), {"a": 2})
+        self.assertEqual(cache.read_copy(self.path), {"a": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
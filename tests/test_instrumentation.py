@@ -0,0 +1,66 @@
+"""Instrumentación: el destino JSONL escribe cada span al emitirlo y `knapsack_cells` cuenta las celdas reales.
+
+    python -m pytest tests
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.bench_knapsack import synthetic_items
+from src import instrumentation, routine_builder
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.configure(enabled=False)
+        instrumentation.reset()
+        self.tmp.cleanup()
+
+    def test_jsonl_lines_are_written_as_spans_finish(self):
+        path = os.path.join(self.tmp.name, "spans.jsonl")
+        instrumentation.configure(sink=f"jsonl:{path}")
+        with instrumentation.span("uno", k=1):
+            pass
+        # sin flush ni close: otro lector ya ve la línea completa
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["uno"])
+
+    def cells(self, solver, items, capacity, values):
+        instrumentation.configure()
+        with instrumentation.span("solve") as span:
+            solver(items, capacity, values)
+        instrumentation.configure(enabled=False)
+        return span["knapsack_cells"]
+
+    def test_knapsack_cells_count_the_inner_loop(self):
+        items, values = synthetic_items(300)
+        items = list(items) + [{"time": 500}]  # no cabe: no relaja ninguna celda
+        values = values + [3]
+        capacity = 120
+        expected = sum(capacity - it["time"] + 1 for it in items if it["time"] <= capacity)
+        self.assertEqual(self.cells(routine_builder.knapsack_max_value, items, capacity, values), expected)
+        if routine_builder.np is not None:
+            # el motor numpy salta las clases (tiempo, valor) saturadas
+            self.assertLessEqual(self.cells(routine_builder.knapsack_numpy, items, capacity, values), expected)
+        # el agrupado relaja solo sus pseudo-items (pocos por clase), no los 300 candidatos
+        self.assertLess(self.cells(routine_builder.knapsack_grouped, items, capacity, values), expected // 5)
+
+    def test_solve_span_reports_the_solver_cells(self):
+        instrumentation.configure()
+        routine_builder.generate_routine(3, 120, user_level=2)
+        spans = [s for s in instrumentation.recent_spans() if s["name"] == "knapsack.solve"]
+        self.assertEqual(len(spans), 3)
+        for s in spans:
+            self.assertLessEqual(s["knapsack_cells"], s["items"] * (s["capacity"] + 1))
+        self.assertEqual(instrumentation.snapshot()["counters"]["knapsack_cells"],
+                         sum(s["knapsack_cells"] for s in spans))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Backend JSON entre procesos: `locked` serializa a los escritores y los lectores nunca ven archivos a medias.
+
+    python -m pytest tests
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from benchmarks import stress_json_backend
+from src.database.atomic_io import atomic_write_json, locked, read_json
+from src.database.db_manager import DatabaseManager
+
+PROCESSES = 4
+OPS = 25
+
+
+def increment(path: str, times: int) -> None:
+    # lectura-modificación-escritura bajo el lock entre procesos
+    for _ in range(times):
+        with locked(path):
+            data = read_json(path)
+            data["count"] += 1
+            atomic_write_json(path, data)
+
+
+class JsonBackendProcessesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # spawn: procesos limpios, sin heredar los hilos ni los backends compartidos de este proceso
+        self.ctx = multiprocessing.get_context("spawn")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_locked_read_modify_write_across_processes(self):
+        path = os.path.join(self.tmp.name, "counter.json")
+        atomic_write_json(path, {"count": 0})
+        procs = [self.ctx.Process(target=increment, args=(path, 50)) for _ in range(PROCESSES)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+        self.assertEqual(read_json(path), {"count": PROCESSES * 50})
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["counter.json", "counter.json.lock"])
+
+    def test_parallel_saves_are_not_lost(self):
+        for mode in ("json", "log"):
+            with self.subTest(tracking_mode=mode):
+                data_dir = os.path.join(self.tmp.name, mode)
+                DatabaseManager(data_dir, tracking_mode=mode, backend="json")
+                with self.ctx.Pool(PROCESSES) as pool:
+                    pool.starmap(stress_json_backend.worker,
+                                 [(data_dir, mode, p, OPS) for p in range(PROCESSES)])
+                self.assertEqual(stress_json_backend.check(data_dir, mode, PROCESSES, OPS), [])
+                # los archivos siguen siendo JSON válido
+                for name in ("tracking.json", "routines.json"):
+                    path = os.path.join(data_dir, name)
+                    if os.path.exists(path):
+                        self.assertIsInstance(read_json(path), dict)
+
+    def test_readers_never_see_a_partial_file(self):
+        path = os.path.join(self.tmp.name, "routines.json")
+        documents = [{f"user{i}": {"routine": {"op": k, "padding": "x" * 4096}} for i in range(50)}
+                     for k in range(2)]
+        atomic_write_json(path, documents[0])
+        stop = threading.Event()
+
+        def writer():
+            k = 0
+            while not stop.is_set():
+                k += 1
+                atomic_write_json(path, documents[k % 2])
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(200):
+                # sin lock: el archivo es el anterior o el nuevo, completo
+                self.assertIn(read_json(path), documents)
+        finally:
+            stop.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
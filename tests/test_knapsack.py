@@ -0,0 +1,97 @@
+"""Paridad de los solvers de la mochila: numpy y el solver en Python eligen lo mismo que la implementación original.
+
+El solver agrupado (`knapsack_grouped`) puede desempatar distinto: se exige el
+mismo valor óptimo, respetar la capacidad y un desempate determinista.
+
+    python -m pytest tests
+"""
+import random
+import unittest
+
+from benchmarks.bench_knapsack import knapsack_pick_lists, synthetic_items
+from src import routine_builder
+
+
+def random_instance(rng, n, capacity):
+    # tiempos 0 y mayores que la capacidad incluidos, valores con ceros y empates
+    items = [{"time": rng.choice([0, 1, 3, 4, 8, 12, 16, capacity + 1])} for _ in range(n)]
+    values = [rng.randint(0, 6) for _ in range(n)]
+    return items, values
+
+
+@unittest.skipIf(routine_builder.np is None, "numpy no está instalado")
+class KnapsackParityTest(unittest.TestCase):
+    def assert_same_selection(self, items, capacity, values):
+        expected = knapsack_pick_lists(items, capacity, values)
+        self.assertEqual(routine_builder.knapsack_max_value(items, capacity, values), expected)
+        self.assertEqual(routine_builder.knapsack_numpy(items, capacity, values), expected)
+
+    def test_random_instances(self):
+        rng = random.Random(0)
+        for k in range(300):
+            capacity = rng.choice([0, 1, 7, 37, 120])
+            items, values = random_instance(rng, rng.randint(0, 60), capacity)
+            with self.subTest(k=k, capacity=capacity, n=len(items)):
+                self.assert_same_selection(items, capacity, values)
+
+    def test_synthetic_catalog(self):
+        # muchos items repetidos: el solver numpy salta los que ya no pueden mejorar
+        items, values = synthetic_items(1500)
+        self.assert_same_selection(items, 120, values)
+
+    def test_generate_routine_numpy_matches_python(self):
+        for num_days in (3, 4, 5):
+            for level in range(5):
+                with self.subTest(num_days=num_days, level=level):
+                    reference = routine_builder.generate_routine(num_days, 120, user_level=level, solver="python")
+                    routine = routine_builder.generate_routine(num_days, 120, user_level=level, solver="numpy")
+                    # plan_params guarda el solver usado
+                    reference.pop("plan_params")
+                    routine.pop("plan_params")
+                    self.assertEqual(routine, reference)
+
+
+class GroupedKnapsackTest(unittest.TestCase):
+    def value(self, selected, values):
+        return sum(values[i] for i in selected)
+
+    def assert_optimal(self, items, capacity, values):
+        selected = routine_builder.knapsack_grouped(items, capacity, values)
+        best = routine_builder.knapsack_max_value(items, capacity, values)
+        self.assertEqual(self.value(selected, values), self.value(best, values))
+        self.assertLessEqual(sum(items[i]["time"] for i in selected), capacity)
+        self.assertEqual(selected, sorted(set(selected)))
+        return selected
+
+    def test_random_instances_reach_the_optimal_value(self):
+        rng = random.Random(1)
+        for k in range(300):
+            capacity = rng.choice([0, 1, 7, 37, 120])
+            items, values = random_instance(rng, rng.randint(0, 60), capacity)
+            with self.subTest(k=k, capacity=capacity, n=len(items)):
+                self.assert_optimal(items, capacity, values)
+
+    def test_synthetic_catalog(self):
+        items, values = synthetic_items(15000)
+        self.assert_optimal(items, 120, values)
+
+    def test_ties_take_the_first_members_of_each_class(self):
+        # cinco items iguales (12 min, valor 3): caben cuatro y se toman los primeros
+        items = [{"time": 16}] + [{"time": 12}] * 5 + [{"time": 16}]
+        values = [1, 3, 3, 3, 3, 3, 1]
+        self.assertEqual(routine_builder.knapsack_grouped(items, 48, values), [1, 2, 3, 4])
+        # y el resultado no depende de cuántas veces se resuelva
+        self.assertEqual(routine_builder.knapsack_grouped(items, 48, values), [1, 2, 3, 4])
+
+    def test_generate_routine_is_reproducible(self):
+        for level in range(5):
+            with self.subTest(level=level):
+                routine = routine_builder.generate_routine(4, 120, user_level=level, solver="grouped")
+                self.assertEqual(routine_builder.generate_routine(4, 120, user_level=level, solver="grouped"),
+                                 routine)
+                for day in range(1, 5):
+                    self.assertLessEqual(sum(ex["time_min"] for ex in routine["schedule"][f"day_{day}"]), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
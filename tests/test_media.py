@@ -0,0 +1,43 @@
+"""`MediaStore`: lectura de los GIF locales y miniaturas.
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from src import media
+
+
+@unittest.skipIf(media.Image is None, "requiere Pillow")
+class ThumbnailTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = media.MediaStore(self.tmp.name, thumbnail_size=8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, exercise_id, data):
+        with open(os.path.join(self.tmp.name, exercise_id + ".gif"), "wb") as f:
+            f.write(data)
+
+    def test_thumbnail_is_a_small_png(self):
+        img = media.Image.new("RGB", (64, 32), "red")
+        path = os.path.join(self.tmp.name, "press.gif")
+        img.save(path, format="GIF")
+        data = self.store.get_bytes("press", thumbnail=True)
+        self.assertTrue(data.startswith(b"\x89PNG"))
+        with media.Image.open(media.io.BytesIO(data)) as thumb:
+            self.assertEqual(thumb.size, (8, 4))
+
+    def test_undecodable_file_falls_back_to_the_original_bytes(self):
+        for label, data in (("basura", b"no es un gif" * 10), ("truncado", b"GIF89a\x40\x00")):
+            with self.subTest(label):
+                self.write(label, data)
+                self.assertEqual(self.store.get_bytes(label, thumbnail=True), data)
+                self.assertEqual(self.store.image_source({"exerciseId": label}, thumbnail=True), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
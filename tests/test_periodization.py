@@ -0,0 +1,41 @@
+"""`plan_mesocycle`: la primera semana es `generate_routine` y la fatiga arrastrada no se acumula.
+
+    python -m pytest tests
+"""
+import unittest
+
+from src import periodization, routine_builder
+
+
+class MesocycleTest(unittest.TestCase):
+    def setUp(self):
+        self.weeks = list(periodization.plan_mesocycle(8, 4, user_level=2))
+
+    def test_first_week_matches_generate_routine(self):
+        first = {k: v for k, v in self.weeks[0].items()
+                 if k not in ("week", "deload", "volume_factor", "carried_sets", "carried_fatigue")}
+        self.assertEqual(first, routine_builder.generate_routine(4, 120, user_level=2))
+
+    def test_stamina_used_is_the_weeks_own_load(self):
+        for week in self.weeks:
+            fatigue = week["carried_fatigue"]
+            for m, limit in week["stamina_limit_per_muscle"].items():
+                with self.subTest(week=week["week"], muscle=m):
+                    available = max(0, limit - fatigue.get(m, 0))
+                    self.assertEqual(week["stamina_used"][m] + week["stamina_remaining"][m], available)
+
+    def test_fatigue_is_carried_once(self):
+        for previous, week in zip(self.weeks, self.weeks[1:]):
+            if previous["deload"]:
+                self.assertEqual(week["carried_fatigue"], {})
+                continue
+            expected = {m: int(round(used * periodization.FATIGUE_CARRYOVER))
+                        for m, used in previous["stamina_used"].items()}
+            self.assertEqual(week["carried_fatigue"], {m: f for m, f in expected.items() if f})
+            # nunca más que la fracción de lo que permite una semana
+            for m, f in week["carried_fatigue"].items():
+                self.assertLessEqual(f, round(previous["stamina_limit_per_muscle"][m] * periodization.FATIGUE_CARRYOVER))
+
+
+if __name__ == "__main__":
+    unittest.main()
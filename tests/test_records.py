@@ -0,0 +1,67 @@
+"""Registros de `src.records`: se comportan como el dict de antes y no se pueden modificar.
+
+    python -m pytest tests
+"""
+import copy
+import pickle
+import unittest
+
+from src import records, routine_builder
+from src.records import ExerciseItem, ScheduleEntry
+
+
+class RecordTest(unittest.TestCase):
+    def setUp(self):
+        self.item = ExerciseItem("ex1", "push up", ("pectorals", "triceps"), 3, 10, 12, {"exerciseId": "ex1"}, True)
+        self.entry = ScheduleEntry("ex1", "push up", 3, 10, 12, ("pectorals",), (("pectorals", 30),))
+
+    def test_attributes_are_read_only(self):
+        for record in (self.item, self.entry):
+            for name in record.__slots__:
+                with self.subTest(type(record).__name__, field=name):
+                    with self.assertRaises(AttributeError):
+                        setattr(record, name, None)
+                    with self.assertRaises(AttributeError):
+                        delattr(record, name)
+                    with self.assertRaises(AttributeError):
+                        record.extra = 1
+        self.assertEqual(self.item.sets, 3)
+
+    def test_copies_are_equal_and_still_read_only(self):
+        for record in (self.item, self.entry):
+            for clone in (pickle.loads(pickle.dumps(record)), copy.deepcopy(record), copy.copy(record)):
+                with self.subTest(type(record).__name__):
+                    self.assertEqual(clone, record)
+                    self.assertEqual(clone.as_dict(), record.as_dict())
+                    with self.assertRaises(AttributeError):
+                        clone.sets = 9
+
+    def test_behaves_like_the_stored_dict(self):
+        self.assertEqual(self.entry, {"id": "ex1", "name": "push up", "sets": 3, "reps": 10, "time_min": 12,
+                                      "muscles": ["pectorals"], "stamina_costs": {"pectorals": 30}})
+        self.assertEqual(self.entry["stamina_costs"], {"pectorals": 30})
+        self.assertEqual(records.to_plain({"day_1": [self.entry]})["day_1"][0]["muscles"], ["pectorals"])
+        self.assertEqual(self.item.get("reps"), 10)
+        self.assertIsNone(self.item.get("missing"))
+        with self.assertRaises(KeyError):
+            self.item["missing"]
+
+    def test_cached_items_cannot_be_changed_by_a_caller(self):
+        tables = routine_builder.get_item_tables(2)
+        with self.assertRaises(AttributeError):
+            tables.items[0].sets = 99
+        self.assertIs(routine_builder.get_item_tables(2), tables)
+
+    @unittest.skipIf(routine_builder.np is None, "requiere numpy")
+    def test_cached_incidence_arrays_are_read_only(self):
+        incidence = routine_builder.get_item_tables(2).incidence
+        with self.assertRaises(ValueError):
+            incidence.set_sets[0] = 99
+        with self.assertRaises(ValueError):
+            incidence.cost_values += 1
+        with self.assertRaises(TypeError):
+            routine_builder.get_item_tables(2).stamina_costs[0]["chest"] = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""`replan_routine`: re-planificar con lo hecho según lo previsto reproduce la rutina original.
+
+    python -m pytest tests
+"""
+import unittest
+
+from src import records, routine_builder
+
+
+def as_planned(day_items, date="2030-01-01T10:00:00"):
+    return {"date": date, "exercises": {ex["name"]: {"sets_completed": ex["sets"], "difficulty": "Moderado"}
+                                        for ex in day_items}}
+
+
+def without_replan_keys(routine):
+    return {k: v for k, v in records.to_plain(routine).items() if k != "replanned_from_day"}
+
+
+class ReplanTest(unittest.TestCase):
+    def setUp(self):
+        self.routine = records.to_plain(routine_builder.generate_routine(4, 120, user_level=2))
+        self.schedule = self.routine["schedule"]
+
+    def test_without_tracking_matches_generate_routine(self):
+        replanned = routine_builder.replan_routine(self.routine, {})
+        self.assertEqual(replanned["replanned_from_day"], 1)
+        self.assertEqual(without_replan_keys(replanned), self.routine)
+
+    def test_days_done_as_planned_keep_the_rest_of_the_week(self):
+        for done in range(1, 5):
+            with self.subTest(days_done=done):
+                tracking = {str(d): as_planned(self.schedule[f"day_{d + 1}"]) for d in range(done)}
+                replanned = routine_builder.replan_routine(self.routine, tracking)
+                self.assertEqual(replanned["replanned_from_day"], done + 1)
+                self.assertEqual(without_replan_keys(replanned), self.routine)
+
+    def test_missed_sets_are_planned_again(self):
+        day_1 = self.schedule["day_1"]
+        skipped = {"date": "2030-01-01T10:00:00",
+                   "exercises": {ex["name"]: {"sets_completed": 0} for ex in day_1}}
+        replanned = routine_builder.replan_routine(self.routine, {"0": skipped})
+        self.assertEqual(replanned["replanned_from_day"], 2)
+        # el día registrado se conserva tal cual
+        self.assertEqual(records.to_plain(replanned["schedule"]["day_1"]), day_1)
+        # nada de lo del día 1 cuenta como hecho: los sets semanales no pueden superar lo planificado después
+        for m, done in replanned["weekly_sets_done"].items():
+            planned_later = sum(ex["sets"] for d in range(2, 5) for ex in replanned["schedule"][f"day_{d}"]
+                                if m in ex["muscles"])
+            self.assertLessEqual(done, planned_later, m)
+        self.assertNotEqual(replanned["weekly_sets_done"], self.routine["weekly_sets_done"])
+
+    def test_records_before_since_are_ignored(self):
+        old = {"0": as_planned(self.schedule["day_1"], date="2020-01-01T10:00:00")}
+        replanned = routine_builder.replan_routine(self.routine, old, since="2025-01-01T00:00:00")
+        self.assertEqual(replanned["replanned_from_day"], 1)
+        self.assertEqual(without_replan_keys(replanned), self.routine)
+
+    def test_solver_and_session_time_come_from_plan_params(self):
+        routine = records.to_plain(routine_builder.generate_routine(3, 90, user_level=4, solver="grouped"))
+        replanned = routine_builder.replan_routine(routine, {"0": as_planned(routine["schedule"]["day_1"])})
+        self.assertEqual(replanned["plan_params"], routine["plan_params"])
+        self.assertEqual(without_replan_keys(replanned), routine)
+
+
+if __name__ == "__main__":
+    unittest.main()
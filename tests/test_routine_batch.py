@@ -0,0 +1,43 @@
+"""`generate_routines_batch`: mismas rutinas que `generate_routine`, con y sin pool de procesos.
+
+    python -m pytest tests
+"""
+import threading
+import unittest
+
+from src import routine_batch, routine_builder
+
+PROFILES = {
+    "ana": {"num_days": 3, "level": 0, "goal": "strength"},
+    "beto": {"num_days": 4, "level": 2, "injuries": ["lats"]},
+    "carla": {"num_days": 5, "level": 4, "equipments": ["body weight", "dumbbell"]},
+    "dani": {"num_days": 4, "level": 2, "injuries": ["lats"]},
+}
+
+
+def expected(profile):
+    user_profile = {k: v for k, v in profile.items() if k != "num_days"}
+    return routine_builder.generate_routine(profile["num_days"], 120, user_level=user_profile)
+
+
+class RoutineBatchTest(unittest.TestCase):
+    def test_single_worker_matches_generate_routine(self):
+        got = dict(routine_batch.generate_routines_batch(PROFILES, workers=1))
+        self.assertEqual(got, {user: expected(p) for user, p in PROFILES.items()})
+        self.assertEqual(routine_batch._tables, {})
+
+    def test_process_pool_with_threads_running(self):
+        # el proceso que llama tiene hilos vivos (como Streamlit o el volcado del caché)
+        stop = threading.Event()
+        busy = threading.Thread(target=stop.wait, daemon=True)
+        busy.start()
+        try:
+            got = dict(routine_batch.generate_routines_batch(PROFILES, workers=2, chunksize=1))
+        finally:
+            stop.set()
+        self.assertEqual(got, {user: expected(p) for user, p in PROFILES.items()})
+        self.assertEqual(routine_batch._tables, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
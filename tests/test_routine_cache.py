@@ -0,0 +1,57 @@
+"""`generate_routine_cached`: la misma rutina (y la misma forma) desde memoria, disco o generándola.
+
+    python -m pytest tests
+"""
+import tempfile
+import unittest
+
+from src import records, routine_builder, routine_cache
+
+
+def plain_types(value):
+    """Tipos que aparecen en `value` (recorriendo dicts, listas y tuplas)."""
+    found = {type(value)}
+    if isinstance(value, dict):
+        for v in value.values():
+            found |= plain_types(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            found |= plain_types(v)
+    return found
+
+
+class RoutineCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = routine_cache._cache
+        routine_cache._cache = routine_cache.RoutineCache(disk_dir=self.tmp.name)
+
+    def tearDown(self):
+        routine_cache._cache = self.previous
+        self.tmp.cleanup()
+
+    def test_miss_memory_and_disk_hits_return_plain_dicts(self):
+        expected = records.to_plain(routine_builder.generate_routine(3, 120, user_level=2))
+        days = {}
+        results = {"fallo": routine_cache.generate_routine_cached(3, 120, user_level=2,
+                                                                   progress=lambda d, items: days.update({d: items})),
+                   "memoria": routine_cache.generate_routine_cached(3, 120, user_level=2)}
+        # otro proceso con el mismo directorio: solo el nivel de disco
+        routine_cache._cache = routine_cache.RoutineCache(disk_dir=self.tmp.name)
+        results["disco"] = routine_cache.generate_routine_cached(3, 120, user_level=2)
+        for tier, routine in results.items():
+            with self.subTest(tier):
+                self.assertEqual(routine, expected)
+                self.assertFalse({t for t in plain_types(routine) if issubclass(t, (records._Record, tuple))})
+        self.assertEqual(days, {d: expected["schedule"][f"day_{d}"] for d in range(1, 4)})
+        self.assertFalse({t for t in plain_types(days) if issubclass(t, records._Record)})
+        self.assertEqual(routine_cache.cache_stats()["disk"]["hits"], 1)
+
+    def test_hits_are_independent_copies(self):
+        first = routine_cache.generate_routine_cached(3, 120, user_level=2)
+        first["schedule"]["day_1"].clear()
+        self.assertTrue(routine_cache.generate_routine_cached(3, 120, user_level=2)["schedule"]["day_1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
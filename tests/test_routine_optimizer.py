@@ -0,0 +1,112 @@
+"""`RoutineOptimizer`: el DP con poda encuentra el óptimo de una búsqueda exhaustiva y respeta los límites.
+
+    python -m pytest tests
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from src import catalog
+from src.optimizer.routine_optimizer import RoutineOptimizer, _Problem
+
+
+def exercise(exercise_id, targets, equipments, secondary=()):
+    return {"exerciseId": exercise_id, "name": exercise_id, "gifUrl": "", "targetMuscles": list(targets),
+            "bodyParts": [], "equipments": list(equipments), "secondaryMuscles": list(secondary),
+            "instructions": []}
+
+
+EXERCISES = [
+    exercise("bench press", ["pectorals"], ["barbell"], ["triceps"]),
+    exercise("push up", ["pectorals"], ["body weight"], ["triceps"]),
+    exercise("squat", ["quads"], ["barbell"], ["glutes"]),
+    exercise("lunge", ["quads"], ["body weight"], ["glutes"]),
+    exercise("pull up", ["lats"], ["body weight"], ["biceps"]),
+    exercise("curl", ["biceps"], ["dumbbell"]),
+    exercise("kickback", ["triceps"], ["cable"]),
+    exercise("crunch", ["abs"], ["body weight"]),
+    exercise("calf raise", ["calves"], ["body weight"]),
+]
+
+
+def exhaustive(problem, t, covered=0, last=-1):
+    """Mejor valor recorriendo todas las secuencias posibles (sin memoización ni poda)."""
+    best = 0.0
+    for c, bonus in (problem.adjacency[last] if last >= 0 else problem.start):
+        if problem.times[c] <= t:
+            v = problem.value(c, covered) + bonus
+            if v > 0:
+                best = max(best, v + exhaustive(problem, t - problem.times[c], covered | problem.masks[c], c))
+    return best
+
+
+class RoutineOptimizerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "exercises.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(EXERCISES, f)
+        self.optimizer = RoutineOptimizer(self.path)
+
+    def tearDown(self):
+        catalog._catalogs.pop(os.path.abspath(self.path), None)
+        self.tmp.cleanup()
+
+    def problem(self, target_muscles=None, equipment=None, stamina=None):
+        loaded = catalog.get_catalog(self.path)
+        return _Problem(loaded.exercises, loaded.transition_graph, 2, "hypertrophy", target_muscles, equipment,
+                        stamina or {})
+
+    def assert_valid(self, routine, capacity):
+        self.assertLessEqual(sum(ex["time_min"] for ex in routine), capacity)
+        self.assertEqual(self.optimizer.score(routine)["invalid_transitions"], 0)
+
+    def test_matches_exhaustive_search(self):
+        cases = [
+            {},
+            {"target_muscles": ["quads", "lats"]},
+            {"equipment_available": {"body weight"}},
+            {"stamina": {"pectorals": 0.2, "quads": 0.5}},
+        ]
+        for kwargs in cases:
+            for capacity in (0, 11, 12, 28, 40, 60):
+                with self.subTest(capacity=capacity, **{k: str(v) for k, v in kwargs.items()}):
+                    routine = self.optimizer.optimize_workout(capacity, **kwargs)
+                    stats = self.optimizer.last_stats
+                    self.assertTrue(stats.get("exact", True))
+                    expected = exhaustive(self.problem(kwargs.get("target_muscles"),
+                                                       kwargs.get("equipment_available"),
+                                                       kwargs.get("stamina")), capacity)
+                    self.assertAlmostEqual(stats.get("value", 0.0), expected, places=9)
+                    self.assert_valid(routine, capacity)
+                    if "target_muscles" not in kwargs and "stamina" not in kwargs:
+                        # score usa la misma función objetivo
+                        self.assertAlmostEqual(self.optimizer.score(routine)["value"], expected, places=9)
+
+    def test_equipment_filter(self):
+        routine = self.optimizer.optimize_workout(60, equipment_available={"body weight"})
+        self.assertTrue(routine)
+        for ex in routine:
+            self.assertEqual(ex["equipments"], ["body weight"])
+
+    def test_state_limit_keeps_a_valid_routine(self):
+        optimizer = RoutineOptimizer(self.path, max_states=1)
+        routine = optimizer.optimize_workout(60)
+        self.assertFalse(optimizer.last_stats["exact"])
+        self.assertLessEqual(optimizer.last_stats["states"], 1)
+        self.assertTrue(routine)
+        self.assert_valid(routine, 60)
+
+    def test_full_catalog_within_budget(self):
+        optimizer = RoutineOptimizer(time_budget_ms=200)
+        routine = optimizer.optimize_workout(90)
+        self.assertTrue(routine)
+        self.assertLessEqual(sum(ex["time_min"] for ex in routine), 90)
+        self.assertLessEqual(optimizer.last_stats["states"], optimizer.max_states)
+        # margen para la preparación (catálogo y grafo en caché) y la reconstrucción
+        self.assertLess(optimizer.last_stats["elapsed_ms"], 200 + 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
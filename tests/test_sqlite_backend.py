@@ -0,0 +1,85 @@
+"""`SqliteBackend`: cierre del pool con conexiones en uso y migración desde los archivos JSON.
+
+    python -m pytest tests
+"""
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from src.database.db_manager import DatabaseManager
+from src.database.json_backend import JsonBackend
+from src.database.sqlite_backend import SqliteBackend
+
+
+class SqlitePoolCloseTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = SqliteBackend(self.tmp.name, max_connections=1)
+        self.addCleanup(self.backend.close)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_connection_in_use_is_closed_when_returned(self):
+        with self.backend._conn() as conn:
+            self.backend.close()
+            # la conexión en uso sigue funcionando hasta devolverla
+            conn.execute("SELECT 1").fetchone()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertEqual(self.backend._connections, [])
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.backend.get_routine("ana")
+
+    def test_close_wakes_threads_waiting_for_a_connection(self):
+        errors = []
+
+        def wait_for_connection():
+            try:
+                self.backend.get_routine("ana")
+            except sqlite3.ProgrammingError as e:
+                errors.append(e)
+
+        with self.backend._conn():
+            waiters = [threading.Thread(target=wait_for_connection) for _ in range(3)]
+            for t in waiters:
+                t.start()
+            self.backend.close()
+            for t in waiters:
+                t.join(5)
+            self.assertFalse(any(t.is_alive() for t in waiters))
+        self.assertEqual(len(errors), 3)
+
+
+class MigrateFromJsonTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_dir = self.tmp.name + "/json"
+        source = DatabaseManager(backend=JsonBackend(self.json_dir, tracking_mode="log"))
+        source.backend.register_user("ana", "x")
+        source.save_routine("ana", {"schedule": {"Día 1": [
+            {"name": "press", "sets": 3, "muscles": ["pectorals"], "stamina_costs": {"pectorals": 30}}]}})
+        source.save_tracking("ana", 0, {"exercises": {"press": {"sets_completed": 2}}})
+        self.expected = source.backend.get_analytics("ana")
+        # historial sin agregados (guardado antes de que existieran)
+        source.backend.save_tracking("beto", 0, {"exercises": {}})
+        source.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_analytics_are_migrated(self):
+        backend = SqliteBackend(self.tmp.name + "/sqlite")
+        self.addCleanup(backend.close)
+        # agregados previos en SQLite que el historial importado deja obsoletos
+        backend.update_analytics("beto", lambda doc: {"stale": True})
+        counts = backend.migrate_from_json(self.json_dir)
+        self.assertEqual(counts["analytics"], 1)
+        self.assertEqual(backend.get_analytics("ana"), self.expected)
+        self.assertIsNone(backend.get_analytics("beto"))
+        self.assertEqual(DatabaseManager(backend=backend).get_tracking_analytics("beto")["sessions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Agregados de seguimiento al guardar (`DatabaseManager.save_tracking`), con ambos backends.
+
+    python -m pytest tests
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+from src import tracking_analytics
+from src.database.db_manager import DatabaseManager
+from src.database.json_backend import JsonBackend
+from src.database.sqlite_backend import SqliteBackend
+
+ROUTINE = {"schedule": {"Día 1": [
+    {"name": "press", "sets": 4, "muscles": ["pectorals"], "stamina_costs": {"pectorals": 40}},
+    {"name": "squat", "sets": 3, "muscles": ["quads"], "stamina_costs": {"quads": 30}},
+]}}
+# la misma rutina tras re-planificar: otros sets, músculos y consumo
+REPLANNED = {"schedule": {"Día 1": [
+    {"name": "press", "sets": 2, "muscles": ["triceps"], "stamina_costs": {"triceps": 10}},
+    {"name": "squat", "sets": 5, "muscles": ["glutes"], "stamina_costs": {"glutes": 50}},
+]}}
+
+
+def logged(routine, done, difficulty="Moderado"):
+    """Registro como lo guarda la página 'Seguimiento', con los objetivos de `routine`."""
+    return {"exercises": {ex["name"]: {"sets_completed": done, "difficulty": difficulty,
+                                       "target_sets": ex["sets"], "muscles": list(ex["muscles"]),
+                                       "stamina_costs": dict(ex["stamina_costs"])}
+                          for ex in routine["schedule"]["Día 1"]}}
+
+
+class SaveTrackingAnalyticsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def managers(self):
+        for backend in (JsonBackend(self.tmp.name + "/json", tracking_mode="log"),
+                        SqliteBackend(self.tmp.name + "/sqlite")):
+            self.addCleanup(backend.close)
+            db = DatabaseManager(backend=backend)
+            db.save_routine("ana", ROUTINE)
+            yield type(backend).__name__, db
+
+    def assert_matches_rebuild(self, db, routine):
+        expected = tracking_analytics.rebuild(db.get_tracking("ana"), routine)
+        self.assertEqual(db.backend.get_analytics("ana"), expected)
+
+    def test_save_only_writes_the_record_and_the_analytics(self):
+        for name, db in self.managers():
+            with self.subTest(backend=name):
+                db.save_tracking("ana", 0, logged(ROUTINE, 2))
+                calls = []
+                for method in ("save_tracking", "get_tracking", "get_routine", "get_analytics", "update_analytics"):
+                    wrapped = getattr(db.backend, method)
+                    patcher = mock.patch.object(db.backend, method, side_effect=lambda *a, m=method, w=wrapped, **k:
+                                                calls.append(m) or w(*a, **k))
+                    patcher.start()
+                    self.addCleanup(patcher.stop)
+                db.save_tracking("ana", 1, logged(ROUTINE, 3))
+                self.assertEqual(calls, ["save_tracking", "update_analytics"])
+                self.assert_matches_rebuild(db, ROUTINE)
+
+    def test_contribution_uses_the_targets_stored_with_the_record(self):
+        for name, db in self.managers():
+            with self.subTest(backend=name):
+                db.save_tracking("ana", 0, logged(ROUTINE, 2))
+                db.save_routine("ana", REPLANNED)
+                db.save_tracking("ana", 1, logged(REPLANNED, 1, "Difícil"))
+                # sobrescribir un día registrado con la rutina anterior resta lo que aportó entonces
+                db.save_tracking("ana", 0, logged(ROUTINE, 4))
+                self.assert_matches_rebuild(db, REPLANNED)
+                week = db.backend.get_analytics("ana")["weeks"]
+                volume = {}
+                for w in week.values():
+                    for m, sets in w["volume"].items():
+                        volume[m] = volume.get(m, 0) + sets
+                self.assertEqual(volume, {"pectorals": 4, "quads": 4, "triceps": 1, "glutes": 1})
+
+    def test_records_without_targets_use_the_saved_routine(self):
+        for name, db in self.managers():
+            with self.subTest(backend=name):
+                db.save_tracking("ana", 0, {"exercises": {"press": {"sets_completed": 2}}})
+                self.assert_matches_rebuild(db, ROUTINE)
+                self.assertEqual(db.backend.get_analytics("ana")["totals"]["target_sets"], 4)
+
+    def test_first_save_includes_previous_history(self):
+        for name, db in self.managers():
+            with self.subTest(backend=name):
+                # historial guardado antes de que existieran los agregados
+                db.backend.save_tracking("ana", 3, logged(ROUTINE, 1))
+                db.backend.save_tracking("ana", 2, {"exercises": {"squat": {"sets_completed": 3}}})
+                db.save_tracking("ana", 0, logged(ROUTINE, 2))
+                self.assertEqual(db.backend.get_analytics("ana")["totals"]["sessions"], 3)
+                self.assert_matches_rebuild(db, ROUTINE)
+
+
+if __name__ == "__main__":
+    unittest.main()
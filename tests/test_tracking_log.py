@@ -0,0 +1,102 @@
+"""Seguimiento en modo log (`JsonBackend(tracking_mode="log")`): índice incremental, compactación y cambio de modo.
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.database import json_backend
+from src.database.json_backend import JsonBackend
+
+
+class TrackingLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def backend(self, mode="log"):
+        backend = JsonBackend(self.data_dir, tracking_mode=mode)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_reads_see_appends_from_another_instance(self):
+        reader, writer = self.backend(), self.backend()
+        writer.save_tracking("ana", 1, {"v": 1})
+        self.assertEqual(reader.get_tracking("ana", 1)["v"], 1)
+        writer.save_tracking("ana", 2, {"v": 2})
+        writer.save_tracking("ana", 1, {"v": 3})
+        self.assertEqual({d: r["v"] for d, r in reader.get_tracking("ana").items()}, {"1": 3, "2": 2})
+
+    def test_rewritten_file_on_the_same_inode_is_reread(self):
+        reader, writer = self.backend(), self.backend()
+        for day in range(3):
+            writer.save_tracking("ana", day, {"v": day})
+        self.assertEqual(len(reader.get_tracking("ana")), 3)
+        writer.compact_tracking("ana")
+        self.assertEqual(len(reader.get_tracking("ana")), 3)
+        path = writer._tracking_log_path("ana")
+        with open(path, "rb") as f:
+            compacted = f.read()
+        # mismo inode y archivo más grande, como si el sistema reutilizara el inode tras compactar
+        header = JsonBackend._tracking_log_header().encode("utf-8")
+        extra = JsonBackend._tracking_log_line("7", {"v": 7}).encode("utf-8")
+        body = compacted[compacted.index(b"\n") + 1:]
+        with open(path, "r+b") as f:
+            f.write(header + body + extra)
+        self.assertEqual(os.stat(path).st_ino, reader._tracking_index["ana"]["ino"])
+        self.assertEqual({d: r["v"] for d, r in reader.get_tracking("ana").items()},
+                         {"0": 0, "1": 1, "2": 2, "7": 7})
+
+    def test_compaction_keeps_last_record_per_day(self):
+        backend = self.backend()
+        for k in range(50):
+            backend.save_tracking("ana", k % 5, {"v": k})
+        backend.compact_tracking("ana")
+        with open(backend._tracking_log_path("ana"), "rb") as f:
+            self.assertEqual(len(f.read().splitlines()), 1 + 5)  # cabecera + un registro por día
+        fresh = self.backend()
+        self.assertEqual({d: r["v"] for d, r in fresh.get_tracking("ana").items()},
+                         {str(d): 45 + d for d in range(5)})
+
+    def test_one_background_compaction_per_user(self):
+        backend = self.backend()
+        started = []
+        release = threading.Event()
+
+        def slow_compaction(username):
+            started.append(username)
+            release.wait(5)
+
+        with mock.patch.object(backend, "compact_tracking", slow_compaction):
+            for k in range(json_backend.COMPACT_MIN_LINES + 20):
+                backend.save_tracking("ana", 1, {"v": k})
+            self.assertEqual(started, ["ana"])
+            release.set()
+            for _ in range(100):
+                if not backend._compacting:
+                    break
+                threading.Event().wait(0.01)
+        self.assertEqual(backend._compacting, set())
+
+    def test_switching_back_to_json_keeps_log_records(self):
+        json_mode = self.backend("json")
+        json_mode.save_tracking("ana", 1, {"v": 1})
+        log_mode = self.backend("log")
+        log_mode.save_tracking("ana", 2, {"v": 2})
+        log_mode.save_tracking("beto", 1, {"v": 3})
+        again = self.backend("json")
+        self.assertEqual({d: r["v"] for d, r in again.get_tracking("ana").items()}, {"1": 1, "2": 2})
+        self.assertEqual(again.get_tracking("beto", 1)["v"], 3)
+        self.assertFalse(os.path.isdir(os.path.join(self.data_dir, "tracking_log")))
+        # y al volver al modo log se importa lo que hay en tracking.json
+        self.assertEqual(len(self.backend("log").get_tracking("ana")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
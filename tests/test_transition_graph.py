@@ -0,0 +1,66 @@
+"""Grafo de transiciones en disco: un `.npz` truncado o corrupto se reconstruye y los guardados no se pisan.
+
+    python -m pytest tests
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from src import transition_graph
+
+EXERCISES = [
+    {"exerciseId": "press", "targetMuscles": ["pectorals"], "secondaryMuscles": ["triceps"],
+     "equipments": ["barbell"]},
+    {"exerciseId": "squat", "targetMuscles": ["quads"], "secondaryMuscles": ["glutes"], "equipments": ["barbell"]},
+    {"exerciseId": "pull up", "targetMuscles": ["lats"], "secondaryMuscles": ["biceps"],
+     "equipments": ["body weight"]},
+    {"exerciseId": "fly", "targetMuscles": ["pectorals"], "secondaryMuscles": [], "equipments": ["dumbbell"]},
+]
+
+
+class TransitionGraphFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, "exercises.json")
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(EXERCISES, f)
+        self.graph_path = transition_graph.graph_path_for(self.json_path)
+        self.expected = transition_graph.load_or_build(self.json_path, EXERCISES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_same_graph(self, graph):
+        self.assertEqual(graph.ids, self.expected.ids)
+        np.testing.assert_array_equal(graph.indptr, self.expected.indptr)
+        np.testing.assert_array_equal(graph.indices, self.expected.indices)
+        np.testing.assert_array_equal(graph.weights, self.expected.weights)
+
+    def test_corrupt_file_is_rebuilt(self):
+        with open(self.graph_path, "rb") as f:
+            data = f.read()
+        for label, content in (("vacío", b""), ("mitad", data[:len(data) // 2]), ("sin final", data[:-10]),
+                               ("basura", b"no es un zip" * 10)):
+            with self.subTest(label):
+                with open(self.graph_path, "wb") as f:
+                    f.write(content)
+                self.assert_same_graph(transition_graph.load_or_build(self.json_path, EXERCISES))
+                # y el archivo reescrito vuelve a ser válido
+                self.assert_same_graph(transition_graph.TransitionGraph.load(self.graph_path))
+
+    def test_concurrent_saves_leave_a_valid_file(self):
+        threads = [threading.Thread(target=self.expected.save, args=(self.graph_path,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assert_same_graph(transition_graph.TransitionGraph.load(self.graph_path))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["exercises.json", "exercises.transitions.npz"])
+
+
+if __name__ == "__main__":
+    unittest.main()